@@ -6,13 +6,14 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 
 from agents.goal_preprocessor.base import BaseGoalPreprocessor
-from agents.prompts import load_prompts
+from agents.prompts import compile_prompt, load_prompts
 from utils.observability import observe
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 _PROMPTS = load_prompts("goal_preprocessors/conversational", required_prompts=["clarify_goal"])
+_CLARIFY_GOAL = compile_prompt(_PROMPTS["clarify_goal"])
 
 
 class ConversationalGoalPreprocessor(BaseGoalPreprocessor):
@@ -36,7 +37,7 @@ class ConversationalGoalPreprocessor(BaseGoalPreprocessor):
     def process(self, goal: str, history: Sequence[Dict[str, Any]]) -> Tuple[str, str | None]:
         current_time, time_zone = self._current_time_and_timezone()
         history_str = "\n".join(f"Goal: {item['goal']}\nResult: {item['result']}" for item in history)
-        prompt = _PROMPTS["clarify_goal"].format(
+        prompt = _CLARIFY_GOAL.format(
             history_str=history_str,
             goal=goal,
             now_iso=current_time.isoformat(),
@@ -1,17 +1,48 @@
 """Lightweight LLM wrapper interfaces used by reasoner implementations."""
 from __future__ import annotations
 
+import functools
+import inspect
 import json
 import re
+import threading
 from abc import ABC, abstractmethod
 import os
 from textwrap import dedent
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 
+from agents.llm.exceptions import JSONParseError
+from agents.prompts import compile_prompt
+from utils import fast_json
 from utils.logger import get_logger
 logger = get_logger(__name__)
 
+# Guards usage counters; one lock is enough since updates are a single addition.
+_USAGE_LOCK = threading.Lock()
+
+# Prompt entry points reasoners call with ``system=``; subclass overrides written before it existed get adapted.
+_SYSTEM_AWARE_METHODS = ("prompt", "prompt_to_json", "prompt_with_schema")
+
+
+def _accepts_system(method) -> bool:
+    """True if ``method`` takes a ``system`` keyword, explicitly or through ``**kwargs``."""
+    try:
+        params = inspect.signature(method).parameters.values()
+    except (TypeError, ValueError):
+        return True
+    return any(p.name == "system" or p.kind is inspect.Parameter.VAR_KEYWORD for p in params)
+
+
+def _fold_system(method):
+    """Wrap a legacy override so a ``system`` keyword is prepended to the prompt content instead."""
+    @functools.wraps(method)
+    def wrapper(self, content, *args, system: str | None = None, **kwargs):
+        if system:
+            content = f"{system}\n\n{content}"
+        return method(self, content, *args, **kwargs)
+    return wrapper
+
 
 # JSON correction prompt for retry attempts
 JSON_CORRECTION_PROMPT = dedent("""
@@ -40,6 +71,8 @@ JSON_CORRECTION_PROMPT = dedent("""
     If any check fails, silently regenerate until both checks pass.
     </self_check>
 """).strip()
+# Parsed once; retrying subclasses fill it in on every failed parse
+JSON_CORRECTION_TEMPLATE = compile_prompt(JSON_CORRECTION_PROMPT)
 
 
 class BaseLLM(ABC):
@@ -54,8 +87,25 @@ class BaseLLM(ABC):
     ValueError : If neither `model` is passed nor `LLM_MODEL` is set in .env during initialization.
     """
 
+    # Running total of tokens reported by the provider across this instance's calls
+    tokens_used: int = 0
+
     # Shared regex pattern for extracting JSON from markdown code fences
     _fence_pattern = re.compile(r"```(?:json)?\s*([\s\S]+?)\s*```")
+    # Outermost {...} span, for replies that wrap the JSON object in prose
+    _object_pattern = re.compile(r"\{[\s\S]*\}")
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        """Keep subclasses that override prompt(self, content) working now that callers pass ``system=``.
+
+        Such overrides get the system text prepended to the user content, so nothing is lost; declare
+        ``system`` (or ``**kwargs``) to send it as a real system message and benefit from prompt caching.
+        """
+        super().__init_subclass__(**kwargs)
+        for name in _SYSTEM_AWARE_METHODS:
+            method = cls.__dict__.get(name)
+            if method is not None and not _accepts_system(method):
+                setattr(cls, name, _fold_system(method))
 
     def __init__(self, model: str | None = None, *, temperature: float | None = None) -> None:
         """Initialize the LLM wrapper with model and temperature configuration.
@@ -114,7 +164,7 @@ class BaseLLM(ABC):
         """
         ...
 
-    def prompt(self, content: str, **kwargs) -> str:
+    def prompt(self, content: str, *, system: str | None = None, **kwargs) -> str:
         """Convenience wrapper for single-turn user prompts.
 
         Wraps the content in a user message and calls completion(). Use this for simple,
@@ -122,14 +172,44 @@ class BaseLLM(ABC):
 
         Args:
             content: The user's prompt text.
+            system: Optional static instructions sent as a leading system message. Keeping it
+                byte-identical across calls lets providers serve it from their prompt cache.
             **kwargs: Additional arguments passed through to completion() (e.g., temperature, response_format).
 
         Returns:
             The assistant's response text.
         """
-        resp = self.completion([{"role": "user", "content": content}], **kwargs)
+        resp = self.completion(self._build_messages(content, system), **kwargs)
+        self._record_usage(resp.total_tokens)
         return resp.text
 
+    def _record_usage(self, total_tokens: int | None) -> None:
+        """Add a call's reported token count to ``tokens_used``; providers that report none add nothing."""
+        if total_tokens:
+            with _USAGE_LOCK:
+                self.tokens_used += total_tokens
+
+    def _build_messages(self, content: str, system: str | None = None) -> List[Dict[str, Any]]:
+        """Messages for a single-turn prompt; subclasses may decorate the system message (e.g. cache hints)."""
+        messages: List[Dict[str, Any]] = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": content})
+        return messages
+
+    def prompt_batch(self, contents: List[str], **kwargs) -> List[str]:
+        """Run several independent single-turn prompts, returning replies in input order.
+
+        The base implementation prompts one by one. Providers with a batched endpoint should
+        override this to send all prompts in one request.
+
+        Args:
+            contents: The user prompt texts.
+            **kwargs: Additional arguments passed through to each completion (same as prompt()).
+
+        Returns:
+            The assistant's response texts, one per prompt.
+        """
+        return [self.prompt(content, **kwargs) for content in contents]
+
     def prompt_to_json(self, content: str, **kwargs) -> Dict[str, Any]:
         """
         Prompt the LLM and ensure the response is valid JSON.
@@ -140,17 +220,49 @@ class BaseLLM(ABC):
         Args:
             content: The prompt content
             max_retries: Maximum number of retry attempts (ignored in base implementation)
-            **kwargs: Additional arguments passed to completion()
+            **kwargs: Additional arguments passed to prompt() (e.g., system) and completion()
 
         Returns:
             Parsed JSON object as a dictionary
 
         Raises:
-            json.JSONDecodeError: If JSON parsing fails
+            JSONParseError: A ``json.JSONDecodeError`` carrying the reply as ``raw_content``, if parsing fails even on
+                the outermost ``{...}`` span of the reply
         """
         # Use JSON mode if supported by the LLM
         kwargs_with_json = kwargs.copy()
         kwargs_with_json.setdefault("response_format", {"type": "json_object"})
         raw_response = self.prompt(content, **kwargs_with_json)
         cleaned_response = self._fence_pattern.sub(lambda m: m.group(1).strip(), raw_response)
-        return json.loads(cleaned_response)
+        try:
+            return fast_json.loads(cleaned_response)
+        except json.JSONDecodeError as e:
+            # Repair locally before anyone spends another LLM call: keep only the outermost {...} span.
+            match = self._object_pattern.search(cleaned_response)
+            if match is not None:
+                try:
+                    return fast_json.loads(match.group(0))
+                except json.JSONDecodeError:
+                    pass
+            # raw_content lets retrying subclasses show the model its own bad output
+            raise JSONParseError(e.msg, e.doc, e.pos, raw_content=raw_response) from e
+
+    def prompt_with_schema(self, content: str, json_schema: Dict[str, Any], *, name: str = "response", **kwargs) -> Dict[str, Any]:
+        """
+        Prompt the LLM for a JSON object that follows ``json_schema``.
+
+        Requests structured output (``response_format`` of type ``json_schema``) so providers that enforce
+        schemas return valid JSON on the first try; others fall back to JSON mode or the prompt's own
+        instructions. Parsing and retries are those of prompt_to_json().
+
+        Args:
+            content: The prompt content
+            json_schema: JSON Schema the reply object must follow
+            name: Schema name reported to the provider
+            **kwargs: Additional arguments passed to prompt_to_json() (e.g., max_retries, system)
+
+        Returns:
+            Parsed JSON object as a dictionary
+        """
+        kwargs.setdefault("response_format", {"type": "json_schema", "json_schema": {"name": name, "schema": json_schema}})
+        return self.prompt_to_json(content, **kwargs)
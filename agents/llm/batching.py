@@ -0,0 +1,92 @@
+"""Micro-batching wrapper that coalesces concurrent prompts into batched backend calls."""
+from __future__ import annotations
+
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Tuple
+
+from agents.llm.base_llm import BaseLLM
+from utils.logger import get_logger
+logger = get_logger(__name__)
+
+
+class BatchingLLM(BaseLLM):
+    """Wrap another LLM so prompts issued concurrently from several threads share one ``prompt_batch`` call.
+
+    Prompts are grouped by their system message and keyword arguments; a group is sent once it holds
+    ``max_batch`` prompts or its first prompt has waited ``max_wait_ms``. A caller with no other prompt in
+    flight is sent straight away, so sequential use behaves like the wrapped LLM.
+
+    A failed batch call fails every prompt in that batch.
+    """
+
+    def __init__(self, inner: BaseLLM, *, max_batch: int = 16, max_wait_ms: float = 10) -> None:
+        super().__init__(model=inner.model, temperature=inner.temperature)
+        self.inner = inner
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000
+        self._cond = threading.Condition()
+        self._groups: Dict[Tuple[Any, ...], List[Tuple[str, Future]]] = {}
+        self._active = 0
+
+    @property
+    def tokens_used(self) -> int:  # type: ignore[override]
+        """The wrapped LLM's running token count; every call made through this wrapper is recorded there."""
+        return self.inner.tokens_used
+
+    @tokens_used.setter
+    def tokens_used(self, value: int) -> None:
+        self.inner.tokens_used = value
+
+    def completion(self, messages: List[Dict[str, str]], **kwargs) -> BaseLLM.LLMResponse:
+        return self.inner.completion(messages, **kwargs)
+
+    def prompt(self, content: str, *, system: str | None = None, **kwargs) -> str:
+        key = (system, tuple(sorted((name, repr(value)) for name, value in kwargs.items())))
+        future: Future = Future()
+        batch: List[Tuple[str, Future]] | None = None
+        with self._cond:
+            self._active += 1
+            group = self._groups.setdefault(key, [])
+            group.append((content, future))
+            if len(group) == 1:
+                # First prompt of its group leads: wait briefly for company, but only if others are in flight.
+                if self._active > 1:
+                    self._cond.wait_for(lambda: len(self._groups[key]) >= self.max_batch, timeout=self.max_wait)
+                batch = self._groups.pop(key)
+            elif len(group) >= self.max_batch:
+                self._cond.notify_all()
+        try:
+            if batch is not None:
+                self._send(batch, system, kwargs)
+            return future.result()
+        finally:
+            with self._cond:
+                self._active -= 1
+
+    def _send(self, batch: List[Tuple[str, Future]], system: str | None, kwargs: Dict[str, Any]) -> None:
+        for start in range(0, len(batch), self.max_batch):
+            chunk = batch[start:start + self.max_batch]
+            contents = [content for content, _ in chunk]
+            try:
+                if len(chunk) == 1:
+                    replies = [self.inner.prompt(contents[0], system=system, **kwargs)]
+                else:
+                    logger.info("llm_micro_batch", batch_size=len(chunk))
+                    replies = self.inner.prompt_batch(contents, system=system, **kwargs)
+            except Exception as e:
+                for _, future in chunk:
+                    future.set_exception(e)
+                continue
+            for (_, future), reply in zip(chunk, replies):
+                future.set_result(reply)
+
+    def prompt_to_json(self, content: str, max_retries: int = 3, **kwargs) -> Dict[str, Any]:
+        """Batched JSON prompt; a malformed reply is retried through the wrapped LLM's own JSON handling."""
+        try:
+            return super().prompt_to_json(content, **kwargs)
+        except json.JSONDecodeError:
+            if max_retries <= 0:
+                raise
+            return self.inner.prompt_to_json(content, max_retries=max_retries - 1, **kwargs)
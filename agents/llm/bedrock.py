@@ -1,4 +1,4 @@
-from agents.llm.base_llm import BaseLLM, JSON_CORRECTION_PROMPT
+from agents.llm.base_llm import BaseLLM, JSON_CORRECTION_TEMPLATE
 from typing import List, Dict, Any
 import json
 import os
@@ -44,6 +44,25 @@ def _model_supports_system_prompt(model_id: str) -> bool:
         is_supported = True
     return is_supported
 
+def _model_supports_prompt_caching(model_id: str) -> bool:
+    """
+    Check if the Bedrock model accepts Converse cachePoint blocks for prompt caching.
+
+    Args:
+        model_id: The Bedrock model ID (e.g., 'us.anthropic.claude-3-7-sonnet-20250219-v1:0')
+
+    Returns:
+        True if the model supports prompt caching, False otherwise
+    """
+    caching_families = (
+        "anthropic.claude-3-5-haiku",
+        "anthropic.claude-3-7-sonnet",
+        "anthropic.claude-sonnet-4",
+        "anthropic.claude-opus-4",
+        "amazon.nova",
+    )
+    return any(family in model_id for family in caching_families)
+
 class BedrockLLM(BaseLLM):
     """Wrapper around AWS Bedrock Converse API.
     
@@ -95,6 +114,17 @@ class BedrockLLM(BaseLLM):
         effective_temperature = kwargs.get("temperature", self.temperature)
         effective_max_tokens = kwargs.get("max_tokens", self.max_tokens)
 
+        # Converse takes system instructions separately; models without system support get them inlined.
+        system_blocks: List[Dict[str, Any]] = [{"text": m.get("content", "")} for m in messages if m.get("role") == "system"]
+        if system_blocks:
+            conversation = [m for m in messages if m.get("role") != "system"]
+            if _model_supports_system_prompt(self.model) or not conversation:
+                messages = conversation
+            else:
+                inlined = "\n\n".join(block["text"] for block in system_blocks)
+                messages = [{**conversation[0], "content": f"{inlined}\n\n{conversation[0].get('content', '')}"}, *conversation[1:]]
+                system_blocks = []
+
         # Convert messages to Bedrock format
         bedrock_messages = self._convert_messages_to_bedrock_format(messages)
 
@@ -113,10 +143,16 @@ class BedrockLLM(BaseLLM):
         
         if inference_config:
             converse_params["inferenceConfig"] = inference_config
-
-        # Handle additional parameters like response_format for JSON mode
-        additional_config = {}
-        if "response_format" in kwargs and kwargs["response_format"].get("type") == "json_object":
+        if system_blocks:
+            if _model_supports_prompt_caching(self.model):
+                # Cache checkpoint after the static instructions, so repeated calls skip re-reading them
+                system_blocks = system_blocks + [{"cachePoint": {"type": "default"}}]
+            converse_params["system"] = system_blocks
+
+        # Handle additional parameters like response_format for JSON mode; Converse cannot enforce a
+        # json_schema, so structured-output requests fall back to plain JSON mode
+        additional_config: Dict[str, Any] = {}
+        if "response_format" in kwargs and kwargs["response_format"].get("type") in ("json_object", "json_schema"):
             if _model_supports_json_format(self.model):
                 additional_config["response_format"] = {"type": "json_object"}
                 converse_params["additionalModelRequestFields"] = additional_config
@@ -126,7 +162,7 @@ class BedrockLLM(BaseLLM):
                         "text": "You must respond with valid JSON only. Do not include any text outside the JSON object."
                     }
                 ]
-                converse_params["system"] = additional_config["system"]
+                converse_params["system"] = system_blocks + additional_config["system"]
             else:
                 logger.warning("json_format_not_supported", model=self.model)
 
@@ -196,7 +232,7 @@ class BedrockLLM(BaseLLM):
                 else:
                     bad_json_content = "The previous response was not valid JSON"
 
-                current_prompt = JSON_CORRECTION_PROMPT.format(
+                current_prompt = JSON_CORRECTION_TEMPLATE.format(
                     original_prompt=original_prompt,
                     bad_json=bad_json_content
                 )
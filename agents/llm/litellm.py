@@ -1,4 +1,4 @@
-from agents.llm.base_llm import BaseLLM, JSON_CORRECTION_PROMPT
+from agents.llm.base_llm import BaseLLM, JSON_CORRECTION_TEMPLATE
 from typing import List, Dict, Any
 import json
 import litellm
@@ -23,25 +23,7 @@ class LiteLLM(BaseLLM):
     def completion(self, messages: List[Dict[str, str]], max_retries:int=3, exponential_backoff:float=0.5, **kwargs) -> BaseLLM.LLMResponse:
         for attempt in range(1+max_retries):#1 try + max_retries retries
             try:  
-                # Merge default parameters with provided kwargs
-                effective_temperature = kwargs.get("temperature", self.temperature)
-                effective_max_tokens = kwargs.get("max_tokens", self.max_tokens)
-
-                completion_kwargs: Dict[str, Any] = {
-                    "model": self.model,
-                    "messages": messages,
-                }
-                if effective_temperature is not None:
-                    completion_kwargs["temperature"] = effective_temperature
-                if effective_max_tokens is not None:
-                    completion_kwargs["max_tokens"] = effective_max_tokens
-
-                # Add any additional kwargs (like response_format)
-                for key, value in kwargs.items():
-                    if key not in ["temperature", "max_tokens"]:
-                        completion_kwargs[key] = value
-
-                resp = litellm.completion(**completion_kwargs)
+                resp = litellm.completion(**self._request_kwargs(messages, kwargs))
 
                 text = ""
                 try:
@@ -66,6 +48,56 @@ class LiteLLM(BaseLLM):
                     logger.error("retry failed", attempt=attempt, error=str(e), msg="Exceeded max retries for completion parsing")
                     raise
 
+    def _build_messages(self, content: str, system: str | None = None) -> List[Dict[str, Any]]:
+        """Anthropic only caches prompt prefixes marked with cache_control; other providers cache automatically."""
+        messages = super()._build_messages(content, system)
+        if system and ("claude" in self.model or self.model.startswith("anthropic/")):
+            messages[0]["content"] = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+        return messages
+
+    def _request_kwargs(self, messages: Any, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge default parameters with provided kwargs for a litellm request."""
+        effective_temperature = kwargs.get("temperature", self.temperature)
+        effective_max_tokens = kwargs.get("max_tokens", self.max_tokens)
+
+        request_kwargs: Dict[str, Any] = {
+            "model": self.model,
+            "messages": messages,
+        }
+        if effective_temperature is not None:
+            request_kwargs["temperature"] = effective_temperature
+        if effective_max_tokens is not None:
+            request_kwargs["max_tokens"] = effective_max_tokens
+
+        # Add any additional kwargs (like response_format)
+        for key, value in kwargs.items():
+            if key not in ["temperature", "max_tokens"]:
+                request_kwargs[key] = value
+        return request_kwargs
+
+    @observe
+    def prompt_batch(self, contents: List[str], *, system: str | None = None, **kwargs) -> List[str]:
+        """Send all prompts in one litellm.batch_completion request; replies keep input order.
+
+        Raises the first per-prompt provider error, if any.
+        """
+        if not contents:
+            return []
+        messages = [self._build_messages(content, system) for content in contents]
+        responses = litellm.batch_completion(**self._request_kwargs(messages, kwargs))
+
+        texts: List[str] = []
+        for resp in responses:
+            if isinstance(resp, Exception):
+                logger.error("llm_batch_completion_failed", error=str(resp), batch_size=len(contents))
+                raise resp
+            try:
+                texts.append(resp.choices[0].message.content.strip())
+            except (IndexError, AttributeError):
+                texts.append("")
+            self._record_usage(self._extract_token_usage(resp)[2])
+        return texts
+
     def prompt_to_json(self, content: str, max_retries: int = 3, **kwargs) -> Dict[str, Any]:
         """
         Enhanced JSON prompting with automatic retry logic.
@@ -104,7 +136,7 @@ class LiteLLM(BaseLLM):
                 else:
                     bad_json_content = "The previous response was not valid JSON"  # Fallback
 
-                current_prompt = JSON_CORRECTION_PROMPT.format(
+                current_prompt = JSON_CORRECTION_TEMPLATE.format(
                     original_prompt=original_prompt,
                     bad_json=bad_json_content
                 )
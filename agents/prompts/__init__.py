@@ -1,4 +1,6 @@
 from pathlib import Path
+from string import Formatter
+from typing import Any
 import yaml
 
 
@@ -19,3 +21,52 @@ def load_prompts(profile: str, required_prompts: list[str]) -> dict[str, str]:
     return data
 
 
+
+
+class CompiledPrompt:
+    """A prompt template parsed once into literal and field parts.
+
+    ``format(**fields)`` matches ``str.format`` for the plain named fields used by the YAML prompts
+    (including ``{{``/``}}`` escapes) without re-parsing the template on every call.
+    """
+
+    __slots__ = ("template", "fields", "_parts", "_static")
+
+    def __init__(self, template: str) -> None:
+        parts: list[tuple[str, str | None, str, str | None]] = []
+        pending = ""  # literal text since the last field; "{{"/"}}" escapes split it into several parse items
+        for literal, name, spec, conversion in Formatter().parse(template):
+            if name is None:
+                pending += literal
+                continue
+            if not name.isidentifier() or "{" in (spec or ""):
+                raise ValueError(f"Unsupported prompt field: {{{name}}}")
+            parts.append((pending + literal, name, spec or "", conversion))
+            pending = ""
+        if pending:
+            parts.append((pending, None, "", None))
+        self.template = template
+        self.fields = frozenset(name for _, name, _, _ in parts if name is not None)
+        self._parts = tuple(parts)
+        # Field-free templates (static system prompts) render to the same text every time
+        self._static = None if self.fields else "".join(literal for literal, _, _, _ in parts)
+
+    def format(self, **fields: Any) -> str:
+        if self._static is not None:
+            return self._static
+        out: list[str] = []
+        for literal, name, spec, conversion in self._parts:
+            out.append(literal)
+            if name is not None:
+                value = fields[name]
+                if conversion == "r":
+                    value = repr(value)
+                elif conversion in ("s", "a"):
+                    value = str(value) if conversion == "s" else ascii(value)
+                out.append(value if type(value) is str and not spec else format(value, spec))
+        return "".join(out)
+
+
+def compile_prompt(template: str) -> CompiledPrompt:
+    """Parse *template* once for repeated ``format`` calls in hot loops."""
+    return CompiledPrompt(template)
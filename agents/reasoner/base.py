@@ -1,11 +1,16 @@
 from __future__ import annotations
+import asyncio
+import hashlib
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import Future
 from dataclasses import dataclass, field
-from typing import Any, List
+from typing import Any, Dict, List, Sequence, Tuple
 
 from collections.abc import MutableMapping
-from agents.tools.base import JustInTimeToolingBase
+from agents.tools.base import JustInTimeToolingBase, ToolBase
 from agents.llm.base_llm import BaseLLM
+from utils import fast_json
 
 
 @dataclass
@@ -27,8 +32,67 @@ class BaseReasoner(ABC):
         self.llm = llm
         self.tools = tools
         self.memory = memory
+        self._search_cache: Dict[Tuple[str, int], List[ToolBase]] = {}
+        # Searches in flight, so threads of a parallel wave (or a prefetch) asking for the same query share one call
+        self._search_pending: Dict[Tuple[str, int], Future] = {}
+        self._search_lock = threading.Lock()
 
     @abstractmethod
     def run(self, goal: str) -> ReasoningResult:
         """The main entry point to execute the reasoning loop."""
         raise NotImplementedError
+
+    def _search(self, query: str, top_k: int) -> List[ToolBase]:
+        """``tools.search`` memoized on ``(query, top_k)``; subclasses clear ``_search_cache`` per run."""
+        key = (query, top_k)
+        results = self._search_cache.get(key)
+        if results is not None:
+            return results
+        with self._search_lock:
+            in_flight = self._search_pending.get(key)
+            if in_flight is None:
+                pending: Future = Future()
+                self._search_pending[key] = pending
+        if in_flight is not None:
+            return in_flight.result()
+        try:
+            results = self._search_cache[key] = self.tools.search(query, top_k=top_k)
+            pending.set_result(results)
+            return results
+        except BaseException as exc:
+            pending.set_exception(exc)
+            raise
+        finally:
+            with self._search_lock:
+                del self._search_pending[key]
+
+    def _execute_tool(self, tool: ToolBase, params: Dict[str, Any], memo: Dict[str, Any] | None = None) -> Any:
+        """``tools.execute``; given a per-run ``memo``, results of idempotent tools are reused on ``(tool.id, params)``.
+
+        A non-idempotent call clears the memo, since it may have changed what earlier reads returned.
+        Failed calls are never memoized. ReACT passes its run's memo; ReWOO steps execute without one.
+        """
+        if memo is None:
+            return self.tools.execute(tool, params)
+        if not tool.is_idempotent():
+            memo.clear()
+            return self.tools.execute(tool, params)
+        try:
+            key = hashlib.sha256(f"{tool.id}\x00{fast_json.dumps(params, sort_keys=True)}".encode()).hexdigest()
+        except TypeError:
+            return self.tools.execute(tool, params)
+        if key in memo:
+            return memo[key]
+        result = memo[key] = self.tools.execute(tool, params)
+        return result
+
+    async def arun(self, goal: str) -> ReasoningResult:
+        """Awaitable ``run``; the synchronous loop runs in a worker thread so the event loop stays free."""
+        return await asyncio.to_thread(self.run, goal)
+
+    async def arun_batch(self, goals: Sequence[str]) -> List[ReasoningResult]:
+        """Run several goals concurrently, returning results in input order.
+
+        All goals share this reasoner's LLM, tools and memory.
+        """
+        return list(await asyncio.gather(*(self.arun(goal) for goal in goals)))
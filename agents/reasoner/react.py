@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import hashlib
 import json
-from typing import Any, Dict, List, Tuple
+import time
+from collections import Counter, deque
+from itertools import islice
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
 from collections.abc import MutableMapping
+from dataclasses import dataclass, field, replace
 
 from agents.reasoner.base import BaseReasoner, ReasoningResult
 from agents.llm.base_llm import BaseLLM
@@ -11,10 +17,134 @@ from agents.tools.exceptions import ToolExecutionError, ToolCredentialsMissingEr
 from agents.reasoner.exceptions import ToolSelectionError, ParameterGenerationError
 from utils.observability import observe
 from utils.logger import get_logger
+from utils.text import jaccard_similarity, token_set
+from utils import fast_json
 logger = get_logger(__name__)
 
-from agents.prompts import load_prompts
-_PROMPTS = load_prompts("reasoners/react", required_prompts=["think", "tool_select", "param_gen"])
+from agents.prompts import compile_prompt, load_prompts
+_PROMPTS = load_prompts("reasoners/react", required_prompts=[
+    "think", "think_input", "tool_select", "tool_select_input", "tool_select_params", "tool_select_params_input", "param_gen", "param_gen_input",
+    "observation_summary", "observation_summary_input",
+])
+_TEMPLATES = {name: compile_prompt(text) for name, text in _PROMPTS.items()}
+# Each prompt is a static system part plus a short *_input template; the static part goes out byte-identical
+# as the system message so providers can serve it from their prompt cache.
+_SYSTEM = {name: _TEMPLATES[name].format() for name in ("think", "tool_select", "tool_select_params", "param_gen", "observation_summary")}
+
+# Exact step_type spellings the think prompt asks for; anything else goes through normalization.
+_STEP_TYPES = {name: name for name in ("THINK", "ACT", "STOP")}
+_STEP_TYPES.update({name.lower(): name for name in _STEP_TYPES})
+
+# THINK outputs this similar to an earlier thought are treated as repeats and replaced with a nudge to act.
+_DUPLICATE_THOUGHT_SIMILARITY = 0.9
+_DUPLICATE_THOUGHT_NUDGE = "Prior reasoning already covers this; proceed to an action or a final answer."
+
+# Speculative work started for the previous ACT is reused only when the new ACT text is this similar.
+_SPECULATION_SIMILARITY = 0.9
+
+# Observations are capped once when recorded (same limit as ReWOO's history).
+_MAX_OBSERVATION_CHARS = 8124
+
+# Observations that fall out of the recent window are cut to a preview of this many characters.
+_CONDENSED_OBSERVATION_CHARS = 200
+
+# Rough characters-per-token ratio used to check the transcript against a token budget without a tokenizer.
+_CHARS_PER_TOKEN = 4
+
+# Shortest useful cut of a candidate summary when the tool list hits max_tools_chars.
+_MIN_TRUNCATED_SUMMARY_CHARS = 80
+
+# Lines kept verbatim once a transcript exceeds its token budget: about the last three ACT turns.
+_BUDGET_KEEP_LAST = 9
+
+# Observations longer than this are summarized in the background when an observation_summary_llm is configured.
+_SUMMARIZE_OBSERVATION_CHARS = 4000
+
+@dataclass(slots=True)
+class ReACTState:
+    goal: str
+    lines: List[str] = field(default_factory=list)
+    is_complete: bool = False
+    tool_calls: List[dict] = field(default_factory=list)
+    failed_tool_ids: List[str] = field(default_factory=list)
+    last_action: Optional[str] = None
+    last_action_failed: bool = False
+    thought_tokens: List[frozenset[str]] = field(default_factory=list)
+    # Results of idempotent tool calls made during this run, keyed on tool id and parameters
+    execution_memo: Dict[str, Any] = field(default_factory=dict, repr=False)
+    _transcript: Optional[str] = field(default=None, repr=False)
+    _transcript_window: Optional[int] = field(default=None, repr=False)
+    _condensed: List[str] = field(default_factory=list, repr=False)
+    _condensed_prefix: Optional[str] = field(default=None, repr=False)
+    _condensed_prefix_lines: int = field(default=0, repr=False)
+    _chars: int = field(default=0, repr=False)
+
+    def __post_init__(self) -> None:
+        if not self.lines:
+            self.lines.append(f"Goal: {self.goal}")
+        self._chars = sum(len(line) + 1 for line in self.lines)
+
+    @property
+    def approx_tokens(self) -> int:
+        """Estimated token count of the full transcript, tracked as lines are appended."""
+        return self._chars // _CHARS_PER_TOKEN
+
+    def append(self, *lines: str) -> None:
+        """Record pre-rendered transcript lines; a turn's lines are added in one call.
+
+        The transcript only ever grows at the end, so a cached full transcript is extended rather than rebuilt.
+        """
+        self.lines.extend(lines)
+        self._chars += sum(len(line) + 1 for line in lines)
+        if self._transcript is not None and self._transcript_window is None:
+            self._transcript = "\n".join((self._transcript, *lines))
+        else:
+            self._transcript = None
+
+    def replace_line(self, index: int, line: str) -> None:
+        """Swap an earlier line (e.g. for a summary); cached renderings from that line on are dropped."""
+        self._chars += len(line) - len(self.lines[index])
+        self.lines[index] = line
+        del self._condensed[max(index - 1, 0):]
+        self._condensed_prefix = None
+        self._transcript = None
+
+    def transcript(self, keep_last: Optional[int] = None) -> str:
+        """Joined transcript, rebuilt only after new lines were appended.
+
+        With ``keep_last``, only the goal and the most recent ``keep_last`` lines are kept verbatim;
+        older observations are condensed to short previews. Each line is condensed once and reused.
+        """
+        if self._transcript is not None and self._transcript_window == keep_last:
+            return self._transcript
+        if keep_last is None or len(self.lines) <= keep_last + 1:
+            self._transcript = "\n".join(self.lines)
+        else:
+            older_end = len(self.lines) - keep_last
+            for line in self.lines[len(self._condensed) + 1:older_end]:
+                self._condensed.append(_condense_line(line))
+            self._transcript = "\n".join([self._condensed_head(older_end - 1), *self.lines[older_end:]])
+        self._transcript_window = keep_last
+        return self._transcript
+
+    def _condensed_head(self, count: int) -> str:
+        """The goal line plus the first ``count`` condensed lines, joined.
+
+        Lines only ever move out of the recent window, so the joined head is extended in place as the window slides.
+        """
+        if self._condensed_prefix is None or self._condensed_prefix_lines > count:
+            self._condensed_prefix, self._condensed_prefix_lines = self.lines[0], 0
+        if self._condensed_prefix_lines < count:
+            self._condensed_prefix = "\n".join((self._condensed_prefix, *self._condensed[self._condensed_prefix_lines:count]))
+            self._condensed_prefix_lines = count
+        return self._condensed_prefix
+
+
+def _condense_line(line: str) -> str:
+    if line.startswith("OBSERVATION: ") and len(line) > _CONDENSED_OBSERVATION_CHARS:
+        return line[:_CONDENSED_OBSERVATION_CHARS] + "... [truncated]"
+    return line
+
 
 class ReACTReasoner(BaseReasoner):
     DEFAULT_MAX_TURNS = 20
@@ -27,155 +157,587 @@ class ReACTReasoner(BaseReasoner):
         memory: MutableMapping,
         max_turns: int = DEFAULT_MAX_TURNS,
         top_k: int = 25,
+        think_samples: int = 1,
+        response_cache: MutableMapping | None = None,
+        selection_similarity: float | None = None,
+        speculative: bool = False,
+        keep_last: int | None = None,
+        think_max_tokens: int | None = None,
+        fused_act: bool = False,
+        speculative_params: int = 0,
+        prefetch_load: bool = False,
+        transcript_budget_tokens: int | None = None,
+        max_tools_chars: int | None = None,
+        run_cache: MutableMapping | None = None,
+        run_cache_ttl: float | None = None,
+        catalogue_version: str | None = None,
+        observation_summary_llm: BaseLLM | None = None,
+        max_total_tokens: int | None = None,
     ) -> None:
         super().__init__(llm=llm, tools=tools, memory=memory)
         self.max_turns = max_turns
         self.top_k = top_k
+        self.think_samples = max(1, think_samples)
+        self.response_cache = response_cache
+        self._cache_stats: Counter = Counter()
+        # Opt-in: reuse a past tool choice when a new ACT query is at least this similar to an earlier one.
+        self.selection_similarity = selection_similarity
+        self._past_selections: Deque[Tuple[frozenset[str], str]] = deque(maxlen=256)
+        # Opt-in: overlap tool search with the think LLM call, at the cost of occasionally discarded searches.
+        self.speculative = speculative
+        self._executor: ThreadPoolExecutor | None = None
+        # Parameter schemas rarely change, so their JSON encoding is cached by tool id alongside the schema it encodes.
+        self._schema_json_cache: Dict[str, Tuple[Any, str]] = {}
+        # Opt-in: bound prompt size by keeping only this many recent transcript lines verbatim.
+        self.keep_last = keep_last
+        # Opt-in: cap think completions; a decision is a short JSON object, so runaway outputs are cut early.
+        self.think_max_tokens = think_max_tokens
+        # Opt-in: choose the tool and draft its parameters in a single LLM call.
+        self.fused_act = fused_act
+        # Opt-in: draft parameters for this many top candidates while tool selection runs (extra param_gen calls).
+        self.speculative_params = speculative_params
+        # Opt-in: load the top-ranked candidate while the selection call runs; wasted when another tool wins.
+        self.prefetch_load = prefetch_load
+        # Opt-in: once the transcript is estimated above this many tokens, condense older lines as keep_last does.
+        self.transcript_budget_tokens = transcript_budget_tokens
+        # Opt-in: cap the candidate list sent for tool selection; lower-ranked summaries are cut or dropped first.
+        self.max_tools_chars = max_tools_chars
+        # Opt-in: return a copy of the result of an earlier successful run of the same goal (and model) without
+        # reasoning again. Tools are not re-run on a hit, so only enable it for read-only goals.
+        self.run_cache = run_cache
+        self.run_cache_ttl = run_cache_ttl
+        # Part of the run cache key: bump it when the tool catalogue changes so stored runs stop matching.
+        self.catalogue_version = catalogue_version
+        # Opt-in: summarize large observations with this (ideally cheaper) model off the critical path.
+        # The next think call still sees an observation in full; later turns get the summary.
+        self.observation_summary_llm = observation_summary_llm
+        # Opt-in: stop reasoning once the LLM reports this many tokens spent during the run (checked between
+        # steps, so a run may overshoot by one step). Counts come from the shared LLM, so concurrent runs add up.
+        self.max_total_tokens = max_total_tokens
 
     @observe
     def run(self, goal: str) -> ReasoningResult:
         logger.info("ReACT reasoner started", goal=goal, max_turns=self.max_turns)
+        run_cache = self.run_cache
+        run_key = self._run_cache_key(goal) if run_cache is not None else ""
+        if run_cache is not None:
+            cached = run_cache.get(run_key)
+            if cached is not None and (self.run_cache_ttl is None or time.time() - cached[0] <= self.run_cache_ttl):
+                logger.info("run_cache_hit", goal=goal)
+                return _copy_result(cached[1])
 
-        reasoning_trace: List[str] = [f"Goal: {goal}"]
-        complete: bool = False
-        failed_tool_ids: List[str] = []
-        tool_calls: List[dict] = []
+        state = ReACTState(goal=goal)
         turns: int = 0
+        tokens_at_start = self.llm.tokens_used
+        self._cache_stats.clear()
+        # Search results are reused within a run only; the catalogue may change between runs.
+        self._search_cache.clear()
+        pending_summaries: List[Tuple[int, Future]] = []
 
         for _ in range(self.max_turns):
-            if complete:
+            if state.is_complete:
+                break
+            if self.max_total_tokens is not None and self.llm.tokens_used - tokens_at_start >= self.max_total_tokens:
+                logger.warning("token_budget_exhausted", max_total_tokens=self.max_total_tokens, turns=turns)
                 break
 
-            step_type, step_text = self._think("\n".join(reasoning_trace))
-            reasoning_trace.append(f"{step_type}: {step_text}")
+            speculation = self._speculate(state)
+            # Built once per turn: the think prompt and parameter generation share it (the ACT step text is passed separately).
+            transcript = state.transcript(self._transcript_window(state))
+            step_type, step_text, rationale = self._think(transcript)
+            # Only after a think call has seen an observation in full may it be swapped for its summary.
+            self._apply_summaries(state, pending_summaries)
+            if step_type == "THINK":
+                step_text = self._dedupe_thought(step_text, state.thought_tokens)
+            # An ACT's rationale arrives with it, saving a separate THINK round-trip.
+            state.append(*([f"THINK: {rationale}"] if rationale else []), f"{step_type}: {step_text}")
             turns += 1
 
             if step_type == "STOP":
-                reasoning_trace.append(f"FINAL ANSWER: {step_text}")
-                complete = True
+                if speculation is not None:
+                    speculation.cancel()
+                state.append(f"FINAL ANSWER: {step_text}")
+                state.is_complete = True
                 logger.info("reasoning_complete", reason="final_thought", turns=turns)
                 break
 
             if step_type == "ACT":
+                search_results, selected_tool = self._claim_speculation(speculation, state.last_action, step_text)
+                state.last_action, state.last_action_failed = step_text, True
                 try:
-                    tool, params, observation = self._act(step_text, "\n".join(reasoning_trace), failed_tool_ids)
-                    reasoning_trace.append(f"ACT_EXECUTED: tool={tool.get_summary()}")
-                    reasoning_trace.append(f"OBSERVATION: {str(observation)}")
-                    tool_calls.append({"tool_id": tool.id, "summary": tool.get_summary()})
-                    logger.info("tool_executed", tool_id=tool.id, params=params if isinstance(params, dict) else None, observation_preview=str(observation)[:200] + "..." if len(str(observation)) > 200 else observation)
+                    tool, params, observation = self._act(step_text, transcript, state.failed_tool_ids, search_results, selected_tool, state.execution_memo)
+                    state.last_action_failed = False
+                    tool_summary = tool.get_summary()
+                    observation_str = self._observation_text(observation)
+                    state.append(f"ACT_EXECUTED: tool={tool_summary}", f"OBSERVATION: {observation_str}")
+                    if self.observation_summary_llm is not None and len(observation_str) > _SUMMARIZE_OBSERVATION_CHARS:
+                        pending_summaries.append((len(state.lines) - 1, self._summarize_in_background(self.observation_summary_llm, step_text, observation_str)))
+                    state.tool_calls.append({"tool_id": tool.id, "summary": tool_summary})
+                    logger.info("tool_executed", tool_id=tool.id, params=params, observation_preview=observation_str[:200] + "..." if len(observation_str) > 200 else observation)
                 except ToolCredentialsMissingError as exc:
                     tid = getattr(getattr(exc, "tool", None), "id", None)
-                    if tid: failed_tool_ids.append(tid)
-                    reasoning_trace.append(f"Tool Unauthorized:{f' tool_id={tid}' if tid else ''} {exc}")
+                    if tid: state.failed_tool_ids.append(tid)
+                    state.append(f"Tool Unauthorized:{f' tool_id={tid}' if tid else ''} {exc}")
                     logger.warning("tool_unauthorized", error=str(exc))
                 except ToolSelectionError as exc:
-                    reasoning_trace.append(f"OBSERVATION: ERROR: ToolSelectionError: {str(exc)}")
+                    state.append(f"OBSERVATION: ERROR: ToolSelectionError: {str(exc)}")
                     logger.warning("tool_selection_failed", error=str(exc))
                 except ToolExecutionError as exc:
                     tid = getattr(getattr(exc, "tool", None), "id", None)
-                    if tid: failed_tool_ids.append(tid)
-                    reasoning_trace.append(f"OBSERVATION: ERROR: ToolExecutionError:{f' tool_id={tid}' if tid else ''} {exc}")
+                    if tid: state.failed_tool_ids.append(tid)
+                    state.append(f"OBSERVATION: ERROR: ToolExecutionError:{f' tool_id={tid}' if tid else ''} {exc}")
                     logger.error("tool_execution_failed", error=str(exc))
                 except ParameterGenerationError as exc:
-                    reasoning_trace.append(f"OBSERVATION: ERROR: ParameterGenerationError: {str(exc)}")
+                    state.append(f"OBSERVATION: ERROR: ParameterGenerationError: {str(exc)}")
                     logger.warning("param_generation_failed", error=str(exc))
                 except Exception as exc:
-                    reasoning_trace.append(f"OBSERVATION: ERROR: UnexpectedError: {str(exc)}")
+                    state.append(f"OBSERVATION: ERROR: UnexpectedError: {str(exc)}")
                     logger.error("tool_unexpected_error", error=str(exc), exc_info=True)
             else:
                 logger.info("thought_generated", thought=step_text)
+                if speculation is not None:
+                    speculation.cancel()
 
-        if not complete:
+        for _, future in pending_summaries:
+            future.cancel()
+        if not state.is_complete:
             logger.warning("max_turns_reached", max_turns=self.max_turns, turns=turns)
+        if self.response_cache is not None:
+            logger.info("response_cache_stats", hits=self._cache_stats["hits"], misses=self._cache_stats["misses"])
 
-        reasoning_transcript = "\n".join(reasoning_trace)
-        success = complete
-        return ReasoningResult(iterations=turns, success=success, transcript=reasoning_transcript, tool_calls=tool_calls)
+        result = ReasoningResult(iterations=turns, success=state.is_complete, transcript=state.transcript(), tool_calls=state.tool_calls)
+        if run_cache is not None and result.success:
+            run_cache[run_key] = (time.time(), _copy_result(result))
+        return result
+
+    def _run_cache_key(self, goal: str) -> str:
+        parts = ("react_run", str(getattr(self.llm, "model", "")), self.catalogue_version or "", goal)
+        return hashlib.sha256("\x00".join(parts).encode()).hexdigest()
+
+    def _transcript_window(self, state: ReACTState) -> Optional[int]:
+        """Lines to keep verbatim this turn: ``keep_last`` if set, else a fixed window once over the token budget."""
+        if self.keep_last is not None:
+            return self.keep_last
+        if self.transcript_budget_tokens is not None and state.approx_tokens > self.transcript_budget_tokens:
+            return _BUDGET_KEEP_LAST
+        return None
+
+    def _summarize_in_background(self, summary_llm: BaseLLM, step_text: str, observation_str: str) -> Future:
+        """Start summarizing a large observation with ``summary_llm`` on the worker pool."""
+        prompt = _TEMPLATES["observation_summary_input"].format(step=step_text, observation=observation_str)
+
+        def summarize() -> str:
+            summary = summary_llm.prompt(prompt, system=_SYSTEM["observation_summary"]).strip()
+            return f"OBSERVATION (summary): {summary}" if summary else ""
+
+        return self._pool().submit(summarize)
+
+    @staticmethod
+    def _apply_summaries(state: ReACTState, pending: List[Tuple[int, Future]]) -> None:
+        """Swap in finished observation summaries; unfinished ones are checked again next turn.
+
+        Only the run loop's thread touches ``state``, so summaries are applied here rather than from worker callbacks.
+        """
+        for entry in [p for p in pending if p[1].done()]:
+            pending.remove(entry)
+            index, future = entry
+            try:
+                summary_line = future.result()
+            except Exception as e:
+                logger.warning("observation_summary_failed", error=str(e))
+                continue
+            if summary_line:
+                state.replace_line(index, summary_line)
+                logger.info("observation_summarized", line=index, chars=len(summary_line))
+
+    @staticmethod
+    def _observation_text(observation: Any) -> str:
+        """Stringify an observation once for the transcript, capping oversized results."""
+        observation_str = str(observation)
+        if len(observation_str) <= _MAX_OBSERVATION_CHARS:
+            return observation_str
+        return f"{observation_str[:_MAX_OBSERVATION_CHARS]}... [truncated]"
 
     @observe
-    def _think(self, transcript: str) -> Tuple[str, str]:
-        VALID_STEP_TYPES = {"THINK", "ACT", "STOP"}
+    def _think(self, transcript: str) -> Tuple[str, str, Optional[str]]:
+        prompt = _TEMPLATES["think_input"].format(transcript=transcript)
+        if self.think_samples == 1:
+            decision = self._sample_think(prompt)
+        else:
+            # Independent samples run concurrently on the worker pool; the vote picks the consensus next step.
+            samples = [d for d in self._pool().map(self._sample_think, [prompt] * self.think_samples) if d]
+            decision = _vote_on_samples(samples)
+            logger.info("think_samples_aggregated", requested=self.think_samples, valid=len(samples), decision=decision[0] if decision else None)
+        return decision or ("THINK", "Continuing reasoning to determine next step.", None)
+
+    def _sample_think(self, prompt: str) -> Optional[Tuple[str, str, Optional[str]]]:
         try:
-            think_response = self.llm.prompt_to_json(_PROMPTS["think"].format(transcript=transcript), max_retries=0)
-            step_type = think_response.get("step_type").strip().upper()
+            if self.think_max_tokens is None:
+                think_response = self._cached_llm_call("think", (prompt,), lambda: self.llm.prompt_to_json(prompt, max_retries=0, system=_SYSTEM["think"]))
+            else:
+                think_response = self._cached_llm_call(
+                    f"think:max_tokens={self.think_max_tokens}",
+                    (prompt,),
+                    lambda: self.llm.prompt_to_json(prompt, max_retries=0, system=_SYSTEM["think"], max_tokens=self.think_max_tokens),
+                )
+            raw_step_type = think_response.get("step_type")
+            step_type = _STEP_TYPES.get(raw_step_type) or _STEP_TYPES.get(raw_step_type.strip().upper())
             text = think_response.get("text").strip()
-            if step_type in VALID_STEP_TYPES and text:
-                return step_type, text
-            logger.error("think_invalid_output", step_type=step_type, text_present=bool(text))
+            if step_type and text:
+                rationale = think_response.get("rationale") if step_type == "ACT" else None
+                return step_type, text, rationale.strip() if isinstance(rationale, str) and rationale.strip() else None
+            logger.error("think_invalid_output", step_type=raw_step_type, text_present=bool(text))
         except Exception as e:
             logger.error("think_parse_failed", error=str(e), exc_info=True)
-        return "THINK", "Continuing reasoning to determine next step."
+        return None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            # Room for every think sample alongside a speculative search, so neither waits on the other.
+            self._executor = ThreadPoolExecutor(max_workers=max(4, self.think_samples + 1), thread_name_prefix="react-speculative")
+        return self._executor
+
+    def close(self) -> None:
+        """Shut down the worker pool, cancelling queued speculation; a later run starts a new pool."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> "ReACTReasoner":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        if getattr(self, "_executor", None) is not None:
+            self.close()
+
+    def _speculate(self, state: ReACTState) -> Optional[Future]:
+        """Start work for the likely next ACT in the background while the think call runs.
+
+        After a failed ACT the model usually retries the same action, so the whole selection
+        (search, LLM pick, load) is worth speculating; otherwise only the cheap search is prefetched.
+        """
+        if not self.speculative or not state.last_action:
+            return None
+        if state.last_action_failed:
+            return self._pool().submit(self._select_tool, state.last_action, list(state.failed_tool_ids))
+        cached = self._search_cache.get((state.last_action, self.top_k))
+        if cached is not None:
+            # The previous ACT already searched this text (always so after a success); skip the thread hop.
+            done: Future = Future()
+            done.set_result(cached)
+            return done
+        return self._pool().submit(self._search, state.last_action, self.top_k)
+
+    @staticmethod
+    def _claim_speculation(future: Optional[Future], predicted: Optional[str], action_text: str) -> Tuple[Optional[List[ToolBase]], Optional[ToolBase]]:
+        """Return ``(search_results, selected_tool)`` from a matching speculation, or ``(None, None)``."""
+        if future is None or predicted is None:
+            return None, None
+        if jaccard_similarity(token_set(predicted), token_set(action_text)) < _SPECULATION_SIMILARITY:
+            future.cancel()
+            logger.info("speculation_discarded", predicted=predicted, actual=action_text)
+            return None, None
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.warning("speculation_failed", predicted=predicted, error=str(e))
+            return None, None
+        logger.info("speculation_reused", predicted=predicted, kind="selection" if isinstance(result, ToolBase) else "search")
+        return (None, result) if isinstance(result, ToolBase) else (result, None)
+
+    def _cached_llm_call(self, kind: str, key_parts: Sequence[str], call: Callable[[], Any]) -> Any:
+        """Serve an LLM call from ``response_cache`` when outputs are deterministic (temperature 0).
+
+        ``key_parts`` must identify everything the response depends on; usually that is just the prompt.
+        """
+        if self.response_cache is None or getattr(self.llm, "temperature", None) != 0:
+            return call()
+
+        key = hashlib.sha256("\x00".join((getattr(self.llm, 'model', ''), kind, *key_parts)).encode()).hexdigest()
+        if key in self.response_cache:
+            self._cache_stats["hits"] += 1
+            return self.response_cache[key]
+
+        self._cache_stats["misses"] += 1
+        response = call()
+        self.response_cache[key] = response
+        return response
+
+    def _dedupe_thought(self, text: str, thought_tokens: List[frozenset[str]]) -> str:
+        tokens = token_set(text)
+        if any(jaccard_similarity(tokens, prior) >= _DUPLICATE_THOUGHT_SIMILARITY for prior in thought_tokens):
+            logger.info("duplicate_thought_replaced", thought=text)
+            return _DUPLICATE_THOUGHT_NUDGE
+        thought_tokens.append(tokens)
+        return text
 
     @observe
-    def _act(self, action_text: str, transcript: str, failed_tool_ids: List[str]) -> Tuple[ToolBase, Dict[str, Any], Any]:
-        tool = self._select_tool(action_text, failed_tool_ids)
-        params = self._generate_params(tool, transcript, action_text)
-        observation = self.tools.execute(tool, params)
+    def _act(
+        self,
+        action_text: str,
+        transcript: str,
+        failed_tool_ids: List[str],
+        search_results: Optional[List[ToolBase]] = None,
+        selected_tool: Optional[ToolBase] = None,
+        execution_memo: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[ToolBase, Dict[str, Any], Any]:
+        if self.fused_act and selected_tool is None:
+            tool, params = self._select_tool_with_params(action_text, transcript, failed_tool_ids, search_results)
+        elif self.speculative_params and selected_tool is None:
+            tool, params = self._select_tool_drafting_params(action_text, transcript, failed_tool_ids, search_results)
+        else:
+            tool = selected_tool or self._select_tool(action_text, failed_tool_ids, search_results)
+            params = self._generate_params(tool, transcript, action_text)
+        observation = self._execute_tool(tool, params, execution_memo)
         return tool, params, observation
 
     @observe
-    def _select_tool(self, action_text: str, failed_tool_ids: List[str]) -> ToolBase:
-        tool_candidates = [t for t in self.tools.search(action_text, top_k=self.top_k) if t.id not in set(failed_tool_ids)]
-        logger.info("tool_search", query=action_text, top_k=self.top_k, candidate_count=len(tool_candidates))
+    def _select_tool(self, action_text: str, failed_tool_ids: List[str], search_results: Optional[List[ToolBase]] = None) -> ToolBase:
+        candidates_by_id = self._tool_candidates(action_text, failed_tool_ids, search_results)
+        top = next(iter(candidates_by_id.values()), None)
+        prefetched = self._pool().submit(self.tools.load, top) if self.prefetch_load and top is not None else None
+
+        chosen = self._choose_candidate(action_text, failed_tool_ids, candidates_by_id)
+        if prefetched is not None and top is not None:
+            if chosen.id == top.id:
+                logger.info("tool_prefetch_used", tool_id=chosen.id)
+                return prefetched.result()
+            prefetched.cancel()
+        return self.tools.load(chosen)
+
+    @observe
+    def _select_tool_drafting_params(
+        self,
+        action_text: str,
+        transcript: str,
+        failed_tool_ids: List[str],
+        search_results: Optional[List[ToolBase]] = None,
+    ) -> Tuple[ToolBase, Dict[str, Any]]:
+        """Draft parameters for the top candidates while the selection call runs; keep only the winner's."""
+        candidates_by_id = self._tool_candidates(action_text, failed_tool_ids, search_results)
+        pool = self._pool()
+        drafts = {
+            t.id: pool.submit(self._load_and_generate_params, t, transcript, action_text)
+            for t in islice(candidates_by_id.values(), self.speculative_params)
+        }
+        chosen: Optional[ToolBase] = None
+        try:
+            chosen = self._choose_candidate(action_text, failed_tool_ids, candidates_by_id)
+        finally:
+            for tool_id, draft in drafts.items():
+                if chosen is None or tool_id != chosen.id:
+                    draft.cancel()
+
+        chosen_draft = drafts.get(chosen.id)
+        if chosen_draft is None:
+            tool = self.tools.load(chosen)
+            return tool, self._generate_params(tool, transcript, action_text)
+        logger.info("speculative_params_used", tool_id=chosen.id, drafted=len(drafts))
+        return chosen_draft.result()
+
+    def _load_and_generate_params(self, candidate: ToolBase, transcript: str, step_text: str) -> Tuple[ToolBase, Dict[str, Any]]:
+        tool = self.tools.load(candidate)
+        return tool, self._generate_params(tool, transcript, step_text)
+
+    def _choose_candidate(self, action_text: str, failed_tool_ids: List[str], candidates_by_id: Dict[str, ToolBase]) -> ToolBase:
+        remembered = self._recall_selection(action_text, candidates_by_id)
+        if remembered is not None:
+            return remembered
+
+        tools_json = self._tools_block(candidates_by_id)
+        prompt = _TEMPLATES["tool_select_input"].format(step=action_text, tools_json=tools_json) + _failed_tools_block(failed_tool_ids)
+        # Keyed on the query, the ranked candidate ids and a digest of their summaries, so a changed catalogue misses.
+        key_parts = (action_text, *candidates_by_id, hashlib.sha256(tools_json.encode()).hexdigest(), "failed:", *failed_tool_ids[-3:])
+        selected_tool_id = self._cached_llm_call("tool_select", key_parts, lambda: self.llm.prompt(prompt, system=_SYSTEM["tool_select"])).strip()
+        return self._resolve_selected(action_text, selected_tool_id, candidates_by_id)
+
+    @observe
+    def _select_tool_with_params(
+        self,
+        action_text: str,
+        transcript: str,
+        failed_tool_ids: List[str],
+        search_results: Optional[List[ToolBase]] = None,
+    ) -> Tuple[ToolBase, Dict[str, Any]]:
+        """Pick a tool and draft its parameters in one LLM call.
 
-        tools_json = "\n".join(t.get_summary() for t in tool_candidates)
-        prompt = _PROMPTS["tool_select"].format(step=action_text, tools_json=tools_json)
-        if failed_tool_ids:
-            failed_block = "\n".join(f"- {tid}" for tid in failed_tool_ids[-3:])
-            prompt += f"\n\n<failed_tools>\n{failed_block}\n</failed_tools>\n"
-        selected_tool_id = self.llm.prompt(prompt).strip()
+        Search results carry summaries, not schemas, so the drafted parameters are checked against the
+        loaded tool's schema; only when they fail that check does a dedicated param_gen call run.
+        """
+        candidates_by_id = self._tool_candidates(action_text, failed_tool_ids, search_results)
+        remembered = self._recall_selection(action_text, candidates_by_id)
+        if remembered is not None:
+            tool = self.tools.load(remembered)
+            return tool, self._generate_params(tool, transcript, action_text)
 
+        tools_json = self._tools_block(candidates_by_id)
+        prompt = _TEMPLATES["tool_select_params_input"].format(
+            step=action_text,
+            tools_json=tools_json,
+            data=f"<reasoning_trace>\n{transcript}\n</reasoning_trace>",
+        ) + _failed_tools_block(failed_tool_ids)
+        try:
+            response = self._cached_llm_call("tool_select_params", (prompt,), lambda: self.llm.prompt_to_json(prompt, max_retries=1, system=_SYSTEM["tool_select_params"])) or {}
+        except (json.JSONDecodeError, ValueError) as e:
+            raise ToolSelectionError(f"Failed to parse tool selection for step: {action_text}: {e}") from e
+        tool = self.tools.load(self._resolve_selected(action_text, str(response.get("tool_id") or "").strip(), candidates_by_id))
+
+        drafted = response.get("params")
+        try:
+            allowed_keys, required_keys = _parameter_keys(tool, tool.get_parameter_schema())
+            return tool, self._validate_params(tool, drafted if isinstance(drafted, dict) else {}, action_text, allowed_keys, required_keys)
+        except ParameterGenerationError as e:
+            logger.info("fused_params_rejected", tool_id=tool.id, reason=str(e))
+            return tool, self._generate_params(tool, transcript, action_text)
+
+    def _tool_candidates(self, action_text: str, failed_tool_ids: List[str], search_results: Optional[List[ToolBase]]) -> Dict[str, ToolBase]:
+        if search_results is None:
+            search_results = self._search(action_text, self.top_k)
+        excluded_ids = set(failed_tool_ids)
+        candidates_by_id = {t.id: t for t in search_results if t.id not in excluded_ids}
+        logger.info("tool_search", query=action_text, top_k=self.top_k, candidate_count=len(candidates_by_id))
+        return candidates_by_id
+
+    def _resolve_selected(self, action_text: str, selected_tool_id: str, candidates_by_id: Dict[str, ToolBase]) -> ToolBase:
         if not selected_tool_id or selected_tool_id.lower() == "none":
             raise ToolSelectionError(f"No suitable tool selected for step: {action_text}")
 
-        selected_tool = next((t for t in tool_candidates if t.id == selected_tool_id), None)
+        selected_tool = candidates_by_id.get(selected_tool_id)
+        if selected_tool is None:
+            # Tolerate ids wrapped in quotes or extra words; longest ids first so "t1" cannot shadow "t10".
+            contained = next((tid for tid in sorted(candidates_by_id, key=len, reverse=True) if tid in selected_tool_id), None)
+            selected_tool = candidates_by_id.get(contained) if contained else None
         if selected_tool is None:
             raise ToolSelectionError(f"Selected tool id '{selected_tool_id}' not in candidate list")
 
-        return self.tools.load(selected_tool)
+        if self.selection_similarity is not None:
+            self._past_selections.append((token_set(action_text), selected_tool.id))
+        return selected_tool
+
+    def _tools_block(self, candidates_by_id: Dict[str, ToolBase]) -> str:
+        """Candidate summaries in search-rank order, one per line, within ``max_tools_chars`` when set."""
+        if self.max_tools_chars is None:
+            return "\n".join(t.get_summary() for t in candidates_by_id.values())
+
+        lines: List[str] = []
+        remaining = self.max_tools_chars
+        for tool in candidates_by_id.values():
+            summary = tool.get_summary()
+            if len(summary) > remaining:
+                # A cut summary is only worth sending if its id and name survive the cut.
+                if remaining >= _MIN_TRUNCATED_SUMMARY_CHARS:
+                    lines.append(summary[:remaining - 3] + "...")
+                break
+            lines.append(summary)
+            remaining -= len(summary) + 1
+        if len(lines) < len(candidates_by_id):
+            logger.info("tool_candidates_trimmed", kept=len(lines), candidates=len(candidates_by_id), max_chars=self.max_tools_chars)
+        return "\n".join(lines)
+
+    def _recall_selection(self, action_text: str, candidates_by_id: Dict[str, ToolBase]) -> Optional[ToolBase]:
+        if self.selection_similarity is None or not self._past_selections:
+            return None
+        query_tokens = token_set(action_text)
+        similarity, tool_id = max((jaccard_similarity(query_tokens, tokens), tid) for tokens, tid in self._past_selections)
+        if similarity < self.selection_similarity:
+            return None
+        recalled = candidates_by_id.get(tool_id)
+        if recalled is not None:
+            logger.info("tool_selection_recalled", query=action_text, tool_id=tool_id, similarity=round(similarity, 3))
+        return recalled
 
     @observe
     def _generate_params(self, tool: ToolBase, transcript: str, step_text: str) -> Dict[str, Any]:
         param_schema = tool.get_parameter_schema()
+        allowed_keys, required_keys = _parameter_keys(tool, param_schema)
 
-        allowed_keys = []
-        if hasattr(tool, 'get_parameter_keys'):
-            allowed_keys = tool.get_parameter_keys()
-        elif isinstance(param_schema, dict):
-            allowed_keys = param_schema.keys()
-
-        required_keys = tool.get_required_parameter_keys() if hasattr(tool, 'get_required_parameter_keys') else []
-
-        data: Dict[str, Any] = {"reasoning trace": transcript}
         try:
-            params_raw = self.llm.prompt_to_json(
-                _PROMPTS["param_gen"].format(
-                    step=step_text,
-                    data=json.dumps(data, ensure_ascii=False),
-                    schema=json.dumps(param_schema, ensure_ascii=False),
-                    allowed_keys=",".join(allowed_keys),
-                    required_keys=",".join(required_keys),
-                ),
-                max_retries=2,
-            ) or {}
-            final_params: Dict[str, Any] = {k: v for k, v in params_raw.items() if k in allowed_keys}
-            
-            unknown_params = [key for key, val in final_params.items() if val == "<UNKNOWN>"]
-            missing_params = [key for key in required_keys if key not in final_params]
-            
-            if unknown_params or missing_params:
-                error_message_parts = []
-                if unknown_params: error_message_parts.append(f"LLM indicated missing data using <UNKNOWN> for parameters: {', '.join(unknown_params)}")
-                if missing_params: error_message_parts.append(f"Missing required parameters: {', '.join(missing_params)}")
-
-                param_gen_error = f"{' | '.join(error_message_parts)} in step '{step_text}'. Generated parameters: {final_params}. Tool '{tool.id}' requires these parameters for successful execution."
-                logger.error("parameter_generation_failed", error = param_gen_error, step_text=step_text, tool_id=tool.id, generated_parameters=final_params, required_parameters=required_keys)
-                raise ParameterGenerationError(f"{' | '.join(error_message_parts)} in step '{step_text}'. Generated parameters: {final_params}. Tool '{tool.id}' requires these parameters for successful execution.", tool)
-            
-            logger.info("params_generated", tool_id=tool.id, params=final_params)
-            return final_params
+            schema_json = self._schema_json(tool.id, param_schema)
+            prompt = _TEMPLATES["param_gen_input"].format(
+                step=step_text,
+                # The transcript is already text; embedding it directly avoids JSON-escaping it every turn.
+                data=f"<reasoning_trace>\n{transcript}\n</reasoning_trace>",
+                schema=schema_json,
+                allowed_keys=",".join(allowed_keys),
+                required_keys=",".join(required_keys),
+            )
+            # Keyed on what parameters are drawn from (goal, step, schema, latest observation), not the whole transcript.
+            key_parts = (tool.id, step_text, schema_json, transcript.partition("\n")[0], hashlib.sha256(_last_observation(transcript).encode()).hexdigest())
+            params_raw = self._cached_llm_call("param_gen", key_parts, lambda: self.llm.prompt_to_json(prompt, max_retries=1, system=_SYSTEM["param_gen"])) or {}
+            return self._validate_params(tool, params_raw, step_text, allowed_keys, required_keys)
 
         except (json.JSONDecodeError, TypeError, ValueError, AttributeError) as e:
             raise ParameterGenerationError(f"Failed to generate valid JSON parameters for step '{step_text}': {e}", tool) from e
 
+    def _schema_json(self, tool_id: str, param_schema: Any) -> str:
+        """Sorted, compact schema JSON; byte-identical across turns so prompt prefixes stay cacheable.
+
+        A reloaded tool whose schema changed is re-encoded; comparing schemas is cheaper than encoding them.
+        """
+        cached = self._schema_json_cache.get(tool_id)
+        if cached is not None and (cached[0] is param_schema or cached[0] == param_schema):
+            return cached[1]
+        schema_json = fast_json.dumps(param_schema, sort_keys=True)
+        self._schema_json_cache[tool_id] = (param_schema, schema_json)
+        return schema_json
+
+    def _validate_params(self, tool: ToolBase, params_raw: Dict[str, Any], step_text: str, allowed_keys: Any, required_keys: Any) -> Dict[str, Any]:
+        final_params: Dict[str, Any] = {k: v for k, v in params_raw.items() if k in allowed_keys}
+
+        unknown_params = [key for key, val in final_params.items() if val == "<UNKNOWN>"]
+        missing_params = [key for key in required_keys if key not in final_params]
+
+        if unknown_params or missing_params:
+            error_message_parts = []
+            if unknown_params: error_message_parts.append(f"LLM indicated missing data using <UNKNOWN> for parameters: {', '.join(unknown_params)}")
+            if missing_params: error_message_parts.append(f"Missing required parameters: {', '.join(missing_params)}")
+
+            param_gen_error = f"{' | '.join(error_message_parts)} in step '{step_text}'. Generated parameters: {final_params}. Tool '{tool.id}' requires these parameters for successful execution."
+            logger.error("parameter_generation_failed", error = param_gen_error, step_text=step_text, tool_id=tool.id, generated_parameters=final_params, required_parameters=required_keys)
+            raise ParameterGenerationError(param_gen_error, tool)
+
+        logger.info("params_generated", tool_id=tool.id, params=final_params)
+        return final_params
+
+
+def _parameter_keys(tool: ToolBase, param_schema: Any) -> Tuple[Any, Any]:
+    """Allowed and required parameter keys for *tool*."""
+    allowed_keys: Any = []
+    if hasattr(tool, 'get_parameter_keys'):
+        allowed_keys = tool.get_parameter_keys()
+    elif isinstance(param_schema, dict):
+        allowed_keys = param_schema.keys()
+
+    required_keys = tool.get_required_parameter_keys() if hasattr(tool, 'get_required_parameter_keys') else []
+    return allowed_keys, required_keys
+
+
+def _last_observation(transcript: str) -> str:
+    start = transcript.rfind("OBSERVATION: ")
+    return transcript[start:].partition("\n")[0] if start != -1 else ""
+
+
+def _copy_result(result: ReasoningResult) -> ReasoningResult:
+    """Copy of a run-cache entry, so callers editing a returned result cannot change what later hits see."""
+    return replace(result, tool_calls=[dict(call) for call in result.tool_calls])
+
+
+def _failed_tools_block(failed_tool_ids: List[str]) -> str:
+    if not failed_tool_ids:
+        return ""
+    failed_block = "\n".join(f"- {tid}" for tid in failed_tool_ids[-3:])
+    return f"\n\n<failed_tools>\n{failed_block}\n</failed_tools>\n"
+
 
+def _vote_on_samples(samples: List[Tuple[str, str, Optional[str]]]) -> Optional[Tuple[str, str, Optional[str]]]:
+    """Pick the modal step type, then the sample whose text is most similar to the rest of its group."""
+    if not samples:
+        return None
+    step_type = Counter(sample[0] for sample in samples).most_common(1)[0][0]
+    group = [sample for sample in samples if sample[0] == step_type]
+    tokens = [token_set(sample[1]) for sample in group]
+    best = max(range(len(group)), key=lambda i: sum(jaccard_similarity(tokens[i], other) for other in tokens))
+    return group[best]
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 import re
+import threading
+import time
 from collections import deque
 from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Deque, Dict, List, Optional
-from copy import deepcopy
+from functools import cached_property
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 from agents.reasoner.base import BaseReasoner, ReasoningResult
 from agents.llm.base_llm import BaseLLM
@@ -15,12 +20,132 @@ from agents.tools.base import JustInTimeToolingBase, ToolBase
 from agents.tools.jentic import JenticTool
 from agents.tools.exceptions import ToolError, ToolCredentialsMissingError
 from agents.reasoner.exceptions import (ReasoningError, ToolSelectionError, ParameterGenerationError)
+from utils import fast_json
+from utils.text import jaccard_similarity, token_set
 from utils.observability import observe
 from utils.logger import get_logger
 logger = get_logger(__name__)
 
-from agents.prompts import load_prompts
-_PROMPTS = load_prompts("reasoners/rewoo", required_prompts=["plan", "classify_step", "reason", "tool_select", "param_gen", "reflect", "reflect_alternatives"])
+from agents.prompts import compile_prompt, load_prompts
+_PROMPT_NAMES = ("plan", "classify_step", "classify_steps", "classify_and_select", "reason", "tool_select", "param_gen", "reflect")
+_PROMPTS = load_prompts("reasoners/rewoo", required_prompts=[*_PROMPT_NAMES, *(f"{name}_input" for name in _PROMPT_NAMES), "reflect_alternatives", "plan_repair"])
+# Parsed once at import; formatting then only joins the literal parts with the field values.
+_TEMPLATES = {name: compile_prompt(text) for name, text in _PROMPTS.items()}
+# Each prompt is a static system part plus a short *_input template; the static part goes out byte-identical
+# as the system message so providers can serve it from their prompt cache.
+_SYSTEM = {name: _TEMPLATES[name].format() for name in _PROMPT_NAMES}
+# Part of every plan cache key, so editing the planner prompt invalidates cached plans
+_PLAN_PROMPT_HASH = hashlib.sha256((_PROMPTS["plan"] + _PROMPTS["plan_input"]).encode()).hexdigest()
+
+# Plan bullets ("- ", "* ", "+ " or "1. ") and their "(input: a, b)" / "(output: c)" directives
+# Multiline so one finditer walks the whole plan; [^\S\r\n] is whitespace that cannot run onto the next line.
+_BULLET_RE = re.compile(r"^[^\S\r\n]*(?:[-*+][^\S\r\n]|\d+\.[^\S\r\n])(.*)$", re.MULTILINE)
+_IO_RE = re.compile(r"\((input|output):\s*([^)]*)\)")
+# Labels in a batched classification reply, one per step
+_STEP_TYPE_RE = re.compile(r"\b(TOOL|REASONING)\b", re.I)
+_TOOL_VERBS = re.compile(r"\b(search|fetch|send|post|get|call|query|create|delete|update|list)\b", re.I)
+_REASONING_VERBS = re.compile(r"\b(summariz|format|extract|analyz|transform|compute|combine|filter|rank|sort|compar)\w*\b", re.I)
+# Leading words checked for the step's own verb when both verb families appear in a step
+_LEADING_VERB_WORDS = 3
+# Reply shape of the reflection prompt, for structured output
+_REFLECTION_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "reasoning": {"type": "string"},
+        "action": {"type": "string", "enum": ["retry_params", "change_tool", "rephrase_step", "give_up"]},
+        "tool_id": {"type": "string"},
+        "params": {"type": "object"},
+        "step": {"type": "string"},
+    },
+    "required": ["action"],
+}
+# Distinct searches kept across runs with keep_search_results before they are all dropped
+_MAX_KEPT_SEARCHES = 512
+# Characters of a step result, reflection decision or error kept per history entry (~8KB), capping transcript growth
+_HISTORY_VALUE_CHARS = 8124
+# Characters of a bullet-less planner reply quoted back in the repair prompt
+_PLAN_REPAIR_CONTEXT_CHARS = 500
+# Smallest per-value share of the input budget when a container's budget is split among its items
+_MIN_PROJECTED_CHARS = 200
+
+
+def _classify_by_verbs(text: str) -> Optional[str]:
+    """TOOL or REASONING when exactly one verb family appears in ``text``, or else when one of the leading
+    words is a verb of one family (``"Send the summarized report"``); None when ambiguous."""
+    is_tool = _TOOL_VERBS.search(text) is not None
+    is_reasoning = _REASONING_VERBS.search(text) is not None
+    if is_tool != is_reasoning:
+        return "TOOL" if is_tool else "REASONING"
+    if is_tool:
+        for word in text.split(None, _LEADING_VERB_WORDS)[:_LEADING_VERB_WORDS]:
+            if _TOOL_VERBS.fullmatch(word):
+                return "TOOL"
+            if _REASONING_VERBS.fullmatch(word):
+                return "REASONING"
+    return None
+
+
+def _strip_plan_fence(reply: Optional[str]) -> str:
+    return (reply or "").strip("`").lstrip("markdown").strip()
+
+
+def _head_str(obj: Any, n: int = 100) -> Optional[str]:
+    """``str(obj)[:n]`` without rendering all of a large list, tuple or dict first; None stays None."""
+    if obj is None:
+        return None
+    if isinstance(obj, str):
+        return obj[:n]
+    return _bounded_repr(obj, n)[:n]
+
+
+_BRACKETS: Dict[type, Tuple[str, str]] = {list: ("[", "]"), tuple: ("(", ")"), dict: ("{", "}")}
+
+
+def _bounded_repr(obj: Any, n: int) -> str:
+    """A prefix of ``repr(obj)`` at least ``n`` characters long (or all of it); containers stop early."""
+    if isinstance(obj, str):
+        return repr(obj[:n])
+    if type(obj) not in (list, tuple, dict) or (isinstance(obj, tuple) and len(obj) == 1):
+        return repr(obj)
+    opening, closing = _BRACKETS[type(obj)]
+    parts = [opening]
+    size = 1
+    for i, item in enumerate(obj.items() if isinstance(obj, dict) else obj):
+        if size >= n:
+            return "".join(parts)
+        if isinstance(obj, dict):
+            piece = f"{_bounded_repr(item[0], n - size)}: {_bounded_repr(item[1], n - size)}"
+        else:
+            piece = _bounded_repr(item, n - size)
+        if i:
+            piece = ", " + piece
+        parts.append(piece)
+        size += len(piece)
+    parts.append(closing)
+    return "".join(parts)
+
+
+def _project_inputs(inputs: Dict[str, Any], step_text: str, max_chars: int) -> Dict[str, Any]:
+    """Shrink step inputs for a prompt: long strings are cut to ``max_chars`` and lists of records keep
+    only the fields the step mentions (all fields when it mentions none). Containers share the budget."""
+    step_lower = step_text.lower()
+    return {key: _project(value, step_lower, max_chars) for key, value in inputs.items()}
+
+
+def _project(value: Any, step_lower: str, budget: int) -> Any:
+    if isinstance(value, str):
+        return value if len(value) <= budget else value[:budget] + "…"
+    if isinstance(value, dict):
+        share = max(min(budget, _MIN_PROJECTED_CHARS), budget // max(1, len(value)))
+        return {k: _project(v, step_lower, share) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, dict) for item in value):
+            fields = {k for item in value for k in item if isinstance(k, str) and re.search(rf"\b{re.escape(k.lower())}", step_lower)}
+            if fields:
+                value = [{k: v for k, v in item.items() if k in fields} for item in value]
+        share = max(min(budget, _MIN_PROJECTED_CHARS), budget // max(1, len(value)))
+        return [_project(item, step_lower, share) for item in value]
+    return value
 
 # ReWOO-specific exception for missing plan inputs
 class MissingInputError(ReasoningError, KeyError):
@@ -37,7 +162,7 @@ class StepStatus(str, Enum):
     FAILED = "failed"
 
 
-@dataclass
+@dataclass(slots=True)
 class Step:
     text: str
     status: StepStatus = StepStatus.PENDING
@@ -46,16 +171,74 @@ class Step:
     input_keys: List[str] = field(default_factory=list)
     error: Optional[str] = None
     retry_count: int = 0
+    deps: frozenset[int] = frozenset()  # plan indices of every step this one transitively reads from
+    index: Optional[int] = None  # position in the original plan, kept by retries
+    step_type: Optional[str] = None  # TOOL/REASONING label decided before execution (batch_classification)
+    _suggestion: Optional[Tuple[str, str]] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def suggestion_key(self) -> str:
+        """Memory key of the reflector's suggestion for this step; rebuilt only when ``text`` is reassigned."""
+        if self._suggestion is None or self._suggestion[0] is not self.text:
+            self._suggestion = (self.text, f"rewoo_reflector_suggestion:{self.text}")
+        return self._suggestion[1]
+
+    def clone_for_retry(self) -> "Step":
+        """A pending copy of this step for another attempt; keeps the last error for context."""
+        return Step(
+            text=self.text,
+            output_key=self.output_key,
+            input_keys=list(self.input_keys),
+            error=self.error,
+            retry_count=self.retry_count + 1,
+            deps=self.deps,
+            index=self.index,
+        )
+
 
+@dataclass(frozen=True)
+class _ToolSchema:
+    """A tool's parameter schema with everything parameter generation derives from it."""
+    schema: Any
+    allowed_keys: Tuple[str, ...]
+    allowed_set: frozenset[str]
+    allowed_str: str
+    required_keys: Tuple[str, ...]
+    required_str: str
 
-@dataclass
+    @cached_property
+    def schema_json(self) -> str:
+        """Encoded on first use: reflector-suggested parameters and direct parameters never prompt with it."""
+        return fast_json.dumps(self.schema)
+
+
+@dataclass(slots=True)
 class ReasonerState:
     goal: str
-    plan: Deque[Step] = field(default_factory=deque)
+    plan: List[Step] = field(default_factory=list)
+    plan_head: int = 0  # index of the next step to run; steps before it were already taken
     history: List[str] = field(default_factory=list)
     is_complete: bool = False
     tool_calls: List[dict] = field(default_factory=list)
 
+    @property
+    def remaining(self) -> int:
+        """Number of plan steps not yet taken."""
+        return len(self.plan) - self.plan_head
+
+    def pop_step(self) -> Step:
+        step = self.plan[self.plan_head]
+        self.plan_head += 1
+        return step
+
+    def push_front(self, step: Step) -> None:
+        """Queue ``step`` to run next, reusing the slot of the step taken before it when there is one."""
+        if self.plan_head:
+            self.plan_head -= 1
+            self.plan[self.plan_head] = step
+        else:
+            self.plan.insert(0, step)
+
 
 class ReWOOReasoner(BaseReasoner):
     DEFAULT_MAX_ITER = 20
@@ -69,15 +252,88 @@ class ReWOOReasoner(BaseReasoner):
         max_iterations: int = DEFAULT_MAX_ITER,
         max_retries: int = 2,
         top_k: int = 25,
+        max_parallel_steps: int | None = None,
+        fused_routing: bool = False,
+        verb_classification: bool = False,
+        max_input_chars: Optional[int] = None,
+        lazy_alternatives: bool = False,
+        direct_params: bool = False,
+        structured_output: bool = False,
+        plan_cache: MutableMapping | None = None,
+        plan_cache_ttl: float | None = None,
+        classification_similarity: float | None = None,
+        keep_search_results: bool = False,
+        batch_classification: bool = False,
+        plan_repair: bool = False,
+        prefetch_alternatives: bool = False,
     ) -> None:
         super().__init__(llm=llm, tools=tools, memory=memory)
         self.max_iterations = max_iterations
         self.max_retries = max_retries
         self.top_k = top_k
+        # Opt-in: run up to this many consecutive, mutually independent plan steps at once.
+        # Defaults to the TOOL_CONCURRENCY_LIMIT environment variable, else 1.
+        if max_parallel_steps is None:
+            max_parallel_steps = int(os.getenv("TOOL_CONCURRENCY_LIMIT", "1"))
+        self.max_parallel_steps = max(1, max_parallel_steps)
+        self._executor: ThreadPoolExecutor | None = None
+        # Opt-in: classify a step and pick its tool in one LLM call (each step then searches tools up front).
+        self.fused_routing = fused_routing
+        # Opt-in: classify steps with an unambiguous action verb without an LLM call.
+        self.verb_classification = verb_classification
+        # Opt-in: project step inputs to the fields the step mentions and cut long values before prompting.
+        self.max_input_chars = max_input_chars
+        # Opt-in: reflect on parameter-level failures without searching for alternative tools unless a tool change is chosen.
+        self.lazy_alternatives = lazy_alternatives
+        # Opt-in (with lazy_alternatives): search for alternative tools in the background while that first
+        # reflection call runs, so a tool change does not wait for the search afterwards.
+        self.prefetch_alternatives = prefetch_alternatives
+        # Opt-in: skip parameter generation for parameter-free tools, and pass a tool's single required parameter
+        # straight from a same-named step input, without an LLM call.
+        self.direct_params = direct_params
+        # Opt-in: ask the LLM for schema-constrained JSON parameters and reflections (providers that cannot
+        # enforce a schema fall back to JSON mode, so the usual parse retries still apply).
+        self.structured_output = structured_output
+        # Opt-in: reuse the raw plan of an earlier run of the same goal (and model) instead of asking the planner
+        # again; the text is re-parsed on every hit. A shelve.open() mapping keeps plans across processes.
+        self.plan_cache = plan_cache
+        self.plan_cache_ttl = plan_cache_ttl
+        # Opt-in: reuse an earlier TOOL/REASONING label when a step's text is at least this similar to a classified one.
+        self.classification_similarity = classification_similarity
+        self._past_classifications: Deque[Tuple[frozenset[str], str]] = deque(maxlen=256)
+        # Opt-in: keep tool search results across runs (up to _MAX_KEPT_SEARCHES queries); call
+        # clear_search_results() after the tool catalog changes.
+        self.keep_search_results = keep_search_results
+        # Opt-in: classify all steps of a parallel wave with one LLM call instead of one call per step.
+        # Not used with fused_routing, which classifies while selecting each step's tool.
+        self.batch_classification = batch_classification
+        # Opt-in: when the planner reply has no bullets, ask once more with a short repair prompt quoting the reply
+        # instead of running the whole goal as a single step.
+        self.plan_repair = plan_repair
+        # Candidates by id and their joined summaries per search, so a retried step's selection is not rebuilt.
+        self._candidate_index: Dict[Tuple[str, int], Tuple[Dict[str, ToolBase], str]] = {}
+        # Derived parameter schema per tool id
+        self._schema_cache: Dict[str, _ToolSchema] = {}
+        # Encoded step input values by memory key, with the value they encode; a value read by several steps
+        # (or retries) is encoded once per run.
+        self._encoded_inputs: Dict[str, Tuple[Any, str]] = {}
+        # Joined memory keys for the routing prompts, rebuilt only after this reasoner writes to memory (or its size changes).
+        self._memory_version = 0
+        # Guards memory writes and the version counter; steps of a parallel wave run on pool threads.
+        self._memory_lock = threading.Lock()
+        # Loaded tool definitions by id for the current run; a retried step reloads the tool it just used.
+        self._loaded_tools: Dict[str, ToolBase] = {}
+        self._memory_keys_joined: Optional[Tuple[Tuple[int, int], str]] = None
 
     @observe
     def run(self, goal: str) -> ReasoningResult:
         state = ReasonerState(goal=goal)
+        # A retried step searches again with the same text (selection and reflection); reuse results within this run.
+        if not self.keep_search_results or len(self._search_cache) > _MAX_KEPT_SEARCHES:
+            self.clear_search_results()
+        self._encoded_inputs.clear()
+        self._loaded_tools.clear()
+        self._memory_keys_joined = None  # memory may have changed between runs
 
         # Plan
         state.plan = self._plan(goal)
@@ -85,77 +341,190 @@ class ReWOOReasoner(BaseReasoner):
             raise RuntimeError("Planner produced an empty plan")
 
         iterations = 0
+        max_iterations, next_wave, execute = self.max_iterations, self._next_wave, self._execute
 
         # Execute with reflection
-        while state.plan and iterations < self.max_iterations and not state.is_complete:
-            step = state.plan.popleft()
-            try:
-                self._execute(step, state)
-                iterations += 1
-            except (ReasoningError, ToolError) as exc:
-                if isinstance(exc, ToolCredentialsMissingError):
-                    state.history.append(f"Tool Unauthorized: {str(exc)}")
-
-                if isinstance(exc, MissingInputError):
-                    state.history.append(f"Stopping: missing dependency '{getattr(exc, 'missing_key', None)}' for step '{step.text}'. Proceeding to final answer.")
-                    break
-
-                self._reflect(exc, step, state)
+        while state.remaining and iterations < max_iterations and not state.is_complete:
+            wave = next_wave(state, max_iterations - iterations)
+            if len(wave) == 1:
+                try:
+                    execute(wave[0], state)
+                    outcomes: List[Tuple[Step, Optional[Exception]]] = [(wave[0], None)]
+                except (ReasoningError, ToolError) as exc:
+                    outcomes = [(wave[0], exc)]
+            else:
+                if self.batch_classification and not self.fused_routing:
+                    self._classify_wave(wave)
+                # Each step records into its own scratch state, merged below in plan order, so the
+                # transcript does not depend on which thread finished first.
+                scratch = [ReasonerState(goal=goal) for _ in wave]
+                outcomes = list(zip(wave, self._pool().map(self._try_execute, wave, scratch)))
+                for step_state in scratch:
+                    state.history.extend(step_state.history)
+                    state.tool_calls.extend(step_state.tool_calls)
+
+            stop = False
+            # Failures are handled last-first: each reflection pushes its retry onto the front of the plan.
+            for step, error in reversed(outcomes):
+                if error is None:
+                    iterations += 1
+                else:
+                    stop = self._handle_step_error(error, step, state) or stop
+            if stop:
+                break
 
         transcript = "\n".join(state.history)
-        success = not state.plan
+        success = not state.remaining
         return ReasoningResult(iterations=iterations, success=success, transcript=transcript, tool_calls=state.tool_calls)
 
+    def clear_search_results(self) -> None:
+        """Forget memoized tool searches and the selection prompts built from them."""
+        self._search_cache.clear()
+        self._candidate_index.clear()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_parallel_steps, thread_name_prefix="rewoo-steps")
+        return self._executor
+
+    def close(self) -> None:
+        """Shut down the worker pool, cancelling queued work; a later run starts a new pool."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> "ReWOOReasoner":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        if getattr(self, "_executor", None) is not None:
+            self.close()
+
+    def _next_wave(self, state: ReasonerState, budget: int) -> List[Step]:
+        """Pop up to ``max_parallel_steps`` queued steps that depend on no step queued before them.
+
+        Steps waiting on an earlier queued step are looked past rather than ending the wave; taken steps move
+        ahead of them, so the steps left behind keep their relative order.
+        """
+        limit = min(self.max_parallel_steps, budget)
+        if limit == 1:
+            return [state.pop_step()]
+
+        taken: List[Step] = []
+        left: List[Step] = []
+        queued_before: set[int] = set()  # plan indices of queued steps seen so far, taken or not
+        for step in state.plan[state.plan_head:]:
+            if len(taken) < limit and queued_before.isdisjoint(step.deps):
+                taken.append(step)
+            else:
+                left.append(step)
+            if step.index is not None:
+                queued_before.add(step.index)
+        state.plan[state.plan_head:] = taken + left
+        return [state.pop_step() for _ in taken]
+
+    def _try_execute(self, step: Step, state: ReasonerState) -> Optional[Exception]:
+        try:
+            self._execute(step, state)
+        except (ReasoningError, ToolError) as exc:
+            return exc
+        return None
+
+    def _handle_step_error(self, exc: Exception, step: Step, state: ReasonerState) -> bool:
+        """Record a failed step and reflect on it; returns True when the run should stop."""
+        if isinstance(exc, ToolCredentialsMissingError):
+            state.history.append(f"Tool Unauthorized: {_head_str(str(exc), _HISTORY_VALUE_CHARS)}")
+
+        if isinstance(exc, MissingInputError):
+            state.history.append(f"Stopping: missing dependency '{getattr(exc, 'missing_key', None)}' for step '{step.text}'. Proceeding to final answer.")
+            return True
+
+        if step.retry_count >= self.max_retries:
+            # Reflection could only give up; skip it.
+            step.status = StepStatus.FAILED
+            step.error = str(exc)
+            logger.warning("max_retries_exceeded", step_text=step.text, max_retries=self.max_retries)
+            state.history.append(f"Giving-up after {self.max_retries} retries: {step.text}")
+            return False
+
+        self._reflect(exc, step, state)
+        return False
+
     @observe
-    def _plan(self, goal: str) -> Deque[Step]:
-        generated_plan = (self.llm.prompt(_PROMPTS["plan"].format(goal=goal)) or "").strip("`").lstrip("markdown").strip()
+    def _plan(self, goal: str) -> List[Step]:
+        plan_cache = self.plan_cache
+        plan_key = self._plan_cache_key(goal) if plan_cache is not None else ""
+        cached = plan_cache.get(plan_key) if plan_cache is not None else None
+        if cached is not None and (self.plan_cache_ttl is None or time.time() - cached[0] <= self.plan_cache_ttl):
+            logger.info("plan_cache_hit", goal=goal)
+            generated_plan = cached[1]
+        else:
+            plan_input = _TEMPLATES["plan_input"].format(goal=goal)
+            generated_plan = _strip_plan_fence(self.llm.prompt(plan_input, system=_SYSTEM["plan"]))
+            if self.plan_repair and _BULLET_RE.search(generated_plan) is None:
+                logger.warning("plan_without_bullets", goal=goal, plan=generated_plan[:_PLAN_REPAIR_CONTEXT_CHARS])
+                repair = _TEMPLATES["plan_repair"].format(reply=generated_plan[:_PLAN_REPAIR_CONTEXT_CHARS])
+                generated_plan = _strip_plan_fence(self.llm.prompt(plan_input + "\n" + repair, system=_SYSTEM["plan"]))
+            cached = None
         logger.info("plan_generated", goal=goal, plan=generated_plan)
 
-        steps: Deque[Step] = deque()
-        produced_keys: set[str] = set()
+        steps: List[Step] = []
+        key_to_step_idx: Dict[str, int] = {}
 
-        BULLET_RE = re.compile(r"^\s*(?:[-*+]\s|\d+\.\s)(.*)$")
-        IO_RE = re.compile(r"\((input|output):\s*([^)]*)\)")
-
-        for raw_line in filter(str.strip, generated_plan.splitlines()):
-            match = BULLET_RE.match(raw_line)
-            if not match:
-                continue
+        for match in _BULLET_RE.finditer(generated_plan):
             bullet = match.group(1).rstrip()
 
             input_keys: List[str] = []
             output_key: Optional[str] = None
+            # One scan both reads the directives and cuts them out of the step text.
+            cleaned_parts: List[str] = []
+            pos = 0
 
-            for io_match in IO_RE.finditer(bullet):
+            for io_match in _IO_RE.finditer(bullet):
+                cleaned_parts.append(bullet[pos:io_match.start()])
+                pos = io_match.end()
                 directive_type, keys_info = io_match.groups()
                 if directive_type == "input":
                     input_keys.extend(k.strip() for k in keys_info.split(',') if k.strip())
                 else:
                     output_key = keys_info.strip() or None
 
+            deps: set[int] = set()
             for key in input_keys:
-                if key not in produced_keys:
+                producer = key_to_step_idx.get(key)
+                if producer is None:
                     logger.warning("invalid_input_key", key=key, step_text=bullet)
                     raise ValueError(f"Input key '{key}' used before being defined.")
+                deps.add(producer)
+                deps.update(steps[producer].deps)
 
             if output_key:
-                if output_key in produced_keys:
+                if output_key in key_to_step_idx:
                     logger.warning("duplicate_output_key", key=output_key, step_text=bullet)
                     raise ValueError(f"Duplicate output key found: '{output_key}'")
-                produced_keys.add(output_key)
+                key_to_step_idx[output_key] = len(steps)
 
-            cleaned_text = IO_RE.sub("", bullet).strip()
-            steps.append(Step(text=cleaned_text, output_key=output_key, input_keys=input_keys))
+            cleaned_parts.append(bullet[pos:])
+            cleaned_text = "".join(cleaned_parts).strip()
+            steps.append(Step(text=cleaned_text, output_key=output_key, input_keys=input_keys, deps=frozenset(deps), index=len(steps)))
 
         if not steps:
             logger.warning("empty_plan_generated", goal=goal)
-            return deque([Step(text=goal)])
+            return [Step(text=goal)]
 
         logger.info("plan_validation_success", step_count=len(steps))
+        if plan_cache is not None and cached is None:
+            plan_cache[plan_key] = (time.time(), generated_plan)
         for s in steps:
             logger.info("plan_step", step_text=s.text, output_key=s.output_key, input_keys=s.input_keys)
         return steps
 
+    def _plan_cache_key(self, goal: str) -> str:
+        return hashlib.sha256("\x00".join(("rewoo_plan", str(getattr(self.llm, "model", "")), _PLAN_PROMPT_HASH, goal)).encode()).hexdigest()
+
     @observe
     def _execute(self, step: Step, state: ReasonerState) -> None:
         step.status = StepStatus.RUNNING
@@ -165,76 +534,184 @@ class ReWOOReasoner(BaseReasoner):
         except KeyError as e:
             missing_key = e.args[0]
             raise MissingInputError(f"Required memory key '{missing_key}' not found for step: {step.text}", missing_key=missing_key) from e
-
-        step_type = self.llm.prompt(_PROMPTS["classify_step"].format(step_text=step.text, keys_list=", ".join(self.memory.keys())))
+        raw_inputs = inputs
+        if self.max_input_chars is not None:
+            inputs = _project_inputs(inputs, step.text, self.max_input_chars)
+
+        tool: Optional[ToolBase] = None
+        # Fused routing searches tools up front; skip that for steps that read inputs and are plainly reasoning.
+        gate = self.verb_classification or (self.fused_routing and step.input_keys)
+        step_type = step.step_type or (_classify_by_verbs(step.text) if gate else None)
+        if step.step_type is not None:
+            pass  # classified (or recalled) with its wave
+        elif step_type is not None:
+            logger.info("step_classified", step_text=step.text, step_type=step_type, method="verbs")
+        elif self.fused_routing and not self._has_tool_suggestion(step):
+            step_type, tool = self._classify_and_select(step)
+        elif (step_type := self._recall_classification(step.text)) is None:
+            prompt = _TEMPLATES["classify_step_input"].format(step_text=step.text, keys_list=self._memory_keys())
+            step_type = self.llm.prompt(prompt, system=_SYSTEM["classify_step"])
+            if self.verb_classification:
+                logger.info("step_classified", step_text=step.text, step_type=step_type, method="llm")
+            self._remember_classification(step.text, step_type)
 
         if "reasoning" in step_type.lower():
-            step.result = self.llm.prompt(_PROMPTS["reason"].format(step_text=step.text, available_data=json.dumps(inputs, ensure_ascii=False)))
+            prompt = _TEMPLATES["reason_input"].format(step_text=step.text, available_data=self._inputs_json(inputs))
+            step.result = self.llm.prompt(prompt, system=_SYSTEM["reason"])
         else:
-            tool = self._select_tool(step)
-            params = self._generate_params(step, tool, inputs)
+            tool = tool or self._select_tool(step)
+            params = self._generate_params(step, tool, inputs, raw_inputs)
             step.result = self.tools.execute(tool, params)
             state.tool_calls.append({"tool_id": tool.id, "summary": tool.get_summary()})
 
         step.status = StepStatus.DONE
 
         if step.output_key:
-            self.memory[step.output_key] = step.result
-
-        # Truncate step result to ~8KB to cap history growth and avoid context-window bloat
-        state.history.append(f"Executed step: {step.text} -> {str(step.result)[:8124]}")
-        logger.info("step_executed", step_text=step.text, step_type=step_type, result=str(step.result)[:100] if step.result is not None else None)
+            self._remember(step.output_key, step.result)
+
+        state.history.append(f"Executed step: {step.text} -> {_head_str(step.result, _HISTORY_VALUE_CHARS)}")
+        logger.info("step_executed", step_text=step.text, step_type=step_type, result=_head_str(step.result))
+
+    def _classify_wave(self, wave: List[Step]) -> None:
+        """Label the wave's steps that need the LLM with one classification call; other steps are left alone.
+
+        A reply without exactly one label per step is ignored, and those steps are classified one by one.
+        """
+        pending: List[Step] = []
+        for step in wave:
+            if self.verb_classification and _classify_by_verbs(step.text) is not None:
+                continue  # classified locally when it runs
+            step.step_type = self._recall_classification(step.text)
+            if step.step_type is None:
+                pending.append(step)
+        if len(pending) < 2:
+            return
+        steps_list = "\n".join(f"{i}. {s.text}" for i, s in enumerate(pending, 1))
+        prompt = _TEMPLATES["classify_steps_input"].format(steps_list=steps_list, keys_list=self._memory_keys())
+        labels = _STEP_TYPE_RE.findall(self.llm.prompt(prompt, system=_SYSTEM["classify_steps"]) or "")
+        if len(labels) != len(pending):
+            logger.warning("batch_classification_mismatch", expected=len(pending), received=len(labels))
+            return
+        for step, label in zip(pending, labels):
+            step.step_type = label.upper()
+            logger.info("step_classified", step_text=step.text, step_type=step.step_type, method="batch")
+            self._remember_classification(step.text, step.step_type)
+
+    def _remember_classification(self, step_text: str, step_type: str) -> None:
+        if self.classification_similarity is not None:
+            label = "REASONING" if "reasoning" in step_type.lower() else "TOOL"
+            self._past_classifications.append((token_set(step_text), label))
+
+    def _recall_classification(self, step_text: str) -> Optional[str]:
+        if self.classification_similarity is None or not self._past_classifications:
+            return None
+        query_tokens = token_set(step_text)
+        similarity, label = max((jaccard_similarity(query_tokens, tokens), label) for tokens, label in list(self._past_classifications))
+        if similarity < self.classification_similarity:
+            return None
+        logger.info("step_classified", step_text=step_text, step_type=label, method="recalled", similarity=round(similarity, 3))
+        return label
 
     @observe
     def _select_tool(self, step: Step) -> ToolBase:
-        suggestion = self.memory.get(f"rewoo_reflector_suggestion:{step.text}")
+        suggestion = self.memory.get(step.suggestion_key)
         if suggestion and suggestion.get("action") in ("change_tool", "retry_params"):
             logger.info("using_reflector_suggested_tool", step_text=step.text, tool_id=suggestion.get("tool_id"))
             if suggestion.get("action") == "change_tool":
-                del self.memory[f"rewoo_reflector_suggestion:{step.text}"]
-            return self.tools.load(JenticTool({"id": suggestion.get("tool_id")}))
+                self._forget(step.suggestion_key)
+            # A suggested alternative comes from this step's search results; load that tool rather than a bare id.
+            tool_id = suggestion.get("tool_id")
+            entry = self._candidate_index.get((step.text, self.top_k))
+            candidate = entry[0].get(tool_id) if entry is not None else None
+            return self._load(candidate or JenticTool({"id": tool_id}))
+
+        candidates_by_id, tools_json = self._candidates(step)
+        tool_id = self.llm.prompt(_TEMPLATES["tool_select_input"].format(step=step.text, tools_json=tools_json), system=_SYSTEM["tool_select"])
+        return self._resolve_tool(step, tool_id, candidates_by_id)
+
+    def _has_tool_suggestion(self, step: Step) -> bool:
+        suggestion = self.memory.get(step.suggestion_key)
+        if not suggestion:
+            return False
+        return suggestion.get("action") in ("change_tool", "retry_params")
+
+    def _candidates(self, step: Step) -> Tuple[Dict[str, ToolBase], str]:
+        """Search results for the step by id (first hit wins) and their joined summaries; both are reused within a run."""
+        key = (step.text, self.top_k)
+        entry = self._candidate_index.get(key)
+        if entry is None:
+            tool_candidates = self._search(step.text, self.top_k)
+            candidates_by_id = {t.id: t for t in reversed(tool_candidates)}
+            entry = self._candidate_index[key] = (candidates_by_id, "\n".join([t.get_summary() for t in tool_candidates]))
+        return entry
 
-        tool_candidates = self.tools.search(step.text, top_k=self.top_k)
-        tool_id = self.llm.prompt(_PROMPTS["tool_select"].format(step=step.text, tools_json="\n".join([t.get_summary() for t in tool_candidates])))
+    @observe
+    def _classify_and_select(self, step: Step) -> Tuple[str, Optional[ToolBase]]:
+        """Classify the step and, for TOOL steps, select and load its tool with a single LLM call."""
+        candidates_by_id, tools_json = self._candidates(step)
+        prompt = _TEMPLATES["classify_and_select_input"].format(step_text=step.text, keys_list=self._memory_keys(), tools_json=tools_json)
+        try:
+            decision = self.llm.prompt_to_json(prompt, max_retries=1, system=_SYSTEM["classify_and_select"]) or {}
+        except (json.JSONDecodeError, ValueError) as e:
+            raise ToolSelectionError(f"Failed to parse routing decision for step: {step.text}: {e}") from e
+
+        step_type = str(decision.get("type") or "TOOL")
+        if "reasoning" in step_type.lower():
+            return step_type, None
+        return step_type, self._resolve_tool(step, str(decision.get("tool_id") or "none").strip(), candidates_by_id)
 
+    def _resolve_tool(self, step: Step, tool_id: str, candidates_by_id: Dict[str, ToolBase]) -> ToolBase:
         if tool_id == "none":
             raise ToolSelectionError(f"No suitable tool was found for step: {step.text}")
 
-        selected_tool = next((t for t in tool_candidates if t.id == tool_id), None)
+        selected_tool = candidates_by_id.get(tool_id)
         if selected_tool is None:
             raise ToolSelectionError(f"Selected tool ID '{tool_id}' is invalid for step: {step.text}")
         logger.info("tool_selected", step_text=step.text, tool=selected_tool)
 
-        return self.tools.load(selected_tool)
+        return self._load(selected_tool)
+
+    def _load(self, tool: ToolBase) -> ToolBase:
+        """``tools.load(tool)``, once per tool id within a run."""
+        loaded = self._loaded_tools.get(tool.id)
+        if loaded is None:
+            loaded = self._loaded_tools[tool.id] = self.tools.load(tool)
+        return loaded
 
     @observe
-    def _generate_params(self, step: Step, tool: ToolBase, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_params(self, step: Step, tool: ToolBase, inputs: Dict[str, Any], raw_inputs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Parameters for ``tool``; ``inputs`` may be projected for the prompt, ``raw_inputs`` are the stored values."""
         try:
-            param_schema = tool.get_parameter_schema()
-
-            allowed_keys = []
-            if hasattr(tool, 'get_parameter_keys'):
-                allowed_keys = tool.get_parameter_keys()
-            elif isinstance(param_schema, dict):
-                allowed_keys = param_schema.keys()
+            tool_schema = self._tool_schema(tool)
+            allowed_keys, allowed_set, required_keys = tool_schema.allowed_keys, tool_schema.allowed_set, tool_schema.required_keys
 
-            required_keys = tool.get_required_parameter_keys() if hasattr(tool, 'get_required_parameter_keys') else []
-            
             # Get params from either reflector suggestion or LLM generation
-            suggestion = self.memory.pop(f"rewoo_reflector_suggestion:{step.text}", None)
+            suggestion = self._forget(step.suggestion_key)
             if suggestion and suggestion["action"] == "retry_params" and "params" in suggestion:
                 logger.info("using_reflector_suggested_params", step_text=step.text, params=suggestion["params"])
-                final_params = {k: v for k, v in suggestion["params"].items() if k in allowed_keys}
+                final_params = {k: v for k, v in suggestion["params"].items() if k in allowed_set}
+            elif self.direct_params and not allowed_keys:
+                # Parameter-free tool: any generated parameters would be filtered out anyway.
+                logger.info("params_skipped", tool_id=tool.id, reason="no_parameters")
+                return {}
+            elif self.direct_params and len(required_keys) == 1 and (input_key := self._matching_input(required_keys[0], inputs)) is not None:
+                # Passed as a real argument, so use the stored value rather than its (possibly cut) projection
+                final_params = {required_keys[0]: (inputs if raw_inputs is None else raw_inputs)[input_key]}
+                logger.info("params_from_input", tool_id=tool.id, param=required_keys[0], input_key=input_key)
             else:
-                prompt = _PROMPTS["param_gen"].format(
+                prompt = _TEMPLATES["param_gen_input"].format(
                     step=step.text,
-                    tool_schema=json.dumps(param_schema, ensure_ascii=False),
-                    step_inputs=json.dumps(inputs, ensure_ascii=False),
-                    allowed_keys=",".join(allowed_keys),
-                    required_keys=",".join(required_keys),
+                    tool_schema=tool_schema.schema_json,
+                    step_inputs=self._inputs_json(inputs),
+                    allowed_keys=tool_schema.allowed_str,
+                    required_keys=tool_schema.required_str,
                 )
-                params_raw = self.llm.prompt_to_json(prompt, max_retries=self.max_retries)
-                final_params = {k: v for k, v in (params_raw or {}).items() if k in allowed_keys}
+                if self.structured_output:
+                    params_schema = self._params_json_schema(tool, allowed_keys, required_keys)
+                    params_raw = self.llm.prompt_with_schema(prompt, params_schema, name="tool_parameters", max_retries=self.max_retries, system=_SYSTEM["param_gen"])
+                else:
+                    params_raw = self.llm.prompt_to_json(prompt, max_retries=self.max_retries, system=_SYSTEM["param_gen"])
+                final_params = {k: v for k, v in (params_raw or {}).items() if k in allowed_set}
             
             unknown_params = [key for key, val in final_params.items() if val == "<UNKNOWN>"]
             missing_params = [key for key in required_keys if key not in final_params]
@@ -253,21 +730,105 @@ class ReWOOReasoner(BaseReasoner):
         except (json.JSONDecodeError, TypeError, ValueError, AttributeError) as e:
             raise ParameterGenerationError(f"Failed to generate valid JSON parameters for step '{step.text}': {e}", tool) from e
 
+    def _params_json_schema(self, tool: ToolBase, allowed_keys: Tuple[str, ...], required_keys: Tuple[str, ...]) -> Dict[str, Any]:
+        """Object schema for a tool's parameters, reusing the property schemas the tool declares."""
+        param_schema = self._tool_schema(tool).schema
+        declared: Dict[str, Any] = {}
+        for schema in param_schema if isinstance(param_schema, list) else [param_schema]:
+            if isinstance(schema, dict):
+                declared.update(schema.get("properties", schema))
+        properties: Dict[str, Any] = {key: declared.get(key) if isinstance(declared.get(key), dict) else {} for key in allowed_keys}
+        return {"type": "object", "additionalProperties": False, "properties": properties, "required": list(required_keys)}
+
+    def _reflection_decision(self, prompt: str) -> Dict[str, Any]:
+        if self.structured_output:
+            return self.llm.prompt_with_schema(prompt, _REFLECTION_SCHEMA, name="reflection_decision", max_retries=2, system=_SYSTEM["reflect"])
+        return self.llm.prompt_to_json(prompt, max_retries=2, system=_SYSTEM["reflect"])
+
+    def _remember(self, key: str, value: Any) -> None:
+        with self._memory_lock:
+            self.memory[key] = value
+            self._memory_version += 1
+
+    def _forget(self, key: str) -> Any:
+        """Remove ``key`` from memory, returning its value (None when absent)."""
+        with self._memory_lock:
+            self._memory_version += 1
+            return self.memory.pop(key, None)
+
+    def _memory_keys(self) -> str:
+        with self._memory_lock:
+            token = (self._memory_version, len(self.memory))
+            if self._memory_keys_joined is None or self._memory_keys_joined[0] != token:
+                self._memory_keys_joined = (token, ", ".join(self.memory.keys()))
+            return self._memory_keys_joined[1]
+
+    def _inputs_json(self, inputs: Dict[str, Any]) -> str:
+        """``fast_json.dumps(inputs, sort_keys=True)``, reusing the encoding of values seen earlier in the run.
+
+        Keys are sorted so identical inputs give identical prompts; values holding keys of mixed types
+        cannot be sorted and are encoded in insertion order instead.
+        """
+        parts = []
+        for key in sorted(inputs, key=str):
+            value = inputs[key]
+            cached = self._encoded_inputs.get(key)
+            if cached is None or cached[0] is not value:
+                try:
+                    encoded = fast_json.dumps(value, sort_keys=True)
+                except TypeError:
+                    encoded = fast_json.dumps(value)
+                cached = self._encoded_inputs[key] = (value, encoded)
+            parts.append(f"{fast_json.dumps(str(key))}:{cached[1]}")
+        return "{" + ",".join(parts) + "}"
+
+    @staticmethod
+    def _matching_input(name: str, inputs: Dict[str, Any]) -> Optional[str]:
+        """The step input named ``name``, matched case-insensitively, if there is one."""
+        if name in inputs:
+            return name
+        lowered = name.lower()
+        return next((key for key in inputs if key.lower() == lowered), None)
+
+    def _tool_schema(self, tool: ToolBase) -> _ToolSchema:
+        """Parameter schema of ``tool`` with its JSON encoding and key lists, derived once per tool.
+
+        A reloaded tool whose schema changed is derived again; comparing schemas is cheaper than encoding them.
+        """
+        param_schema = tool.get_parameter_schema()
+        cached = self._schema_cache.get(tool.id)
+        if cached is not None and (cached.schema is param_schema or cached.schema == param_schema):
+            return cached
+
+        allowed_keys: Tuple[str, ...] = ()
+        if hasattr(tool, 'get_parameter_keys'):
+            allowed_keys = tuple(tool.get_parameter_keys())
+        elif isinstance(param_schema, dict):
+            allowed_keys = tuple(param_schema.keys())
+        required_keys = tuple(tool.get_required_parameter_keys()) if hasattr(tool, 'get_required_parameter_keys') else ()
+
+        entry = _ToolSchema(
+            schema=param_schema,
+            allowed_keys=allowed_keys,
+            allowed_set=frozenset(allowed_keys),
+            allowed_str=",".join(allowed_keys),
+            required_keys=required_keys,
+            required_str=",".join(required_keys),
+        )
+        self._schema_cache[tool.id] = entry
+        return entry
+
     @observe
     def _reflect(self, error: Exception, step: Step, state: ReasonerState) -> None:
         logger.info("step_error_recovery", error_type=error.__class__.__name__, step_text=step.text, retry_count=step.retry_count)
         step.status = StepStatus.FAILED
         step.error = str(error)
 
-        if step.retry_count >= self.max_retries:
-            logger.warning("max_retries_exceeded", step_text=step.text, max_retries=self.max_retries)
-            state.history.append(f"Giving-up after {self.max_retries} retries: {step.text}")
-            return
-
-        failed_tool_id = error.tool.id if isinstance(error, ToolError) else None
-        tool_details = error.tool.get_details() if isinstance(error, ToolError) else None
+        failed_tool = error.tool if isinstance(error, ToolError) else None
+        failed_tool_id = failed_tool.id if failed_tool is not None else None
+        tool_details = failed_tool.get_details() if failed_tool is not None else None
 
-        prompt = _PROMPTS["reflect"].format(
+        prompt = _TEMPLATES["reflect_input"].format(
             goal=state.goal,
             step=step.text,
             failed_tool_id=failed_tool_id,
@@ -276,14 +837,30 @@ class ReWOOReasoner(BaseReasoner):
             tool_details=tool_details,
         )
 
-        alternatives = [t for t in self.tools.search(step.text, top_k=self.top_k) if t.id != failed_tool_id]
-        prompt += "\n" + _PROMPTS["reflect_alternatives"].format(
-            alternative_tools="\n".join([t.get_summary() for t in alternatives])
-        )
-
-        decision = self.llm.prompt_to_json(prompt, max_retries=2)
+        decision = None
+        prefetch = None
+        if isinstance(error, ParameterGenerationError) and failed_tool is None:
+            # No tool was tried, so there is nothing to find alternatives to.
+            decision = self._reflection_decision(prompt)
+        elif self.lazy_alternatives and isinstance(error, ParameterGenerationError):
+            if self.prefetch_alternatives:
+                prefetch = self._pool().submit(self._search, step.text, self.top_k)
+            decision = self._reflection_decision(prompt)
+            if (decision or {}).get("action") == "change_tool":
+                logger.info("reflection_needs_alternatives", step_text=step.text)
+                decision = None
+
+        if decision is None:
+            if prefetch is not None:
+                prefetch.result()  # the search below is then a cache hit
+            # The selection prompt's summaries already list the alternatives unless the failed tool is among them.
+            candidates_by_id, alternative_tools = self._candidates(step)
+            if failed_tool_id in candidates_by_id:
+                alternative_tools = "\n".join([t.get_summary() for t in self._search(step.text, self.top_k) if t.id != failed_tool_id])
+            prompt += "\n" + _TEMPLATES["reflect_alternatives"].format(alternative_tools=alternative_tools)
+            decision = self._reflection_decision(prompt)
         action = (decision or {}).get("action")
-        state.history.append(f"Reflection decision: {decision}")
+        state.history.append(f"Reflection decision: {_head_str(decision, _HISTORY_VALUE_CHARS)}")
 
         if action == "give_up":
             logger.warning(
@@ -296,9 +873,7 @@ class ReWOOReasoner(BaseReasoner):
             return
 
         # Prepare a new step object to add to the plan.
-        new_step = deepcopy(step)
-        new_step.retry_count += 1
-        new_step.status = StepStatus.PENDING
+        new_step = step.clone_for_retry()
 
         if action == "rephrase_step":
             new_step.text = str((decision or {}).get("step", new_step.text))
@@ -314,12 +889,12 @@ class ReWOOReasoner(BaseReasoner):
             self._save_reflector_suggestion(new_step, "retry_params", failed_tool_id, params)
             logger.info("reflection_retry_params", step_text=new_step.text, params=params)
 
-        state.plan.appendleft(new_step)
+        state.push_front(new_step)
 
     def _save_reflector_suggestion(self, new_step: Step, action: str, tool_id: Optional[str], params: Dict[str, Any] | None = None) -> None:
         suggestion: Dict[str, Any] = {"action": action, "tool_id": tool_id}
         if params is not None:
             suggestion["params"] = params
-        self.memory[f"rewoo_reflector_suggestion:{new_step.text}"] = suggestion
+        self._remember(new_step.suggestion_key, suggestion)
 
 
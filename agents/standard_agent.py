@@ -18,14 +18,17 @@ from  agents.reasoner.base import BaseReasoner, ReasoningResult
 from  agents.llm.base_llm import BaseLLM
 from  agents.tools.base import JustInTimeToolingBase
 from  agents.goal_preprocessor.base import BaseGoalPreprocessor
-from  agents.prompts import load_prompts
+from  agents.prompts import compile_prompt, load_prompts
 
 from  utils.logger import get_logger
 from  utils.observability import observe
 
 logger = get_logger(__name__)
 
-_PROMPTS = load_prompts("agent", required_prompts=["summarize"])
+_PROMPTS = load_prompts("agent", required_prompts=["summarize", "summarize_input"])
+# Static instructions are sent as the system message; only the short input block varies per goal.
+_SUMMARIZE_SYSTEM = compile_prompt(_PROMPTS["summarize"]).format()
+_SUMMARIZE_INPUT = compile_prompt(_PROMPTS["summarize_input"])
 
 class AgentState(str, Enum):
     READY               = "READY"
@@ -101,7 +104,10 @@ class StandardAgent:
         try:
             result = self.reasoner.run(goal)
             # Truncate transcript to the last ~12KB to limit context size and avoid context-window errors
-            result.final_answer = self.llm.prompt(_PROMPTS["summarize"].format(goal=goal, history=getattr(result, "transcript", "")[-12000:]))
+            result.final_answer = self.llm.prompt(
+                _SUMMARIZE_INPUT.format(goal=goal, history=getattr(result, "transcript", "")[-12000:]),
+                system=_SUMMARIZE_SYSTEM,
+            )
 
             self._record_interaction({"goal": goal, "result": result.final_answer})
             self._state = AgentState.READY
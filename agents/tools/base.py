@@ -29,6 +29,13 @@ class ToolBase(ABC):
         """Return detailed parameter schema for LLM parameter generation."""
         raise NotImplementedError
 
+    def is_idempotent(self) -> bool:
+        """Whether repeating a call with the same parameters is safe to serve from an earlier result.
+
+        Defaults to False; tools known to be read-only should override this.
+        """
+        return False
+
 class JustInTimeToolingBase(ABC):
     """Abstract contract for a tool-providing backend."""
 
@@ -4,8 +4,9 @@ Thin wrapper around jentic-sdk for centralized auth, retries, and logging.
 import asyncio
 import os
 import json
+import threading
 from http import HTTPStatus
-from typing import Any, Dict, List, Optional
+from typing import Any, Coroutine, Dict, List, Optional, TypeVar
 
 from jentic import Jentic
 from jentic.lib.models import SearchRequest, LoadRequest, ExecutionRequest
@@ -15,6 +16,11 @@ from utils.observability import observe
 from utils.logger import get_logger
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+# Search-result tools remembered by JenticClient before the memo is reset
+_MAX_KNOWN_TOOLS = 1024
+
 
 class JenticTool(ToolBase):
     """Jentic-specific tool implementation with internal jentic metadata."""
@@ -41,6 +47,8 @@ class JenticTool(ToolBase):
         self.path = schema.get('path')      # For operations
         self.required = schema.get('inputs', {}).get('required', [])
         self._parameters = schema.get('inputs', {}).get('properties', None)
+        self._summary: str | None = None
+        self._details: str | None = None
 
     def __str__(self) -> str:
         """Short string description for logging purposes."""
@@ -51,15 +59,28 @@ class JenticTool(ToolBase):
         return f"JenticTool({self.id!r}, {self.name!r})"
 
     def get_summary(self) -> str:
-        """Return summary information for LLM tool selection."""
-        # Create description, preferring explicit description over method/path
-        description = self.description
-        if not description and self.method and self.path:
-            description = f"{self.method} {self.path}"
-        return f"{self.id}: {self.name} - {description} (API: {self.api_name})"
+        """Return summary information for LLM tool selection.
+
+        Rendered once per tool: the fields come from the search/load result, and identical text across
+        calls keeps tool-selection prompts cacheable.
+        """
+        if self._summary is None:
+            # Create description, preferring explicit description over method/path
+            description = self.description
+            if not description and self.method and self.path:
+                description = f"{self.method} {self.path}"
+            self._summary = f"{self.id}: {self.name} - {description} (API: {self.api_name})"
+        return self._summary
 
     def get_details(self) -> str:
-        return json.dumps(self._schema, indent=4)
+        """Return the full tool schema as JSON, encoded once per tool (reflection may ask on every retry)."""
+        if self._details is None:
+            self._details = json.dumps(self._schema, indent=4)
+        return self._details
+
+    def is_idempotent(self) -> bool:
+        """Plain GET/HEAD operations are read-only; workflows and other methods may have side effects."""
+        return str(self.method or "").upper() in ("GET", "HEAD")
 
     def get_parameter_schema(self) -> Dict[str, Any] | list[dict]:
         """Return detailed parameter schema for LLM parameter generation."""
@@ -114,6 +135,38 @@ class JenticClient(JustInTimeToolingBase):
             filter_by_credentials_env_val = os.getenv("JENTIC_FILTER_BY_CREDENTIALS", "false").strip().lower()
             filter_by_credentials = filter_by_credentials_env_val == "true"
         self._filter_by_credentials = bool(filter_by_credentials)
+        # One long-lived event loop for SDK calls: the SDK keeps an HTTP client per event loop, so running every
+        # call here lets search/load/execute reuse connections instead of reconnecting per call.
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: threading.Thread | None = None
+        self._loop_lock = threading.Lock()
+        # Search-result tools by id. A result identical to an earlier one returns the same tool, so its rendered
+        # summary and details (and reasoner caches keyed on its schema) carry over between searches.
+        self._known_tools: Dict[str, JenticTool] = {}
+
+    def _run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run an SDK coroutine on this client's event loop (started on first use) and wait for its result.
+
+        Safe to call from several threads at once, e.g. parallel reasoner steps.
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever, name="jentic-sdk", daemon=True)
+                self._loop_thread.start()
+            loop = self._loop
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def close(self) -> None:
+        """Stop the SDK event loop and join its thread; a later call starts a new loop."""
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
+        if loop is None or thread is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
 
     @observe
     def search(self, query: str, *, top_k: int = 10) -> List[ToolBase]:
@@ -122,8 +175,18 @@ class JenticClient(JustInTimeToolingBase):
         """
         logger.info("tool_search", query=query, top_k=top_k, filter_by_credentials=self._filter_by_credentials)
 
-        response = asyncio.run(self._jentic.search(SearchRequest(query=query, limit=top_k, filter_by_credentials=self._filter_by_credentials,)))
-        return [JenticTool(result.model_dump(exclude_none=False)) for result in response.results] if response.results else []
+        response = self._run(self._jentic.search(SearchRequest(query=query, limit=top_k, filter_by_credentials=self._filter_by_credentials,)))
+        return [self._known_tool(result.model_dump(exclude_none=False)) for result in response.results] if response.results else []
+
+    def _known_tool(self, schema: Dict[str, Any]) -> JenticTool:
+        tool = JenticTool(schema)
+        known = self._known_tools.get(tool.id)
+        if known is not None and known._schema == schema:
+            return known
+        if len(self._known_tools) >= _MAX_KNOWN_TOOLS:
+            self._known_tools.clear()
+        self._known_tools[tool.id] = tool
+        return tool
 
     @observe
     def load(self, tool: ToolBase) -> ToolBase:
@@ -136,7 +199,7 @@ class JenticClient(JustInTimeToolingBase):
         logger.debug("tool_load", tool_id=tool.id)
 
         # Call jentic load API directly
-        response = asyncio.run(self._jentic.load(LoadRequest(ids=[tool.id])))
+        response = self._run(self._jentic.load(LoadRequest(ids=[tool.id])))
 
         # Find a specific result matching the tool we are looking for
         result = response.tool_info[tool.id]
@@ -156,7 +219,7 @@ class JenticClient(JustInTimeToolingBase):
 
         try:
             # Call jentic execute API directly
-            result = asyncio.run(self._jentic.execute(ExecutionRequest(id=tool.id, inputs=parameters)))
+            result = self._run(self._jentic.execute(ExecutionRequest(id=tool.id, inputs=parameters)))
 
             # The result object from the SDK has a 'status' and 'outputs'.
             # A failure in the underlying tool execution is not an exception, but a
@@ -1,6 +1,6 @@
 import pytest
 
-from agents.prompts import load_prompts
+from agents.prompts import compile_prompt, load_prompts
 
 
 def test_load_prompts_succeeds_for_agent_profile_when_required_key_present():
@@ -64,3 +64,23 @@ def test_load_prompts_raises_key_error_when_required_value_is_empty_string():
         load_prompts("../../tests/agents/prompts/testdata/empty_value", required_prompts=["x"])  # type: ignore[arg-type]
 
 
+
+
+@pytest.mark.parametrize("profile", ["agent", "reasoners/react", "reasoners/rewoo"])
+def test_compile_prompt_matches_str_format_for_shipped_prompts(profile):
+    for text in load_prompts(profile, required_prompts=[]).values():
+        compiled = compile_prompt(text)
+        fields = {name: f"<{name} {{value}}>" for name in compiled.fields}
+        assert compiled.format(**fields) == text.format(**fields)
+
+
+def test_compile_prompt_missing_field_raises_key_error():
+    with pytest.raises(KeyError):
+        compile_prompt("Hello {name}").format()
+
+
+def test_compile_prompt_merges_escaped_braces_into_one_literal():
+    compiled = compile_prompt('Return {{"a": {{"b": 1}}}} for {name}.')
+    assert compiled.format(name="x") == 'Return {"a": {"b": 1}} for x.'
+    assert len(compiled._parts) == 2
+    assert compile_prompt("Static {{json}}").format() == "Static {json}"
@@ -1,11 +1,11 @@
 from typing import Any, Dict, List
 
-from agents.reasoner.react import ReACTReasoner
+from agents.reasoner.react import ReACTReasoner, ReACTState
 from agents.memory.dict_memory import DictMemory
-from agents.reasoner.exceptions import ParameterGenerationError
+from agents.reasoner.exceptions import ParameterGenerationError, ToolSelectionError
 import pytest
 # Reuse test doubles from conftest in this package
-from tests.conftest import DummyLLM, DummyTools, DummyTool
+from tests.conftest import CaptureTools, DummyLLM, DummyTools, DummyTool
 
 
 def test_react_iterations_counts_turns_not_transcript_lines():
@@ -567,3 +567,785 @@ def test_react_generate_params_multiple_schemas_union_keys():
     assert result == {"param1": "value1", "param2": 42, "param3": True}
 
 
+
+
+def test_react_repeated_thought_is_replaced_with_nudge():
+    llm = DummyLLM(
+        json_queue=[
+            {"step_type": "THINK", "text": "I should look up the weather in Paris"},
+            {"step_type": "THINK", "text": "I should look up the weather in Paris."},
+            {"step_type": "STOP", "text": "done"},
+        ]
+    )
+    reasoner = ReACTReasoner(llm=llm, tools=DummyTools([]), memory=DictMemory(), max_turns=5)
+    result = reasoner.run("goal")
+
+    assert result.transcript.count("look up the weather in Paris") == 1
+    assert "Prior reasoning already covers this" in result.transcript
+
+
+def test_react_think_samples_majority_vote_picks_modal_step_type():
+    llm = DummyLLM(
+        json_queue=[
+            {"step_type": "ACT", "text": "call the api"},
+            {"step_type": "STOP", "text": "the answer is 42"},
+            {"step_type": "STOP", "text": "the answer is 42 exactly"},
+        ]
+    )
+    reasoner = ReACTReasoner(llm=llm, tools=DummyTools([]), memory=DictMemory(), think_samples=3)
+
+    step_type, text, _ = reasoner._think("Goal: g")
+
+    assert step_type == "STOP"
+    assert text.startswith("the answer is 42")
+    # Samples run on the reasoner's own pool, which close() shuts down.
+    pool = reasoner._executor
+    assert pool is not None and pool._max_workers >= 3
+    reasoner._think("Goal: g")
+    assert reasoner._executor is pool
+    reasoner.close()
+
+
+def test_react_think_samples_all_invalid_falls_back_to_default():
+    llm = DummyLLM(json_queue=[{"step_type": "", "text": ""}, {}])
+    reasoner = ReACTReasoner(llm=llm, tools=DummyTools([]), memory=DictMemory(), think_samples=2)
+
+    assert reasoner._think("Goal: g") == ("THINK", "Continuing reasoning to determine next step.", None)
+
+
+def test_react_state_transcript_is_cached_until_next_append():
+    state = ReACTState(goal="g")
+    first = state.transcript()
+    assert first == "Goal: g"
+    assert state.transcript() is first
+
+    state.append("THINK: next")
+    assert state.transcript() == "Goal: g\nTHINK: next"
+
+    state.append("ACT: a", "OBSERVATION: b")
+    assert state.transcript() == "Goal: g\nTHINK: next\nACT: a\nOBSERVATION: b"
+
+
+def test_react_state_bounded_transcript_condenses_older_observations():
+    state = ReACTState(goal="g")
+    long_obs = "OBSERVATION: " + "x" * 500
+    state.append(long_obs)
+    state.append("THINK: a")
+    state.append("THINK: b")
+
+    bounded = state.transcript(keep_last=2)
+    assert bounded.splitlines()[0] == "Goal: g"
+    assert long_obs not in bounded
+    assert "[truncated]" in bounded
+    assert bounded.endswith("THINK: a\nTHINK: b")
+    # Full transcript is still available and unaffected
+    assert long_obs in state.transcript()
+
+
+def test_react_state_bounded_transcript_extends_condensed_head_as_window_slides():
+    state = ReACTState(goal="g")
+    state.append(*[f"THINK: {i}" for i in range(4)])
+    assert state.transcript(keep_last=2) == "Goal: g\nTHINK: 0\nTHINK: 1\nTHINK: 2\nTHINK: 3"
+    head = state._condensed_prefix
+
+    state.append("THINK: 4")
+    assert state.transcript(keep_last=2) == "Goal: g\nTHINK: 0\nTHINK: 1\nTHINK: 2\nTHINK: 3\nTHINK: 4"
+    assert state._condensed_prefix == head + "\nTHINK: 2"
+    # A wider window shrinks the head again
+    assert state.transcript(keep_last=4) == state.transcript()
+    assert state._condensed_prefix == "Goal: g\nTHINK: 0"
+
+
+def test_react_transcript_budget_condenses_only_once_exceeded():
+    reasoner = ReACTReasoner(llm=DummyLLM(), tools=DummyTools([]), memory=DictMemory(), transcript_budget_tokens=100)
+    state = ReACTState(goal="g")
+    state.append("THINK: short")
+    assert reasoner._transcript_window(state) is None
+
+    state.append("OBSERVATION: " + "x" * 500, *[f"THINK: {i}" for i in range(9)])
+    assert state.approx_tokens > 100
+    assert reasoner._transcript_window(state) == 9
+    assert "[truncated]" in state.transcript(reasoner._transcript_window(state))
+
+
+def test_react_state_replace_line_invalidates_cached_renderings():
+    state = ReACTState(goal="g")
+    state.append("OBSERVATION: " + "x" * 500, "THINK: a", "THINK: b")
+    assert "[truncated]" in state.transcript(keep_last=1)
+
+    state.replace_line(1, "OBSERVATION (summary): xs")
+    assert state.transcript(keep_last=1) == "Goal: g\nOBSERVATION (summary): xs\nTHINK: a\nTHINK: b"
+    assert state.approx_tokens == (len(state.transcript()) + 1) // 4
+
+
+def test_react_large_observations_are_summarized_for_later_turns():
+    import threading
+
+    summary_started = threading.Event()
+
+    class SummaryLLM(DummyLLM):
+        def prompt(self, text, **kwargs):
+            summary_started.set()
+            return super().prompt(text, **kwargs)
+
+    class ThinkLLM(DummyLLM):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.prompts = []
+
+        def prompt_to_json(self, text, max_retries=0, **kwargs):
+            self.prompts.append(text)
+            if len(self.prompts) == 3:  # think call after the ACT (the second call was param_gen)
+                assert summary_started.wait(timeout=5)
+            return super().prompt_to_json(text, max_retries, **kwargs)
+
+    class BigTools(DummyTools):
+        def execute(self, tool, params):
+            return "y" * 5000
+
+    summary_llm = SummaryLLM(text_queue=["five thousand ys"])
+    llm = ThinkLLM(
+        text_queue=["t1"],
+        json_queue=[{"step_type": "ACT", "text": "fetch"}, {}, {"step_type": "THINK", "text": "look"}, {"step_type": "STOP", "text": "done"}],
+    )
+    memory = DictMemory()
+    reasoner = ReACTReasoner(llm=llm, tools=BigTools([DummyTool("t1", "Tool One")]), memory=memory, observation_summary_llm=summary_llm)
+
+    assert reasoner.run("g").success
+    reasoner._executor.shutdown(wait=True)
+    # The think call right after the ACT sees the raw observation; the summary is requested in the background
+    assert "y" * 5000 in llm.prompts[2]
+    assert summary_llm.text_queue == []
+    assert dict(memory) == {}
+
+
+def test_react_apply_summaries_swaps_finished_summaries_into_state():
+    from concurrent.futures import Future
+
+    done: Future = Future()
+    done.set_result("OBSERVATION (summary): ys")
+    running: Future = Future()
+    state = ReACTState(goal="g")
+    state.append("OBSERVATION: " + "y" * 5000, "OBSERVATION: " + "z" * 5000)
+    pending = [(1, done), (2, running)]
+
+    ReACTReasoner._apply_summaries(state, pending)
+
+    assert pending == [(2, running)]
+    assert state.lines[1] == "OBSERVATION (summary): ys"
+    assert state.lines[2].startswith("OBSERVATION: zzz")
+
+
+def test_react_run_cache_returns_stored_result_until_ttl_expires(monkeypatch):
+    import agents.reasoner.react as react_module
+
+    now = [1000.0]
+    monkeypatch.setattr(react_module.time, "time", lambda: now[0])
+    llm = DummyLLM(json_queue=[{"step_type": "STOP", "text": "first"}, {"step_type": "STOP", "text": "second"}])
+    cache: Dict[str, Any] = {}
+    reasoner = ReACTReasoner(llm=llm, tools=DummyTools([]), memory=DictMemory(), run_cache=cache, run_cache_ttl=60)
+
+    first = reasoner.run("goal")
+    hit = reasoner.run("goal")
+    assert hit == first and hit is not first
+    assert len(llm.json_queue) == 1
+
+    now[0] += 61
+    assert "FINAL ANSWER: second" in reasoner.run("goal").transcript
+
+
+def test_react_run_cache_hits_are_copies():
+    llm = DummyLLM(json_queue=[{"step_type": "STOP", "text": "done"}])
+    reasoner = ReACTReasoner(llm=llm, tools=DummyTools([]), memory=DictMemory(), run_cache={})
+
+    first = reasoner.run("goal")
+    first.tool_calls.append({"tool_id": "t1", "summary": "added by caller"})
+    first.transcript = "edited"
+
+    hit = reasoner.run("goal")
+    assert hit.tool_calls == []
+    assert "FINAL ANSWER: done" in hit.transcript
+
+
+def test_react_run_cache_misses_after_catalogue_version_changes():
+    llm = DummyLLM(json_queue=[{"step_type": "STOP", "text": "v1"}, {"step_type": "STOP", "text": "v2"}])
+    cache: Dict[str, Any] = {}
+    reasoner = ReACTReasoner(llm=llm, tools=DummyTools([]), memory=DictMemory(), run_cache=cache, catalogue_version="1")
+    reasoner.run("goal")
+
+    reasoner.catalogue_version = "2"
+    assert "FINAL ANSWER: v2" in reasoner.run("goal").transcript
+    assert len(cache) == 2
+
+
+def test_react_run_cache_skips_failed_runs():
+    llm = DummyLLM(json_queue=[{"step_type": "THINK", "text": "hmm"}, {"step_type": "STOP", "text": "done"}])
+    cache: Dict[str, Any] = {}
+    reasoner = ReACTReasoner(llm=llm, tools=DummyTools([]), memory=DictMemory(), max_turns=1, run_cache=cache)
+
+    assert not reasoner.run("goal").success
+    assert cache == {}
+
+
+def test_react_stops_when_token_budget_is_exhausted():
+    class MeteredLLM(DummyLLM):
+        def prompt_to_json(self, text, max_retries=0, **kwargs):
+            self._record_usage(600)
+            return super().prompt_to_json(text, max_retries, **kwargs)
+
+    llm = MeteredLLM(json_queue=[{"step_type": "THINK", "text": f"step {i}"} for i in range(5)])
+    llm.tokens_used = 10_000  # spent before this run; only the run's own usage counts
+    reasoner = ReACTReasoner(llm=llm, tools=DummyTools([]), memory=DictMemory(), max_total_tokens=1000)
+
+    result = reasoner.run("goal")
+
+    assert not result.success
+    assert result.iterations == 2
+
+
+def test_react_token_budget_applies_through_batching_llm():
+    from agents.llm.base_llm import BaseLLM
+    from agents.llm.batching import BatchingLLM
+
+    class MeteredLLM(BaseLLM):
+        calls = 0
+
+        def completion(self, messages, **kwargs):
+            MeteredLLM.calls += 1
+            return BaseLLM.LLMResponse(text='{"step_type": "THINK", "text": "step %d"}' % MeteredLLM.calls, total_tokens=600)
+
+    llm = BatchingLLM(MeteredLLM(model="fake-model"))
+    reasoner = ReACTReasoner(llm=llm, tools=DummyTools([]), memory=DictMemory(), max_total_tokens=1000)
+
+    result = reasoner.run("goal")
+
+    assert not result.success
+    assert result.iterations == 2 and MeteredLLM.calls == 2
+    assert llm.tokens_used == 1200
+
+
+def test_react_repeated_idempotent_tool_call_is_served_from_run_memo_until_a_write():
+    class ReadTool(DummyTool):
+        def is_idempotent(self):
+            return True
+
+    class CountingTools(DummyTools):
+        executions = 0
+
+        def execute(self, tool, params):
+            self.executions += 1
+            return super().execute(tool, params)
+
+    read, write = ReadTool("read", "Read Tool"), DummyTool("write", "Write Tool")
+    tools = CountingTools([read, write])
+    reasoner = ReACTReasoner(llm=DummyLLM(), tools=tools, memory=DictMemory())
+    memo: Dict[str, Any] = {}
+
+    assert reasoner._execute_tool(read, {"q": 1, "p": 2}, memo) == reasoner._execute_tool(read, {"p": 2, "q": 1}, memo)
+    assert tools.executions == 1
+    reasoner._execute_tool(write, {"q": 1}, memo)
+    reasoner._execute_tool(write, {"q": 1}, memo)
+    assert tools.executions == 3
+    # The write may have changed what the read returns, so it runs again.
+    reasoner._execute_tool(read, {"q": 1, "p": 2}, memo)
+    assert tools.executions == 4
+    # Without a run's memo nothing is reused.
+    reasoner._execute_tool(read, {"q": 1, "p": 2})
+    assert tools.executions == 5
+
+
+def test_react_response_cache_serves_repeat_prompts_at_temperature_zero():
+    llm = DummyLLM(json_queue=[{"step_type": "STOP", "text": "cached answer"}])
+    llm.temperature = 0
+    cache: Dict[str, Any] = {}
+    reasoner = ReACTReasoner(llm=llm, tools=DummyTools([]), memory=DictMemory(), response_cache=cache)
+
+    first = reasoner.run("goal")
+    second = reasoner.run("goal")
+
+    assert len(cache) == 1
+    assert first.transcript == second.transcript
+    assert "FINAL ANSWER: cached answer" in second.transcript
+
+
+def test_react_response_cache_is_bypassed_for_non_deterministic_llm():
+    llm = DummyLLM(json_queue=[{"step_type": "STOP", "text": "answer"}])
+    cache: Dict[str, Any] = {}
+    reasoner = ReACTReasoner(llm=llm, tools=DummyTools([]), memory=DictMemory(), response_cache=cache)
+
+    reasoner.run("goal")
+
+    assert cache == {}
+
+
+def test_react_tool_selection_cache_is_keyed_on_candidates_and_summaries():
+    llm = DummyLLM(text_queue=["t2", "t1"])
+    llm.temperature = 0
+    t1, t2 = DummyTool("t1", "Tool One"), DummyTool("t2", "Tool Two")
+    reasoner = ReACTReasoner(llm=llm, tools=DummyTools([t1, t2]), memory=DictMemory(), response_cache={})
+
+    assert reasoner._select_tool("post hi", []).id == "t2"
+    assert reasoner._select_tool("post hi", []).id == "t2"  # served from cache
+    assert llm.text_queue == ["t1"]
+
+    # A changed candidate summary invalidates the cached decision
+    t2._summary = "Tool Two (v2)"
+    assert reasoner._select_tool("post hi", []).id == "t1"
+    assert llm.text_queue == []
+
+
+def test_react_param_cache_keys_on_step_schema_goal_and_last_observation():
+    llm = DummyLLM(json_queue=[{"a": "1"}, {"a": "2"}])
+    llm.temperature = 0
+    tool = DummyTool("t1", "Tool One", schema={"a": {"type": "string"}})
+    reasoner = ReACTReasoner(llm=llm, tools=DummyTools([tool]), memory=DictMemory(), response_cache={})
+
+    base = "Goal: g\nACT: x\nOBSERVATION: {'v': 1}"
+    assert reasoner._generate_params(tool, base, "do it") == {"a": "1"}
+    # Earlier transcript lines differ, but goal, step, schema and latest observation match
+    assert reasoner._generate_params(tool, "Goal: g\nTHINK: other\nOBSERVATION: {'v': 1}", "do it") == {"a": "1"}
+    # A new observation changes the key
+    assert reasoner._generate_params(tool, base + "\nOBSERVATION: {'v': 2}", "do it") == {"a": "2"}
+
+
+def test_react_selection_similarity_reuses_previous_tool_choice():
+    llm = DummyLLM(text_queue=["t2"])
+    tools = DummyTools([DummyTool("t1", "Tool One"), DummyTool("t2", "Tool Two")])
+    reasoner = ReACTReasoner(llm=llm, tools=tools, memory=DictMemory(), selection_similarity=0.8)
+
+    first = reasoner._select_tool("send hi to discord channel 1234", [])
+    second = reasoner._select_tool("Send hi to Discord channel 1234!", [])
+
+    assert first.id == second.id == "t2"
+    assert llm.text_queue == []
+
+
+def test_react_selection_similarity_ignores_recalled_tool_that_failed():
+    llm = DummyLLM(text_queue=["t2", "t1"])
+    tools = DummyTools([DummyTool("t1", "Tool One"), DummyTool("t2", "Tool Two")])
+    reasoner = ReACTReasoner(llm=llm, tools=tools, memory=DictMemory(), selection_similarity=0.8)
+
+    reasoner._select_tool("send hi", [])
+    retried = reasoner._select_tool("send hi", ["t2"])
+
+    assert retried.id == "t1"
+
+
+def test_react_speculative_search_is_reused_for_repeated_action():
+    import threading
+    from agents.tools.exceptions import ToolExecutionError
+
+    class CountingTools(DummyTools):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.search_threads: List[str] = []
+
+        def search(self, query: str, top_k: int = 15):  # type: ignore[override]
+            self.search_threads.append(threading.current_thread().name)
+            return super().search(query, top_k=top_k)
+
+    t1 = DummyTool("t1", "Tool One")
+    llm = DummyLLM(
+        json_queue=[
+            {"step_type": "ACT", "text": "fetch the report"},
+            {},
+            {"step_type": "ACT", "text": "fetch the report"},
+            {},
+            {"step_type": "STOP", "text": "done"},
+        ],
+        text_queue=["t1", "t2"],
+    )
+    tools = CountingTools([t1, DummyTool("t2", "Tool Two")], failures={"t1": ToolExecutionError("boom", t1)})
+    reasoner = ReACTReasoner(llm=llm, tools=tools, memory=DictMemory(), speculative=True)
+
+    result = reasoner.run("goal")
+
+    assert [tc["tool_id"] for tc in result.tool_calls] == ["t2"]
+    # Only the first ACT searched; the speculative retry was served from the per-run search memo.
+    assert tools.search_threads == [threading.current_thread().name]
+
+
+def test_react_speculative_search_hit_in_memo_skips_worker_pool():
+    reasoner = ReACTReasoner(llm=DummyLLM(), tools=DummyTools([DummyTool("t1", "Tool One")]), memory=DictMemory(), speculative=True)
+    state = ReACTState(goal="g")
+    state.last_action = "fetch the report"
+    reasoner._search("fetch the report", reasoner.top_k)
+
+    speculation = reasoner._speculate(state)
+
+    assert speculation is not None and speculation.done()
+    assert [t.id for t in speculation.result()] == ["t1"]
+    assert reasoner._executor is None
+
+
+def test_react_stop_cancels_pending_speculation():
+    from concurrent.futures import Future
+
+    pending: Future = Future()
+    reasoner = ReACTReasoner(llm=DummyLLM(json_queue=[{"step_type": "STOP", "text": "done"}]), tools=DummyTools([]), memory=DictMemory(), speculative=True)
+    reasoner._speculate = lambda state: pending  # type: ignore[method-assign]
+
+    assert reasoner.run("goal").success
+    assert pending.cancelled()
+
+
+def test_react_close_shuts_down_worker_pool():
+    with ReACTReasoner(llm=DummyLLM(), tools=DummyTools([]), memory=DictMemory(), speculative=True) as reasoner:
+        pool = reasoner._pool()
+        assert pool.submit(lambda: 1).result() == 1
+
+    assert reasoner._executor is None
+    assert pool._shutdown
+    reasoner.close()  # idempotent
+
+
+def test_react_speculative_selection_after_failure_skips_inline_selection():
+    import threading
+    from agents.tools.exceptions import ToolExecutionError
+
+    class RecordingLLM(DummyLLM):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.prompt_threads: List[str] = []
+
+        def prompt(self, text: str, **kwargs) -> str:  # type: ignore[override]
+            self.prompt_threads.append(threading.current_thread().name)
+            return super().prompt(text)
+
+    t1 = DummyTool("t1", "Tool One")
+    llm = RecordingLLM(
+        json_queue=[
+            {"step_type": "ACT", "text": "fetch the report"},
+            {},
+            {"step_type": "ACT", "text": "fetch the report"},
+            {},
+            {"step_type": "STOP", "text": "done"},
+        ],
+        text_queue=["t1", "t2"],
+    )
+    tools = DummyTools([t1, DummyTool("t2", "Tool Two")], failures={"t1": ToolExecutionError("boom", t1)})
+    reasoner = ReACTReasoner(llm=llm, tools=tools, memory=DictMemory(), speculative=True)
+
+    result = reasoner.run("goal")
+
+    assert [tc["tool_id"] for tc in result.tool_calls] == ["t2"]
+    assert llm.prompt_threads[0] == threading.current_thread().name
+    assert llm.prompt_threads[1].startswith("react-speculative")
+
+
+def test_react_caps_large_observation_without_parking_it_in_memory():
+    big = {"items": ["x" * 100] * 200}
+
+    class BigTools(DummyTools):
+        def execute(self, tool, params):  # type: ignore[override]
+            return big
+
+    llm = DummyLLM(
+        json_queue=[{"step_type": "ACT", "text": "list items"}, {}, {"step_type": "STOP", "text": "done"}],
+        text_queue=["t1"],
+    )
+    memory = DictMemory()
+    reasoner = ReACTReasoner(llm=llm, tools=BigTools([DummyTool("t1", "Tool One")]), memory=memory)
+
+    result = reasoner.run("goal")
+
+    obs_line = next(line for line in result.transcript.splitlines() if line.startswith("OBSERVATION:"))
+    assert len(obs_line) < len(str(big))
+    assert obs_line.endswith("... [truncated]")
+    assert dict(memory) == {}
+
+
+def test_react_arun_batch_returns_results_in_goal_order():
+    import asyncio
+
+    class EchoLLM(DummyLLM):
+        def prompt_to_json(self, text: str, max_retries: int = 0, **kwargs):  # type: ignore[override]
+            goal = text.split("Goal: ", 1)[1].splitlines()[0]
+            return {"step_type": "STOP", "text": f"answer for {goal}"}
+
+    reasoner = ReACTReasoner(llm=EchoLLM(), tools=DummyTools([]), memory=DictMemory())
+
+    results = asyncio.run(reasoner.arun_batch(["a", "b", "c"]))
+
+    assert [r.success for r in results] == [True, True, True]
+    assert [r.transcript.splitlines()[-1] for r in results] == ["FINAL ANSWER: answer for a", "FINAL ANSWER: answer for b", "FINAL ANSWER: answer for c"]
+
+
+def test_react_act_rationale_is_recorded_as_thought_in_same_turn():
+    llm = DummyLLM(
+        json_queue=[
+            {"step_type": "ACT", "text": "fetch the report", "rationale": "The report holds the numbers"},
+            {},
+            {"step_type": "STOP", "text": "done"},
+        ],
+        text_queue=["t1"],
+    )
+    reasoner = ReACTReasoner(llm=llm, tools=DummyTools([DummyTool("t1", "Tool One")]), memory=DictMemory())
+
+    result = reasoner.run("goal")
+
+    lines = result.transcript.splitlines()
+    assert lines[1:3] == ["THINK: The report holds the numbers", "ACT: fetch the report"]
+    assert result.iterations == 2
+
+
+def test_react_think_max_tokens_is_forwarded_to_think_calls_only():
+    class KwargsLLM(DummyLLM):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.json_kwargs: List[Dict[str, Any]] = []
+
+        def prompt_to_json(self, text: str, max_retries: int = 0, **kwargs):  # type: ignore[override]
+            self.json_kwargs.append(kwargs)
+            return super().prompt_to_json(text, max_retries=max_retries)
+
+    llm = KwargsLLM(
+        json_queue=[{"step_type": "ACT", "text": "do it"}, {}, {"step_type": "STOP", "text": "done"}],
+        text_queue=["t1"],
+    )
+    reasoner = ReACTReasoner(llm=llm, tools=DummyTools([DummyTool("t1", "Tool One")]), memory=DictMemory(), think_max_tokens=128)
+
+    reasoner.run("goal")
+
+    assert [kwargs.get("max_tokens") for kwargs in llm.json_kwargs] == [128, None, 128]
+
+
+def test_react_param_generation_reuses_the_turn_transcript():
+    class RecordingLLM(DummyLLM):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.json_prompts: List[str] = []
+
+        def prompt_to_json(self, text: str, max_retries: int = 0, **kwargs):  # type: ignore[override]
+            self.json_prompts.append(text)
+            return super().prompt_to_json(text, max_retries=max_retries)
+
+    llm = RecordingLLM(
+        json_queue=[{"step_type": "ACT", "text": "do it"}, {}, {"step_type": "STOP", "text": "done"}],
+        text_queue=["t1"],
+    )
+    reasoner = ReACTReasoner(llm=llm, tools=DummyTools([DummyTool("t1", "Tool One")]), memory=DictMemory())
+
+    reasoner.run("goal")
+
+    think_prompt, param_prompt = llm.json_prompts[:2]
+    assert "Goal: goal" in think_prompt and "ACT: do it" not in think_prompt
+    assert "Goal: goal" in param_prompt and "ACT: do it" not in param_prompt
+
+
+def test_react_param_prompt_embeds_transcript_and_caches_schema_json():
+    class RecordingLLM(DummyLLM):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.json_prompts: List[str] = []
+
+        def prompt_to_json(self, text: str, max_retries: int = 0, **kwargs):  # type: ignore[override]
+            self.json_prompts.append(text)
+            return super().prompt_to_json(text, max_retries=max_retries)
+
+    class SchemaTool(DummyTool):
+        def get_parameter_schema(self) -> Dict[str, Any]:
+            return {"b": {"type": "string"}, "a": {"type": "string"}}
+
+    llm = RecordingLLM(
+        json_queue=[
+            {"step_type": "ACT", "text": "say \"hi\""},
+            {"a": "x", "b": "y"},
+            {"step_type": "ACT", "text": "say \"hi\" again"},
+            {"a": "x", "b": "y"},
+            {"step_type": "STOP", "text": "done"},
+        ],
+        text_queue=["t1", "t1"],
+    )
+    reasoner = ReACTReasoner(llm=llm, tools=DummyTools([SchemaTool("t1", "Tool One")]), memory=DictMemory())
+
+    reasoner.run("say \"hi\"")
+
+    param_prompt = llm.json_prompts[1]
+    assert '<reasoning_trace>\nGoal: say "hi"\n</reasoning_trace>' in param_prompt
+    assert 'SCHEMA: {"a":{"type":"string"},"b":{"type":"string"}}' in param_prompt
+    assert list(reasoner._schema_json_cache) == ["t1"]
+
+
+def test_react_schema_json_cache_reencodes_changed_schema():
+    reasoner = ReACTReasoner(llm=DummyLLM(), tools=DummyTools([]), memory=DictMemory())
+    schema = {"b": {"type": "string"}, "a": {"type": "string"}}
+
+    first = reasoner._schema_json("t1", schema)
+    assert first == '{"a":{"type":"string"},"b":{"type":"string"}}'
+    assert reasoner._schema_json("t1", dict(schema)) is first
+    assert reasoner._schema_json("t1", {"c": {"type": "integer"}}) == '{"c":{"type":"integer"}}'
+
+
+def test_react_fused_act_selects_tool_and_params_in_one_call():
+    tool = DummyTool("t1", "Tool One", schema={"channel": {"type": "string"}, "text": {"type": "string"}})
+    llm = DummyLLM(
+        json_queue=[
+            {"step_type": "ACT", "text": "post hi to general"},
+            {"tool_id": "t1", "params": {"channel": "general", "text": "hi", "bogus": 1}},
+            {"step_type": "STOP", "text": "done"},
+        ],
+    )
+    tools = CaptureTools([tool])
+    reasoner = ReACTReasoner(llm=llm, tools=tools, memory=DictMemory(), fused_act=True)
+
+    result = reasoner.run("goal")
+
+    assert tools.last_params == {"channel": "general", "text": "hi"}
+    assert [tc["tool_id"] for tc in result.tool_calls] == ["t1"]
+    assert llm.text_queue == [] and llm.json_queue == []
+
+
+def test_react_fused_act_falls_back_to_param_generation_for_invalid_draft():
+    class RequiredTool(DummyTool):
+        def get_required_parameter_keys(self) -> List[str]:
+            return ["channel"]
+
+    tool = RequiredTool("t1", "Tool One", schema={"channel": {"type": "string"}})
+    llm = DummyLLM(
+        json_queue=[
+            {"step_type": "ACT", "text": "post hi"},
+            {"tool_id": "t1", "params": {"channel": "<UNKNOWN>"}},
+            {"channel": "general"},
+            {"step_type": "STOP", "text": "done"},
+        ],
+    )
+    tools = CaptureTools([tool])
+    reasoner = ReACTReasoner(llm=llm, tools=tools, memory=DictMemory(), fused_act=True)
+
+    reasoner.run("goal")
+
+    assert tools.last_params == {"channel": "general"}
+
+
+def test_react_memoizes_repeated_searches_within_a_run():
+    class CountingTools(DummyTools):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.queries: List[str] = []
+
+        def search(self, query: str, top_k: int = 15):  # type: ignore[override]
+            self.queries.append(query)
+            return super().search(query, top_k=top_k)
+
+    def make_llm() -> DummyLLM:
+        return DummyLLM(
+            json_queue=[
+                {"step_type": "ACT", "text": "look it up"},
+                {"step_type": "ACT", "text": "look it up"},
+                {"step_type": "STOP", "text": "done"},
+            ],
+            text_queue=["none", "none"],
+        )
+
+    tools = CountingTools([DummyTool("t1", "Tool One")])
+    reasoner = ReACTReasoner(llm=make_llm(), tools=tools, memory=DictMemory())
+    reasoner.run("goal")
+    assert tools.queries == ["look it up"]
+
+    # A new run starts with a fresh memo
+    reasoner.llm = make_llm()
+    reasoner.run("goal")
+    assert tools.queries == ["look it up", "look it up"]
+
+
+def test_react_selection_accepts_wrapped_id_preferring_longest_match():
+    tools = DummyTools([DummyTool("t1", "Tool One"), DummyTool("t10", "Tool Ten")])
+    reasoner = ReACTReasoner(llm=DummyLLM(text_queue=["`t10`", "Selected: t1", "t2"]), tools=tools, memory=DictMemory())
+
+    assert reasoner._select_tool("do it", []).id == "t10"
+    assert reasoner._select_tool("do it again", []).id == "t1"
+    with pytest.raises(ToolSelectionError):
+        reasoner._select_tool("do something else", [])
+
+
+def test_react_tools_block_respects_char_budget_in_rank_order():
+    tools = [DummyTool(f"t{i}", f"t{i}: " + "x" * 96) for i in range(5)]  # 100 chars each
+    reasoner = ReACTReasoner(llm=DummyLLM(), tools=DummyTools(tools), memory=DictMemory(), max_tools_chars=290)
+    candidates_by_id = {t.id: t for t in tools}
+
+    lines = reasoner._tools_block(candidates_by_id).splitlines()
+    assert [line[:3] for line in lines] == ["t0:", "t1:", "t2:"]
+    assert lines[2].endswith("...") and len("\n".join(lines)) <= 290
+
+    reasoner.max_tools_chars = 250
+    assert reasoner._tools_block(candidates_by_id).count("\n") == 1  # too little room left to cut a third summary
+
+
+def test_react_prefetch_load_reuses_top_candidate_load():
+    import threading
+
+    class ThreadTools(DummyTools):
+        def __init__(self, tools):
+            super().__init__(tools)
+            self.loads = []
+
+        def load(self, tool):
+            self.loads.append((tool.id, threading.current_thread().name))
+            return tool
+
+    tools = ThreadTools([DummyTool("t1", "Tool One"), DummyTool("t2", "Tool Two")])
+    reasoner = ReACTReasoner(llm=DummyLLM(text_queue=["t1", "t2"]), tools=tools, memory=DictMemory(), prefetch_load=True)
+
+    assert reasoner._select_tool("do it", []).id == "t1"
+    assert len(tools.loads) == 1 and tools.loads[0][0] == "t1"
+    assert tools.loads[0][1] != threading.current_thread().name
+
+    # A different winner is loaded inline
+    assert reasoner._select_tool("do the other thing", []).id == "t2"
+    assert tools.loads[-1] == ("t2", threading.current_thread().name)
+
+
+def test_react_speculative_params_uses_draft_for_selected_candidate():
+    import threading
+
+    class RoutingLLM(DummyLLM):
+        def __init__(self):
+            super().__init__()
+            self.think_outputs = [{"step_type": "ACT", "text": "post hi"}, {"step_type": "STOP", "text": "done"}]
+            self.param_threads: List[str] = []
+
+        def prompt(self, text: str, **kwargs) -> str:  # type: ignore[override]
+            return "t2"
+
+        def prompt_to_json(self, text: str, max_retries: int = 0, **kwargs):  # type: ignore[override]
+            if "Reasoning Engine" in kwargs.get("system", ""):
+                return self.think_outputs.pop(0)
+            self.param_threads.append(threading.current_thread().name)
+            key = "first" if '"first"' in text else "second"
+            return {key: "value"}
+
+    t1 = DummyTool("t1", "Tool One", schema={"first": {"type": "string"}})
+    t2 = DummyTool("t2", "Tool Two", schema={"second": {"type": "string"}})
+    llm = RoutingLLM()
+    tools = CaptureTools([t1, t2])
+    reasoner = ReACTReasoner(llm=llm, tools=tools, memory=DictMemory(), speculative_params=2)
+
+    result = reasoner.run("goal")
+
+    assert [tc["tool_id"] for tc in result.tool_calls] == ["t2"]
+    assert tools.last_params == {"second": "value"}
+    assert llm.param_threads and all(name.startswith("react-speculative") for name in llm.param_threads)
+
+
+def test_react_think_sends_static_instructions_as_system_message():
+    class SystemLLM(DummyLLM):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.calls: List[tuple] = []
+
+        def prompt_to_json(self, text: str, max_retries: int = 0, **kwargs):  # type: ignore[override]
+            self.calls.append((text, kwargs.get("system")))
+            return super().prompt_to_json(text, max_retries=max_retries)
+
+    llm = SystemLLM(json_queue=[{"step_type": "THINK", "text": "hmm"}, {"step_type": "STOP", "text": "done"}])
+    reasoner = ReACTReasoner(llm=llm, tools=DummyTools([]), memory=DictMemory())
+
+    reasoner.run("goal")
+
+    (first_text, first_system), (second_text, second_system) = llm.calls
+    assert "Reasoning Engine" in first_system and "{{" not in first_system
+    assert first_system == second_system
+    assert first_text == "<transcript>\nGoal: goal"
+    # Append-only: each turn's think input extends the previous one byte for byte
+    assert second_text.startswith(first_text) and second_text.endswith("THINK: hmm")
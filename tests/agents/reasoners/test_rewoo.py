@@ -1,5 +1,5 @@
 from agents.memory.dict_memory import DictMemory
-from agents.reasoner.rewoo import ReWOOReasoner, Step
+from agents.reasoner.rewoo import ReasonerState, ReWOOReasoner, Step
 from agents.reasoner.exceptions import ParameterGenerationError
 from typing import Any, Dict, List
 import pytest
@@ -332,12 +332,12 @@ def test_rewoo_param_gen_error_triggers_reflection_and_no_tool_call():
             super().__init__(text_queue=text_queue, json_queue=json_queue)
             self._raised_once = False
 
-        def prompt_to_json(self, text: str, max_retries: int = 0):  # type: ignore[override]
+        def prompt_to_json(self, text: str, max_retries: int = 0, **kwargs):  # type: ignore[override]
             # Raise only on first call (param gen), allow subsequent reflection JSON to pass
             if not self._raised_once:
                 self._raised_once = True
                 raise ValueError("bad json")
-            return super().prompt_to_json(text, max_retries=max_retries)
+            return super().prompt_to_json(text, max_retries=max_retries, **kwargs)
 
     plan_text = "- act (output: k1)"
     t1 = DummyTool("t1", "Tool One", schema={"a": {}})
@@ -875,3 +875,709 @@ def test_rewoo_generate_params_reflector_suggestion_with_multiple_schemas():
     assert result == {"param1": "value1", "param3": True}
 
 
+
+
+def test_rewoo_parallel_steps_run_independent_steps_together():
+    import threading
+
+    barrier = threading.Barrier(2, timeout=5)
+
+    class RoutingLLM(DummyLLM):
+        def prompt(self, text: str, **kwargs) -> str:  # type: ignore[override]
+            if "Sub-Task:" in text:
+                task = text.split("Sub-Task:", 1)[1].splitlines()[0].strip()
+                if task in ("fetch a", "fetch b"):
+                    barrier.wait()  # both independent steps must be in flight at once
+                return f"result of {task}"
+            if "Step:" in text:
+                return "REASONING"
+            return "- fetch a (output: a)\n- fetch b (output: b)\n- combine (input: a, b) (output: c)"
+
+    memory: Dict[str, Any] = DictMemory()
+    reasoner = ReWOOReasoner(llm=RoutingLLM(), tools=DummyTools([]), memory=memory, max_parallel_steps=2)
+
+    result = reasoner.run("goal")
+
+    assert result.success and result.iterations == 3
+    assert memory["c"] == "result of combine"
+    assert result.transcript.splitlines()[-1].startswith("Executed step: combine")
+
+
+def test_rewoo_batch_classification_labels_a_wave_with_one_call():
+    calls: List[str] = []
+
+    class RoutingLLM(DummyLLM):
+        def prompt(self, text: str, **kwargs) -> str:  # type: ignore[override]
+            if "Sub-Task:" in text:
+                return "result of " + text.split("Sub-Task:", 1)[1].splitlines()[0].strip()
+            if "Steps:" in text:
+                calls.append("batch")
+                return "1. REASONING\n2. REASONING"
+            if "Step:" in text:
+                calls.append("single")
+                return "REASONING"
+            return "- fetch a (output: a)\n- fetch b (output: b)\n- combine (input: a, b) (output: c)"
+
+    memory: Dict[str, Any] = DictMemory()
+    reasoner = ReWOOReasoner(llm=RoutingLLM(), tools=DummyTools([]), memory=memory, max_parallel_steps=2, batch_classification=True)
+
+    result = reasoner.run("goal")
+
+    assert result.success and memory["c"] == "result of combine"
+    # The first wave is classified together; "combine" runs alone
+    assert calls == ["batch", "single"]
+
+
+def test_rewoo_close_shuts_down_worker_pool():
+    with ReWOOReasoner(llm=DummyLLM(), tools=DummyTools([]), memory=DictMemory(), max_parallel_steps=2) as reasoner:
+        pool = reasoner._pool()
+        assert pool.submit(lambda: 1).result() == 1
+
+    assert reasoner._executor is None
+    assert pool._shutdown
+    reasoner.close()  # idempotent
+
+
+def test_rewoo_parallel_wave_records_history_in_plan_order():
+    import threading
+
+    b_done = threading.Event()
+
+    class RoutingLLM(DummyLLM):
+        def prompt(self, text: str, **kwargs) -> str:  # type: ignore[override]
+            if "Sub-Task:" in text:
+                task = text.split("Sub-Task:", 1)[1].splitlines()[0].strip()
+                if task == "fetch a":
+                    assert b_done.wait(timeout=5)  # "fetch a" finishes last
+                elif task == "fetch b":
+                    b_done.set()
+                return f"result of {task}"
+            if "Step:" in text:
+                return "REASONING"
+            return "- fetch a (output: a)\n- fetch b (output: b)"
+
+    memory: Dict[str, Any] = DictMemory()
+    reasoner = ReWOOReasoner(llm=RoutingLLM(), tools=DummyTools([]), memory=memory, max_parallel_steps=2)
+
+    result = reasoner.run("goal")
+
+    assert result.transcript.splitlines() == ["Executed step: fetch a -> result of fetch a", "Executed step: fetch b -> result of fetch b"]
+    assert reasoner._memory_version == 2
+
+
+def test_rewoo_next_wave_takes_steps_whose_producers_are_done():
+    from agents.reasoner.rewoo import ReasonerState
+
+    reasoner = ReWOOReasoner(llm=DummyLLM(), tools=DummyTools([]), memory=DictMemory(), max_parallel_steps=4)
+    state = ReasonerState(goal="g", plan=[
+        Step(text="a", output_key="a", index=0),
+        Step(text="b", output_key="b", index=1),
+        Step(text="c", input_keys=["a"], output_key="c", deps=frozenset({0}), index=2),
+        Step(text="d", output_key="d", index=3),
+        Step(text="e", input_keys=["c"], output_key="e", deps=frozenset({0, 2}), index=4),
+    ])
+
+    # "c" waits on "a", so the wave looks past it to "d"; "e" waits on "c"
+    assert [s.text for s in reasoner._next_wave(state, budget=10)] == ["a", "b", "d"]
+    # A retried "a" is queued again, so "c" still waits for it
+    state.push_front(Step(text="a", output_key="a", index=0))
+    assert [s.text for s in reasoner._next_wave(state, budget=10)] == ["a"]
+    assert [s.text for s in reasoner._next_wave(state, budget=10)] == ["c"]
+    assert [s.text for s in reasoner._next_wave(state, budget=10)] == ["e"]
+
+
+def test_rewoo_compiled_templates_match_str_format():
+    from agents.reasoner.rewoo import _PROMPTS, _SYSTEM, _TEMPLATES
+
+    fields = {"goal": "g", "step": "s", "failed_tool_id": None, "error_type": "E", "error_message": "m", "tool_details": None}
+    assert _TEMPLATES["reflect_input"].format(**fields) == _PROMPTS["reflect_input"].format(**fields)
+    assert _TEMPLATES["param_gen_input"].fields == {"step", "step_inputs", "tool_schema", "allowed_keys", "required_keys"}
+    # System parts are static, so they go out byte-identical on every call
+    assert all(not _TEMPLATES[name].fields and text == _PROMPTS[name].format() for name, text in _SYSTEM.items())
+
+
+def test_rewoo_step_clone_for_retry_is_a_fresh_pending_copy():
+    from agents.reasoner.rewoo import StepStatus
+
+    step = Step(text="s", output_key="o", input_keys=["a"], status=StepStatus.FAILED, result="partial", error="boom", retry_count=1)
+    clone = step.clone_for_retry()
+
+    assert (clone.text, clone.output_key, clone.input_keys, clone.error) == ("s", "o", ["a"], "boom")
+    assert clone.status == StepStatus.PENDING and clone.result is None and clone.retry_count == 2
+    assert clone.input_keys is not step.input_keys
+
+
+def test_rewoo_plan_records_transitive_step_dependencies():
+    plan_text = "\n".join([
+        "- fetch a (output: a)",
+        "- fetch b (output: b)",
+        "- combine (input: a) (output: c)",
+        "- report (input: c, b) (output: d)",
+    ])
+    reasoner = ReWOOReasoner(llm=DummyLLM(text_queue=[plan_text]), tools=DummyTools([]), memory=DictMemory())
+
+    plan = reasoner._plan("goal")
+
+    assert [s.deps for s in plan] == [frozenset(), frozenset(), {0}, {0, 1, 2}]
+    assert plan[3].clone_for_retry().deps == {0, 1, 2}
+
+
+def test_rewoo_state_push_front_reuses_taken_slot():
+    from agents.reasoner.rewoo import ReasonerState
+
+    state = ReasonerState(goal="g", plan=[Step(text="a"), Step(text="b")])
+    state.push_front(Step(text="first"))
+    assert [s.text for s in state.plan] == ["first", "a", "b"]
+
+    taken = state.pop_step()
+    state.push_front(taken.clone_for_retry())
+    assert len(state.plan) == 3 and state.remaining == 3
+    assert [state.pop_step().text for _ in range(state.remaining)] == ["first", "a", "b"]
+
+
+def test_rewoo_search_is_memoized_across_selection_and_reflection():
+    class CountingTools(DummyTools):
+        searches = 0
+
+        def search(self, query, top_k=15):
+            self.searches += 1
+            return super().search(query, top_k=top_k)
+
+    t1 = DummyTool("t1", "Tool One")
+    llm = DummyLLM(
+        text_queue=["- act (output: k1)", "TOOL", "t1", "TOOL", "t1"],
+        json_queue=[{}, {"action": "rephrase_step", "step": "act"}, {}],
+    )
+    tools = CountingTools([t1], failures={"t1": ToolExecutionError("boom", t1)})
+    reasoner = ReWOOReasoner(llm=llm, tools=tools, memory=DictMemory(), max_retries=1)
+
+    reasoner.run("goal")
+
+    # Selection, reflection and the retried selection all searched "act" once
+    assert tools.searches == 1
+
+
+def test_rewoo_concurrent_searches_for_one_query_share_a_call():
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    started, release = threading.Event(), threading.Event()
+
+    class BlockingTools(DummyTools):
+        searches = 0
+
+        def search(self, query, top_k=15):
+            self.searches += 1
+            started.set()
+            release.wait(5)
+            return super().search(query, top_k=top_k)
+
+    tools = BlockingTools([DummyTool("t1", "Tool One")])
+    reasoner = ReWOOReasoner(llm=DummyLLM(), tools=tools, memory=DictMemory())
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(reasoner._search, "act", 5)
+        started.wait(5)
+        second = pool.submit(reasoner._search, "act", 5)
+        release.set()
+        assert first.result() is second.result()
+
+    assert tools.searches == 1
+
+
+def test_rewoo_selection_reuses_joined_summaries_for_retried_step():
+    class CountingTool(DummyTool):
+        summary_calls = 0
+
+        def get_summary(self):
+            CountingTool.summary_calls += 1
+            return super().get_summary()
+
+    reasoner = ReWOOReasoner(llm=DummyLLM(text_queue=["t1", "t1"]), tools=DummyTools([CountingTool("t1", "Tool One")]), memory=DictMemory())
+
+    reasoner._select_tool(Step(text="act"))
+    reasoner._select_tool(Step(text="act", retry_count=1))
+
+    assert CountingTool.summary_calls == 1
+
+
+def test_rewoo_reflection_reuses_selection_summaries_when_failed_tool_is_not_a_candidate():
+    class CountingTool(DummyTool):
+        summary_calls = 0
+
+        def get_summary(self):
+            CountingTool.summary_calls += 1
+            return super().get_summary()
+
+    llm = DummyLLM(text_queue=["t1"], json_queue=[{"action": "give_up"}])
+    reasoner = ReWOOReasoner(llm=llm, tools=DummyTools([CountingTool("t1", "Tool One")]), memory=DictMemory())
+    step = Step(text="act")
+    reasoner._select_tool(step)
+
+    suggested = DummyTool("t9", "Suggested Tool")
+    reasoner._reflect(ToolExecutionError("boom", suggested), step, ReasonerState(goal="g"))
+
+    assert CountingTool.summary_calls == 1
+
+
+def test_rewoo_plan_repair_asks_again_when_reply_has_no_bullets():
+    class RecordingLLM(DummyLLM):
+        prompts: List[str] = []
+
+        def prompt(self, text: str, **kwargs) -> str:  # type: ignore[override]
+            self.prompts.append(text)
+            return super().prompt(text, **kwargs)
+
+    llm = RecordingLLM(text_queue=["Sure! Here is a plan.", "- fetch data (output: k1)\n- summarize (input: k1) (output: k2)"])
+    reasoner = ReWOOReasoner(llm=llm, tools=DummyTools([]), memory=DictMemory(), plan_repair=True)
+
+    steps = reasoner._plan("goal")
+
+    assert [s.text for s in steps] == ["fetch data", "summarize"]
+    assert "Sure! Here is a plan." in llm.prompts[1] and "not a markdown bullet list" in llm.prompts[1]
+
+
+def test_rewoo_retried_step_reuses_the_loaded_tool():
+    class CountingTools(DummyTools):
+        loads = 0
+
+        def load(self, tool):
+            self.loads += 1
+            return super().load(tool)
+
+    t1 = DummyTool("t1", "Tool One", schema={})
+    llm = DummyLLM(
+        # plan, classify, select t1; the retry is classified again and takes the reflector's tool
+        text_queue=["- act (output: k1)", "TOOL", "t1", "TOOL"],
+        json_queue=[{}, {"action": "retry_params", "tool_id": "t1", "params": {}}],
+    )
+    tools = CountingTools([t1], failures={"t1": ToolExecutionError("boom", t1)})
+    reasoner = ReWOOReasoner(llm=llm, tools=tools, memory=DictMemory(), max_retries=1)
+
+    reasoner.run("goal")
+
+    assert tools.loads == 1
+
+
+def test_rewoo_reflection_history_entry_is_capped():
+    big_params = {"body": "x" * 50_000}
+    llm = DummyLLM(json_queue=[{"action": "retry_params", "tool_id": "t1", "params": big_params}])
+    reasoner = ReWOOReasoner(llm=llm, tools=DummyTools([]), memory=DictMemory())
+    state = ReasonerState(goal="g")
+
+    reasoner._reflect(ToolExecutionError("boom", DummyTool("t1", "Tool One")), Step(text="act"), state)
+
+    entry = next(h for h in state.history if h.startswith("Reflection decision"))
+    assert len(entry) < 9000
+
+
+def test_rewoo_reflector_params_do_not_encode_the_tool_schema():
+    memory = DictMemory()
+    reasoner = ReWOOReasoner(llm=DummyLLM(), tools=DummyTools([]), memory=memory)
+    tool = DummyTool("t1", "Tool One", schema={"q": {"type": "string"}})
+    step = Step(text="act")
+    memory[step.suggestion_key] = {"action": "retry_params", "tool_id": "t1", "params": {"q": "a", "extra": 1}}
+
+    assert reasoner._generate_params(step, tool, {}) == {"q": "a"}
+    assert "schema_json" not in vars(reasoner._tool_schema(tool))
+
+
+def test_rewoo_prefetch_alternatives_searches_during_the_first_reflection():
+    import threading
+
+    barrier = threading.Barrier(2, timeout=5)
+
+    class SlowSearchTools(DummyTools):
+        searches = 0
+
+        def search(self, query, top_k=15):
+            self.searches += 1
+            barrier.wait()  # the reflection call must be in flight at the same time
+            return super().search(query, top_k=top_k)
+
+    class WaitingLLM(DummyLLM):
+        def prompt_to_json(self, text: str, max_retries: int = 0, **kwargs):  # type: ignore[override]
+            if "Alternative Tools" not in text:
+                barrier.wait()
+            return super().prompt_to_json(text, max_retries=max_retries, **kwargs)
+
+    t2 = DummyTool("t2", "Tool Two")
+    llm = WaitingLLM(json_queue=[{"action": "change_tool", "tool_id": "t2"}, {"action": "change_tool", "tool_id": "t2"}])
+    tools = SlowSearchTools([t2])
+    reasoner = ReWOOReasoner(llm=llm, tools=tools, memory=DictMemory(), lazy_alternatives=True, prefetch_alternatives=True)
+    state = ReasonerState(goal="g")
+
+    reasoner._reflect(ParameterGenerationError("bad params", DummyTool("t1", "Tool One")), Step(text="act"), state)
+
+    assert tools.searches == 1
+    assert state.plan[0].text == "act" and llm.json_queue == []
+
+
+def test_rewoo_retry_clone_drops_the_previous_result():
+    step = Step(text="act", output_key="k", input_keys=["a"], result={"big": "payload"}, error="boom", index=3)
+
+    retry = step.clone_for_retry()
+
+    assert retry.result is None and retry.error == "boom" and retry.retry_count == 1
+    assert retry.input_keys == ["a"] and retry.input_keys is not step.input_keys and retry.index == 3
+    assert not hasattr(retry, "__dict__")  # slotted: no per-step attribute dict
+
+
+def test_rewoo_change_tool_loads_the_alternative_from_search_results():
+    t1, t2 = DummyTool("t1", "Tool One", schema={}), DummyTool("t2", "Tool Two", schema={})
+    llm = DummyLLM(
+        # plan, classify, select t1; the retry is classified again and takes the reflector's tool
+        text_queue=["- act (output: k1)", "TOOL", "t1", "TOOL"],
+        json_queue=[{}, {"action": "change_tool", "tool_id": "t2"}, {}],
+    )
+    tools = DummyTools([t1, t2], failures={"t1": ToolExecutionError("boom", t1)})
+    reasoner = ReWOOReasoner(llm=llm, tools=tools, memory=DictMemory(), max_retries=1)
+
+    result = reasoner.run("goal")
+
+    assert result.success and result.tool_calls == [{"tool_id": "t2", "summary": "Tool Two"}]
+
+
+def test_rewoo_fused_routing_classifies_and_selects_in_one_call():
+    plan_text = "\n".join([
+        "- fetch data (output: k1)",
+        "- decide the follow-up (input: k1) (output: k2)",
+    ])
+    llm = DummyLLM(
+        text_queue=[plan_text, "summary"],
+        json_queue=[
+            {"type": "TOOL", "tool_id": "t1"},  # route step 1
+            {},                                 # param_gen for step 1
+            {"type": "REASONING", "tool_id": "none"},  # route step 2
+        ],
+    )
+    memory = DictMemory()
+    reasoner = ReWOOReasoner(llm=llm, tools=DummyTools([DummyTool("t1", "Tool One", schema={})]), memory=memory, fused_routing=True)
+
+    result = reasoner.run("goal")
+
+    assert result.tool_calls == [{"tool_id": "t1", "summary": "Tool One"}]
+    assert memory.get("k2") == "summary"
+    assert llm.text_queue == [] and llm.json_queue == []
+
+
+def test_rewoo_verb_classification_skips_llm_for_unambiguous_steps():
+    plan_text = "\n".join([
+        "- fetch data (output: k1)",
+        "- summarize it (input: k1) (output: k2)",
+        "- decide next move (output: k3)",
+    ])
+    llm = DummyLLM(
+        # plan, tool selection, reasoning result, LLM classification of the ambiguous step, its result
+        text_queue=[plan_text, "t1", "summary", "REASONING", "decision"],
+        json_queue=[{}],
+    )
+    memory = DictMemory()
+    reasoner = ReWOOReasoner(llm=llm, tools=DummyTools([DummyTool("t1", "Tool One", schema={})]), memory=memory, verb_classification=True)
+
+    reasoner.run("goal")
+
+    assert memory.get("k2") == "summary" and memory.get("k3") == "decision"
+    assert llm.text_queue == []
+
+
+def test_rewoo_verb_classification_uses_leading_verb_when_both_families_appear():
+    plan_text = "\n".join([
+        "- send the summarized report (output: k1)",
+        "- summarize the fetched articles (input: k1) (output: k2)",
+    ])
+    # plan, tool selection, reasoning result; neither step is classified by the LLM
+    llm = DummyLLM(text_queue=[plan_text, "t1", "summary"], json_queue=[{}])
+    memory = DictMemory()
+    reasoner = ReWOOReasoner(llm=llm, tools=DummyTools([DummyTool("t1", "Tool One", schema={})]), memory=memory, verb_classification=True)
+
+    result = reasoner.run("goal")
+
+    assert result.tool_calls == [{"tool_id": "t1", "summary": "Tool One"}]
+    assert memory.get("k2") == "summary"
+    assert llm.text_queue == []
+
+
+def test_rewoo_tool_schema_is_derived_once_per_tool():
+    class CountingTool(DummyTool):
+        key_calls = 0
+
+        def get_parameter_keys(self):
+            CountingTool.key_calls += 1
+            return list(self.get_parameter_schema().keys())
+
+    tool = CountingTool("t1", "Tool One", schema={"q": {"type": "string"}})
+    llm = DummyLLM(json_queue=[{"q": "a"}, {"q": "b"}])
+    reasoner = ReWOOReasoner(llm=llm, tools=DummyTools([tool]), memory=DictMemory())
+
+    assert reasoner._generate_params(Step(text="s1"), tool, {}) == {"q": "a"}
+    assert reasoner._generate_params(Step(text="s2"), tool, {}) == {"q": "b"}
+    assert CountingTool.key_calls == 1
+
+    # A reloaded tool with a different schema is derived again
+    tool._schema = {"other": {"type": "string"}}
+    assert reasoner._tool_schema(tool).allowed_str == "other"
+
+
+def test_rewoo_max_input_chars_projects_records_and_cuts_long_text():
+    class PromptRecordingLLM(DummyLLM):
+        prompts: List[str] = []
+
+        def prompt(self, text: str, **kwargs) -> str:
+            self.prompts.append(text)
+            return super().prompt(text, **kwargs)
+
+    articles = [{"title": f"t{i}", "body": "x" * 5000, "url": f"u{i}"} for i in range(2)]
+    llm = PromptRecordingLLM(text_queue=["REASONING", "done"])
+    memory = DictMemory()
+    memory["k1"] = articles
+    reasoner = ReWOOReasoner(llm=llm, tools=DummyTools([]), memory=memory, max_input_chars=1000)
+
+    reasoner._execute(Step(text="summarize each title", input_keys=["k1"], output_key="k2"), ReasonerState(goal="goal"))
+
+    assert '{"k1":[{"title":"t0"},{"title":"t1"}]}' in llm.prompts[-1]
+    assert memory["k2"] == "done"
+
+
+def test_rewoo_lazy_alternatives_searches_only_when_changing_tool():
+    from agents.reasoner.exceptions import ParameterGenerationError
+
+    class CountingTools(DummyTools):
+        searches = 0
+
+        def search(self, query, top_k=15):
+            self.searches += 1
+            return super().search(query, top_k=top_k)
+
+    t1 = DummyTool("t1", "Tool One")
+    tools = CountingTools([t1, DummyTool("t2", "Tool Two")])
+    llm = DummyLLM(json_queue=[{"action": "retry_params", "params": {}}, {"action": "change_tool"}, {"action": "change_tool", "tool_id": "t2"}])
+    reasoner = ReWOOReasoner(llm=llm, tools=tools, memory=DictMemory(), lazy_alternatives=True)
+    state = ReasonerState(goal="goal")
+
+    reasoner._reflect(ParameterGenerationError("bad params", t1), Step(text="act"), state)
+    assert tools.searches == 0
+
+    reasoner._reflect(ParameterGenerationError("bad params", t1), Step(text="act"), state)
+    assert tools.searches == 1
+    assert reasoner.memory["rewoo_reflector_suggestion:act"]["tool_id"] == "t2"
+
+
+def test_rewoo_head_str_matches_str_prefix_without_rendering_everything():
+    from agents.reasoner.rewoo import _head_str
+
+    class Exploding:
+        def __repr__(self):
+            raise AssertionError("rendered past the prefix")
+
+    samples = [None, "abc" * 50, [1, "x" * 300, None], {"a": [1, 2], "b": {"c": "d'"}}, ("a",), (1, 2), 3.5]
+    for obj in samples:
+        for n in (1, 10, 100):
+            assert _head_str(obj, n) == (None if obj is None else str(obj)[:n])
+    assert _head_str(["y" * 200, Exploding()], 100) == str(["y" * 200])[:100]
+
+
+def test_rewoo_direct_params_skips_llm_for_trivial_schemas():
+    llm = DummyLLM(json_queue=[{"query": "from llm", "limit": 5}])
+    reasoner = ReWOOReasoner(llm=llm, tools=DummyTools([]), memory=DictMemory(), direct_params=True)
+    search = DummyTool("search", "Search", schema={"type": "object", "properties": {"query": {}, "limit": {}}, "required": ["query"]})
+    search.get_parameter_keys = lambda: ["query", "limit"]
+    search.get_required_parameter_keys = lambda: ["query"]
+
+    assert reasoner._generate_params(Step(text="ping"), DummyTool("ping", "Ping"), {}) == {}
+    assert reasoner._generate_params(Step(text="find"), search, {"Query": "cats"}) == {"query": "cats"}
+    assert reasoner._generate_params(Step(text="find"), search, {"topic": "cats"}) == {"query": "from llm", "limit": 5}
+
+
+def test_rewoo_direct_params_pass_the_stored_value_when_inputs_are_projected():
+    query = "cats " * 200
+    memory = DictMemory()
+    memory["query"] = query
+    search = DummyTool("search", "Search", schema={"type": "object", "properties": {"query": {}}, "required": ["query"]})
+    search.get_parameter_keys = lambda: ["query"]
+    search.get_required_parameter_keys = lambda: ["query"]
+    tools = CaptureTools([search])
+    reasoner = ReWOOReasoner(llm=DummyLLM(text_queue=["TOOL", "search"]), tools=tools, memory=memory, direct_params=True, max_input_chars=50)
+
+    reasoner._execute(Step(text="search the query", input_keys=["query"], output_key="out"), ReasonerState(goal="g"))
+
+    assert tools.last_params == {"query": query}
+
+
+def test_rewoo_step_suggestion_key_follows_rephrased_text():
+    step = Step(text="act")
+    key = step.suggestion_key
+
+    assert key == "rewoo_reflector_suggestion:act" and step.suggestion_key is key
+    step.text = "act again"
+    assert step.suggestion_key == "rewoo_reflector_suggestion:act again"
+
+
+def test_rewoo_structured_output_sends_parameter_and_reflection_schemas():
+    class SchemaLLM(DummyLLM):
+        calls: List[Dict[str, Any]] = []
+
+        def prompt_to_json(self, text: str, max_retries: int = 0, **kwargs) -> Dict[str, Any]:  # type: ignore[override]
+            self.calls.append({"max_retries": max_retries, **kwargs})
+            return super().prompt_to_json(text, max_retries=max_retries, **kwargs)
+
+    llm = SchemaLLM(json_queue=[{"q": "cats"}, {"action": "give_up"}])
+    reasoner = ReWOOReasoner(llm=llm, tools=DummyTools([]), memory=DictMemory(), structured_output=True, max_retries=3)
+    tool = DummyTool("t1", "Tool One", schema={"q": {"type": "string"}})
+
+    assert reasoner._generate_params(Step(text="find"), tool, {}) == {"q": "cats"}
+    reasoner._reflect(ToolExecutionError("boom", tool), Step(text="find"), ReasonerState(goal="goal"))
+
+    params_format, reflection_format = (call["response_format"] for call in llm.calls)
+    assert params_format["type"] == "json_schema"
+    assert params_format["json_schema"]["schema"]["properties"] == {"q": {"type": "string"}}
+    assert "give_up" in reflection_format["json_schema"]["schema"]["properties"]["action"]["enum"]
+    # Providers that ignore json_schema still get the usual correction rounds.
+    assert [call["max_retries"] for call in llm.calls] == [3, 2]
+
+
+def test_rewoo_exhausted_retries_skip_reflection():
+    t1 = DummyTool("t1", "Tool One")
+    reasoner = ReWOOReasoner(llm=DummyLLM(), tools=DummyTools([t1]), memory=DictMemory(), max_retries=1)
+    reasoner._reflect = lambda *args: pytest.fail("reflection should be skipped")  # type: ignore[method-assign]
+    state = ReasonerState(goal="goal")
+    step = Step(text="act", retry_count=1)
+
+    assert reasoner._handle_step_error(ToolExecutionError("boom", t1), step, state) is False
+    assert state.history == ["Giving-up after 1 retries: act"] and step.error
+
+
+def test_rewoo_reflection_without_failed_tool_skips_alternatives_search():
+    tools = DummyTools([DummyTool("t1", "Tool One")])
+    tools.search = lambda *args, **kwargs: pytest.fail("no alternatives needed")  # type: ignore[method-assign]
+    llm = DummyLLM(json_queue=[{"action": "rephrase_step", "step": "act better"}])
+    reasoner = ReWOOReasoner(llm=llm, tools=tools, memory=DictMemory())
+    state = ReasonerState(goal="goal", plan=[Step(text="act")], plan_head=1)
+
+    reasoner._reflect(ParameterGenerationError("bad params", None), state.plan[0], state)
+
+    assert state.pop_step().text == "act better"
+
+
+def test_rewoo_plan_cache_reuses_raw_plan_for_same_goal(tmp_path):
+    import shelve
+
+    plan_text = "- fetch data (output: k1)\n- summarize (input: k1) (output: k2)"
+    with shelve.open(str(tmp_path / "plans")) as cache:
+        first = ReWOOReasoner(llm=DummyLLM(text_queue=[plan_text]), tools=DummyTools([]), memory=DictMemory(), plan_cache=cache)
+        assert len(first._plan("goal")) == 2
+
+        llm = DummyLLM(text_queue=["- something else (output: x)"])
+        second = ReWOOReasoner(llm=llm, tools=DummyTools([]), memory=DictMemory(), plan_cache=cache)
+        plan = second._plan("goal")
+        assert [s.text for s in plan] == ["fetch data", "summarize"] and plan[1].deps == {0}
+        assert llm.text_queue == ["- something else (output: x)"]
+
+        expired = ReWOOReasoner(llm=llm, tools=DummyTools([]), memory=DictMemory(), plan_cache=cache, plan_cache_ttl=-1)
+        assert [s.text for s in expired._plan("goal")] == ["something else"]
+
+
+def test_rewoo_classification_similarity_recalls_label_for_similar_steps():
+    llm = DummyLLM(text_queue=["REASONING", "first", "second", "TOOL"])
+    reasoner = ReWOOReasoner(llm=llm, tools=DummyTools([]), memory=DictMemory(), classification_similarity=0.6)
+    state = ReasonerState(goal="goal")
+
+    reasoner._execute(Step(text="rank the top news stories"), state)
+    # Near-identical wording reuses the label; the LLM is only asked for the reasoning result
+    reasoner._execute(Step(text="rank the top news stories again"), state)
+
+    assert state.history[-1] == "Executed step: rank the top news stories again -> second"
+    assert reasoner._recall_classification("book a flight") is None
+
+
+def test_rewoo_fused_routing_skips_search_for_plain_reasoning_steps():
+    tools = DummyTools([DummyTool("t1", "Tool One")])
+    tools.search = lambda *args, **kwargs: pytest.fail("reasoning step should not search")  # type: ignore[method-assign]
+    memory = DictMemory()
+    memory["k1"] = ["a", "b"]
+    reasoner = ReWOOReasoner(llm=DummyLLM(text_queue=["short summary"]), tools=tools, memory=memory, fused_routing=True)
+
+    reasoner._execute(Step(text="summarize the results", input_keys=["k1"], output_key="k2"), ReasonerState(goal="goal"))
+
+    assert memory["k2"] == "short summary"
+
+
+def test_rewoo_keep_search_results_reuses_searches_across_runs():
+    class CountingTools(DummyTools):
+        searches = 0
+
+        def search(self, query, top_k=15):
+            self.searches += 1
+            return super().search(query, top_k=top_k)
+
+    tools = CountingTools([DummyTool("t1", "Tool One", schema={})])
+    llm = DummyLLM(text_queue=["- act (output: k1)", "TOOL", "t1"] * 3)
+    reasoner = ReWOOReasoner(llm=llm, tools=tools, memory=DictMemory(), keep_search_results=True)
+
+    reasoner.run("goal")
+    reasoner.run("goal")
+    assert tools.searches == 1
+
+    reasoner.clear_search_results()
+    reasoner.run("goal")
+    assert tools.searches == 2
+
+
+def test_rewoo_inputs_json_matches_sorted_dump_and_reuses_encodings(monkeypatch):
+    from agents.reasoner import rewoo
+    from utils import fast_json
+
+    reasoner = ReWOOReasoner(llm=DummyLLM(), tools=DummyTools([]), memory=DictMemory())
+    articles = [{"url": "u", "title": "é"}]
+    inputs = {"b": articles, "a": {"z": 1, "y": None}}
+
+    assert reasoner._inputs_json(inputs) == fast_json.dumps(inputs, sort_keys=True)
+
+    encoded: List[Any] = []
+    monkeypatch.setattr(rewoo.fast_json, "dumps", lambda obj, **kw: encoded.append(obj) or fast_json.json.dumps(obj, **kw))
+    reasoner._inputs_json({"b": articles})
+    assert encoded == ["b"]
+
+
+def test_rewoo_inputs_json_falls_back_to_insertion_order_for_mixed_keys():
+    import json
+
+    reasoner = ReWOOReasoner(llm=DummyLLM(), tools=DummyTools([]), memory=DictMemory())
+    counts = {2: "two", "one": 1}
+
+    assert json.loads(reasoner._inputs_json({"counts": counts})) == {"counts": {"2": "two", "one": 1}}
+
+
+def test_rewoo_plan_strips_directives_anywhere_in_bullet():
+    plan_text = "\n".join([
+        "* fetch (output: raw) the feed",
+        "1. tidy (input: raw) up the (output: clean) feed",
+    ])
+    reasoner = ReWOOReasoner(llm=DummyLLM(text_queue=[plan_text]), tools=DummyTools([]), memory=DictMemory())
+
+    plan = reasoner._plan("goal")
+
+    assert [(s.text, s.input_keys, s.output_key) for s in plan] == [
+        ("fetch  the feed", [], "raw"),
+        ("tidy  up the  feed", ["raw"], "clean"),
+    ]
+
+
+def test_rewoo_plan_reads_bullets_across_line_endings():
+    plan_text = "Plan:\r\n-\r\n- fetch (output: a)\r\n\r\n  2. report (input: a)\nnot a bullet"
+    reasoner = ReWOOReasoner(llm=DummyLLM(text_queue=[plan_text]), tools=DummyTools([]), memory=DictMemory())
+
+    assert [s.text for s in reasoner._plan("goal")] == ["fetch", "report"]
+
+
+def test_rewoo_memory_keys_rebuilt_only_after_writes():
+    memory = DictMemory()
+    memory["a"] = 1
+    llm = DummyLLM(text_queue=["REASONING", "done"])
+    reasoner = ReWOOReasoner(llm=llm, tools=DummyTools([]), memory=memory)
+
+    joined = reasoner._memory_keys()
+    assert joined == "a" and reasoner._memory_keys() is joined
+
+    reasoner._execute(Step(text="think", output_key="b"), ReasonerState(goal="goal"))
+    assert reasoner._memory_keys() == "a, b"
@@ -172,7 +172,7 @@ def test_agent_summarize_uses_only_last_12kb_of_transcript(monkeypatch):
     captured_prompt = {"text": None}
 
     class CapturingLLM(DummyLLM):
-        def prompt(self, text: str) -> str:  # type: ignore[override]
+        def prompt(self, text: str, **kwargs) -> str:  # type: ignore[override]
             captured_prompt["text"] = text
             return "OK"
 
@@ -403,3 +403,19 @@ def test_agent_invalid_timezone_stores_none(caplog):
     # Should store None (not an invalid string or OS fallback)
     tz = agent.memory["context"]["timezone"]
     assert tz is None
+
+
+def test_agent_summarize_sends_static_instructions_as_system_message():
+    captured: Dict[str, Any] = {}
+
+    class CapturingLLM(DummyLLM):
+        def prompt(self, text: str, **kwargs) -> str:  # type: ignore[override]
+            captured["text"], captured["system"] = text, kwargs.get("system")
+            return "OK"
+
+    agent = StandardAgent(llm=CapturingLLM(), tools=DummyTools(), memory=DictMemory(), reasoner=DummyReasoner())
+    agent.solve("g")
+
+    assert "Final Answer Synthesizer" in captured["system"]
+    assert "Goal was: g" not in captured["system"]
+    assert "User's Goal: g" in captured["text"] and "Goal was: g" in captured["text"]
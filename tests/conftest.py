@@ -28,12 +28,12 @@ class DummyLLM(BaseLLM):
         return self.text_queue.pop(0)
 
     # Override to avoid BaseLLM JSON-mode behavior
-    def prompt(self, text: str) -> str:  # type: ignore[override]
+    def prompt(self, text: str, **kwargs) -> str:  # type: ignore[override]
         if not self.text_queue:
             return ""
         return self.text_queue.pop(0)
 
-    def prompt_to_json(self, text: str, max_retries: int = 0) -> Dict[str, Any]:  # type: ignore[override]
+    def prompt_to_json(self, text: str, max_retries: int = 0, **kwargs) -> Dict[str, Any]:  # type: ignore[override]
         if not self.json_queue:
             return {}
         return self.json_queue.pop(0)
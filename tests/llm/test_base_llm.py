@@ -0,0 +1,63 @@
+# test_base_llm.py
+
+import json
+from typing import List
+
+import pytest
+
+from agents.llm.base_llm import BaseLLM
+from agents.llm.exceptions import JSONParseError
+
+
+class LegacyLLM(BaseLLM):
+    """Overrides prompt/prompt_to_json with the pre-``system`` signatures."""
+
+    def __init__(self):
+        super().__init__(model="fake-model", temperature=0)
+        self.prompts: List[str] = []
+
+    def completion(self, messages, **kwargs):
+        return BaseLLM.LLMResponse(text="unused")
+
+    def prompt(self, content):
+        self.prompts.append(content)
+        return "ok"
+
+    def prompt_to_json(self, content, max_retries=3):
+        self.prompts.append(content)
+        return {"ok": True}
+
+
+class RecordingLLM(BaseLLM):
+    def __init__(self):
+        super().__init__(model="fake-model", temperature=0)
+        self.messages = []
+
+    def completion(self, messages, **kwargs):
+        self.messages.append(messages)
+        return BaseLLM.LLMResponse(text="ok")
+
+
+def test_legacy_prompt_override_folds_system_into_content():
+    llm = LegacyLLM()
+    assert llm.prompt("question", system="rules") == "ok"
+    assert llm.prompt_to_json("question", max_retries=0, system="rules") == {"ok": True}
+    assert llm.prompt("plain") == "ok"
+    assert llm.prompts == ["rules\n\nquestion", "rules\n\nquestion", "plain"]
+
+
+def test_system_aware_prompt_sends_system_message():
+    llm = RecordingLLM()
+    llm.prompt("question", system="rules")
+    assert llm.messages == [[{"role": "system", "content": "rules"}, {"role": "user", "content": "question"}]]
+
+
+def test_prompt_to_json_failure_carries_raw_reply():
+    class BadJSONLLM(RecordingLLM):
+        def completion(self, messages, **kwargs):
+            return BaseLLM.LLMResponse(text="not json at all")
+
+    with pytest.raises(json.JSONDecodeError) as info:
+        BadJSONLLM().prompt_to_json("question")
+    assert isinstance(info.value, JSONParseError)
+    assert info.value.raw_content == "not json at all"
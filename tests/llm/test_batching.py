@@ -0,0 +1,106 @@
+# test_batching.py
+
+import threading
+from typing import Any, Dict, List
+
+from agents.llm.base_llm import BaseLLM
+from agents.llm.batching import BatchingLLM
+
+
+class RecordingLLM(BaseLLM):
+    def __init__(self, fail: bool = False):
+        super().__init__(model="fake-model", temperature=0)
+        self.fail = fail
+        self.single_calls: List[str] = []
+        self.batch_calls: List[List[str]] = []
+        self.kwargs: List[Dict[str, Any]] = []
+        self.release = threading.Event()
+
+    def completion(self, messages, **kwargs):
+        return BaseLLM.LLMResponse(text=f"reply:{messages[-1]['content']}")
+
+    def prompt(self, content, *, system=None, **kwargs):
+        if content == "slow":
+            self.release.wait(timeout=10)
+            return "reply:slow"
+        self.single_calls.append(content)
+        self.kwargs.append({"system": system, **kwargs})
+        return f"reply:{content}"
+
+    def prompt_batch(self, contents, **kwargs):
+        if self.fail:
+            raise RuntimeError("provider down")
+        self.batch_calls.append(list(contents))
+        self.kwargs.append(kwargs)
+        return [f"reply:{c}" for c in contents]
+
+
+def run_concurrently(llm: BatchingLLM, inner: RecordingLLM, texts: str, **kwargs) -> Dict[str, Any]:
+    """Prompt once per text from separate threads while another prompt is in flight, so callers wait to batch."""
+    slow = threading.Thread(target=llm.prompt, args=("slow",), kwargs={"system": "other"})
+    slow.start()
+    while llm._active == 0:
+        pass
+    barrier = threading.Barrier(len(texts))
+    results: Dict[str, Any] = {}
+
+    def worker(text: str) -> None:
+        barrier.wait()
+        try:
+            results[text] = llm.prompt(text, **kwargs)
+        except Exception as e:
+            results[text] = e
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in texts]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+    inner.release.set()
+    slow.join(timeout=10)
+    return results
+
+
+class TestBatchingLLM:
+    # Tests that a lone caller is sent straight to the wrapped LLM without waiting for a batch
+    def test_sequential_prompt_is_sent_directly(self):
+        inner = RecordingLLM()
+        llm = BatchingLLM(inner, max_wait_ms=10_000)
+
+        assert llm.prompt("a", system="sys") == "reply:a"
+        assert inner.single_calls == ["a"]
+        assert inner.kwargs == [{"system": "sys"}]
+        assert llm.model == "fake-model" and llm.temperature == 0
+
+    # Tests that concurrent prompts with the same system message share one prompt_batch call
+    def test_concurrent_prompts_are_coalesced(self):
+        inner = RecordingLLM()
+        llm = BatchingLLM(inner, max_batch=4, max_wait_ms=5_000)
+
+        results = run_concurrently(llm, inner, "abcd", system="sys")
+
+        assert results == {t: f"reply:{t}" for t in "abcd"}
+        assert [sorted(call) for call in inner.batch_calls] == [["a", "b", "c", "d"]]
+        assert inner.kwargs == [{"system": "sys"}]
+
+    # Tests that a failing batch call surfaces the error to every caller in the batch
+    def test_batch_failure_reaches_every_caller(self):
+        inner = RecordingLLM(fail=True)
+        llm = BatchingLLM(inner, max_batch=2, max_wait_ms=5_000)
+
+        results = run_concurrently(llm, inner, "ab")
+
+        assert all(isinstance(r, RuntimeError) for r in results.values()) and len(results) == 2
+
+    # Tests that JSON prompts go through the batched path with JSON mode requested
+    def test_prompt_to_json_parses_batched_reply(self):
+        class JsonLLM(RecordingLLM):
+            def prompt(self, content, *, system=None, **kwargs):
+                super().prompt(content, system=system, **kwargs)
+                return '```json\n{"ok": true}\n```'
+
+        inner = JsonLLM()
+        llm = BatchingLLM(inner)
+
+        assert llm.prompt_to_json("q", max_retries=0, system="sys") == {"ok": True}
+        assert inner.kwargs == [{"system": "sys", "response_format": {"type": "json_object"}}]
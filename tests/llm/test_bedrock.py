@@ -4,7 +4,8 @@ import pytest
 import json
 import os
 from unittest.mock import patch, MagicMock
-from agents.llm.bedrock import BedrockLLM, JSON_CORRECTION_PROMPT
+from agents.llm.bedrock import BedrockLLM
+from agents.llm.base_llm import JSON_CORRECTION_PROMPT
 
 class TestBedrockLLM:
     # Tests default initialisation of LLM service with default model from environment variable
@@ -306,7 +307,8 @@ class TestBedrockLLM:
     @patch("agents.llm.base_llm.BaseLLM.prompt_to_json")
     @patch('agents.llm.bedrock.boto3.client')
     def test_prompt_to_json_uses_raw_content_when_available(self, mock_boto_client, mock_base_prompt_to_json):
-        from agents.llm.bedrock import BedrockLLM, JSON_CORRECTION_PROMPT
+        from agents.llm.bedrock import BedrockLLM
+        from agents.llm.base_llm import JSON_CORRECTION_PROMPT
         svc = BedrockLLM(model="test-model")
         class FakeError(json.JSONDecodeError):
             def __init__(self):
@@ -402,60 +404,6 @@ class TestBedrockLLM:
         assert isinstance(result, BaseLLM.LLMResponse)
         assert result.text == ""  # Empty when extraction fails
 
-    @patch("agents.llm.base_llm.BaseLLM.prompt_to_json")
-    @patch('agents.llm.bedrock.boto3.client')
-    def test_prompt_to_json_uses_raw_content_when_available(self, mock_boto_client, mock_base_prompt_to_json):
-        from agents.llm.bedrock import BedrockLLM, JSON_CORRECTION_PROMPT
-        svc = BedrockLLM(model="test-model")
-        class FakeError(json.JSONDecodeError):
-            def __init__(self):
-                super().__init__("bad json", "", 0)
-                self.raw_content = "RAW_JSON_ERROR_CONTENT"
-        # First call raises error with raw_content, second returns success
-        mock_base_prompt_to_json.side_effect = [FakeError(), {"fixed": True}]
-        result = svc.prompt_to_json("prompt", max_retries=1)
-        assert result == {"fixed": True}
-        # Check that the correction prompt used raw_content
-        correction_prompt = JSON_CORRECTION_PROMPT.format(
-            original_prompt="prompt",
-            bad_json="RAW_JSON_ERROR_CONTENT"
-        )
-        called_args = mock_base_prompt_to_json.call_args_list[1][0][0]
-        assert called_args == correction_prompt
-
-    @patch("agents.llm.base_llm.BaseLLM.prompt_to_json")
-    @patch('agents.llm.bedrock.boto3.client')
-    def test_prompt_to_json_fallback_when_raw_content_missing(self, mock_boto_client, mock_base_prompt_to_json):
-        svc = BedrockLLM(model="test-model")
-        # Error without raw_content
-        err = json.JSONDecodeError("bad json", "", 0)
-        mock_base_prompt_to_json.side_effect = [err, {"fixed": True}]
-        result = svc.prompt_to_json("prompt", max_retries=1)
-        assert result == {"fixed": True}
-        correction_prompt = JSON_CORRECTION_PROMPT.format(
-            original_prompt="prompt",
-            bad_json="The previous response was not valid JSON"
-        )
-        called_args = mock_base_prompt_to_json.call_args_list[1][0][0]
-        assert called_args == correction_prompt
-
-    @patch("agents.llm.base_llm.BaseLLM.prompt_to_json")
-    @patch('agents.llm.bedrock.boto3.client')
-    def test_prompt_to_json_correction_prompt_content_differs_by_raw_availability(self, mock_boto_client, mock_base_prompt_to_json):
-        svc = BedrockLLM(model="test-model")
-        class FakeError(json.JSONDecodeError):
-            def __init__(self):
-                super().__init__("bad json", "", 0)
-                self.raw_content = "RAW_JSON_ERROR_CONTENT"
-        # First with raw_content, then without
-        mock_base_prompt_to_json.side_effect = [FakeError(), json.JSONDecodeError("bad json", "", 0), {"fixed": True}]
-        svc.prompt_to_json("prompt", max_retries=2)
-        # Check both correction prompts
-        prompt1 = mock_base_prompt_to_json.call_args_list[1][0][0]
-        prompt2 = mock_base_prompt_to_json.call_args_list[2][0][0]
-        assert "RAW_JSON_ERROR_CONTENT" in prompt1
-        assert "The previous response was not valid JSON" in prompt2
-
     @patch('agents.llm.bedrock.boto3.client')
     def test_completion_with_json_mode(self, mock_boto_client):
         """Test that response_format parameter adds system prompt for JSON mode."""
@@ -483,6 +431,50 @@ class TestBedrockLLM:
         assert "system" in call_args
         assert call_args["system"][0]["text"] == "You must respond with valid JSON only. Do not include any text outside the JSON object."
 
+    @patch('agents.llm.bedrock.boto3.client')
+    def test_json_schema_response_format_falls_back_to_json_mode(self, mock_boto_client):
+        """Test that a json_schema request gets the same JSON-only instruction as json_object."""
+        mock_client_instance = MagicMock()
+        mock_boto_client.return_value = mock_client_instance
+        mock_client_instance.converse.return_value = {"output": {"message": {"content": [{"text": '{"a": 1}'}]}}, "usage": {}}
+
+        svc = BedrockLLM(model="anthropic.claude")
+        svc.completion(
+            [{"role": "user", "content": "Give me JSON"}],
+            response_format={"type": "json_schema", "json_schema": {"name": "r", "schema": {"type": "object"}}},
+        )
+
+        call_args = mock_client_instance.converse.call_args[1]
+        assert call_args["system"][0]["text"].startswith("You must respond with valid JSON only.")
+
+    @patch('agents.llm.bedrock.boto3.client')
+    def test_system_prompt_sent_as_converse_system_blocks(self, mock_boto_client):
+        """Test that a system message goes to the Converse system field ahead of the JSON instruction."""
+        mock_client_instance = MagicMock()
+        mock_boto_client.return_value = mock_client_instance
+        mock_client_instance.converse.return_value = {"output": {"message": {"content": [{"text": '{"a": 1}'}]}}, "usage": {}}
+
+        svc = BedrockLLM(model="anthropic.claude")
+        svc.prompt("Give me JSON", system="Static instructions", response_format={"type": "json_object"})
+
+        call_args = mock_client_instance.converse.call_args[1]
+        assert call_args["messages"] == [{"role": "user", "content": [{"text": "Give me JSON"}]}]
+        assert call_args["system"][0] == {"text": "Static instructions"}
+        assert call_args["system"][1]["text"].startswith("You must respond with valid JSON only.")
+
+    @patch('agents.llm.bedrock.boto3.client')
+    def test_system_prompt_gets_cache_point_on_caching_models(self, mock_boto_client):
+        """Test that models with prompt caching get a cache checkpoint after the system instructions."""
+        mock_client_instance = MagicMock()
+        mock_boto_client.return_value = mock_client_instance
+        mock_client_instance.converse.return_value = {"output": {"message": {"content": [{"text": "ok"}]}}, "usage": {}}
+
+        svc = BedrockLLM(model="us.anthropic.claude-3-7-sonnet-20250219-v1:0")
+        svc.prompt("Hello", system="Static instructions")
+
+        call_args = mock_client_instance.converse.call_args[1]
+        assert call_args["system"] == [{"text": "Static instructions"}, {"cachePoint": {"type": "default"}}]
+
     @patch('agents.llm.bedrock.boto3.client')
     def test_message_format_conversion(self, mock_boto_client):
         """Test that OpenAI-style messages are converted to Bedrock format."""
@@ -4,7 +4,8 @@ import pytest
 import json
 import os
 from unittest.mock import patch, MagicMock
-from agents.llm.litellm import LiteLLM, JSON_CORRECTION_PROMPT
+from agents.llm.litellm import LiteLLM
+from agents.llm.base_llm import JSON_CORRECTION_PROMPT
 
 class TestLiteLLM:
     # Tests default initialisation of LLM service with default model from environment variable
@@ -271,9 +272,81 @@ class TestLiteLLM:
             assert isinstance(result, BaseLLM.LLMResponse)
             assert result.text == ""  # Empty when extraction fails
 
+    @pytest.mark.parametrize("model, cached", [("claude-sonnet-4-20250514", True), ("gpt-4o", False)])
+    def test_prompt_system_message_marks_anthropic_prefix_cacheable(self, model, cached):
+        svc = LiteLLM(model=model)
+        mock_resp = MagicMock()
+        mock_resp.choices[0].message.content = "ok"
+        with patch("agents.llm.litellm.litellm.completion", return_value=mock_resp) as mock_completion:
+            assert svc.prompt("dynamic", system="static") == "ok"
+
+        system_msg, user_msg = mock_completion.call_args[1]["messages"]
+        assert user_msg == {"role": "user", "content": "dynamic"}
+        if cached:
+            assert system_msg["content"] == [{"type": "text", "text": "static", "cache_control": {"type": "ephemeral"}}]
+        else:
+            assert system_msg == {"role": "system", "content": "static"}
+
+    def test_prompt_batch_sends_one_batch_request_and_keeps_order(self):
+        svc = LiteLLM(model="test-model", temperature=0)
+        responses = []
+        for text in ["  first ", "second"]:
+            resp = MagicMock()
+            resp.choices[0].message.content = text
+            responses.append(resp)
+        with patch("agents.llm.litellm.litellm.batch_completion", return_value=responses) as mock_batch:
+            result = svc.prompt_batch(["a", "b"])
+
+        assert result == ["first", "second"]
+        mock_batch.assert_called_once_with(
+            model="test-model",
+            messages=[[{"role": "user", "content": "a"}], [{"role": "user", "content": "b"}]],
+            temperature=0,
+        )
+
+    def test_prompt_batch_raises_per_prompt_provider_error(self):
+        svc = LiteLLM(model="test-model")
+        ok = MagicMock()
+        ok.choices[0].message.content = "fine"
+        with patch("agents.llm.litellm.litellm.batch_completion", return_value=[ok, RuntimeError("rate limited")]):
+            with pytest.raises(RuntimeError, match="rate limited"):
+                svc.prompt_batch(["a", "b"])
+
+    # Tests that reported token usage accumulates across prompts
+    def test_prompt_accumulates_tokens_used(self):
+        svc = LiteLLM(model="gpt-4")
+        mock_resp = MagicMock()
+        mock_resp.choices[0].message.content = "ok"
+        mock_resp.usage = {"prompt_tokens": 7, "completion_tokens": 3}
+        with patch("agents.llm.litellm.litellm.completion", return_value=mock_resp):
+            svc.prompt("a")
+            svc.prompt("b")
+        assert svc.tokens_used == 20
+
+    # Tests that JSON wrapped in prose is repaired locally without a correction round-trip
+    def test_prompt_to_json_repairs_object_wrapped_in_prose(self):
+        svc = LiteLLM(model="gpt-4")
+        mock_resp = MagicMock()
+        mock_resp.choices[0].message.content = 'Here are the params: {"a": {"b": 1}} hope that helps'
+        with patch("agents.llm.litellm.litellm.completion", return_value=mock_resp) as mock_completion:
+            assert svc.prompt_to_json("prompt", max_retries=1) == {"a": {"b": 1}}
+        assert mock_completion.call_count == 1
+
+    # Tests that unrepairable replies reach the correction prompt with the raw reply attached
+    def test_prompt_to_json_correction_prompt_shows_unrepairable_reply(self):
+        svc = LiteLLM(model="gpt-4")
+        bad, good = MagicMock(), MagicMock()
+        bad.choices[0].message.content = "{not json}"
+        good.choices[0].message.content = '{"ok": true}'
+        with patch("agents.llm.litellm.litellm.completion", side_effect=[bad, good]) as mock_completion:
+            assert svc.prompt_to_json("prompt", max_retries=1) == {"ok": True}
+        correction = mock_completion.call_args_list[1].kwargs["messages"][-1]["content"]
+        assert "bad_json: {not json}" in correction
+
     @patch("agents.llm.base_llm.BaseLLM.prompt_to_json")
     def test_prompt_to_json_uses_raw_content_when_available(self, mock_base_prompt_to_json):
-        from agents.llm.litellm import LiteLLM, JSON_CORRECTION_PROMPT
+        from agents.llm.litellm import LiteLLM
+        from agents.llm.base_llm import JSON_CORRECTION_PROMPT
         svc = LiteLLM()
         class FakeError(json.JSONDecodeError):
             def __init__(self):
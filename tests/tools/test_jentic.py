@@ -1,3 +1,4 @@
+import asyncio
 # Test for the jentic.py script
 
 import pytest
@@ -83,6 +84,28 @@ class TestJenticTool:
         assert tool.name == "Unnamed Tool"
         assert tool.api_name == "unknown"
 
+    def test_get_summary_is_rendered_once(self):
+        """
+        Tests that the summary string is cached on the tool and returned identically.
+        """
+        tool = JenticTool(WORKFLOW_SCHEMA)
+        assert tool.get_summary() is tool.get_summary()
+
+    def test_get_details_is_encoded_once(self):
+        """
+        Tests that the JSON details string is cached on the tool and returned identically.
+        """
+        tool = JenticTool(OPERATION_SCHEMA)
+        assert tool.get_details() is tool.get_details()
+
+    def test_is_idempotent_only_for_read_operations(self):
+        """
+        Tests that GET operations are treated as idempotent while workflows are not.
+        """
+        assert JenticTool(OPERATION_SCHEMA).is_idempotent()
+        assert not JenticTool(WORKFLOW_SCHEMA).is_idempotent()
+        assert not JenticTool({**OPERATION_SCHEMA, 'method': 'POST'}).is_idempotent()
+
     def test_get_summary_workflow(self):
         """
         Tests the get_summary method for a clear and correct representation.
@@ -472,4 +495,58 @@ class TestJenticClient:
         tool_to_execute = JenticTool(WORKFLOW_SCHEMA)
 
         with pytest.raises(ToolExecutionError, match="SDK Error"):
-            client.execute(tool_to_execute, {})
\ No newline at end of file
+            client.execute(tool_to_execute, {})
+
+    def test_sdk_calls_share_one_event_loop(self, mock_jentic_sdk):
+        """
+        Tests that SDK calls run on one long-lived event loop, so the SDK can reuse its HTTP client.
+        """
+        loops = []
+
+        async def record_loop(*args, **kwargs):
+            loops.append(asyncio.get_running_loop())
+            return MagicMock(results=[])
+
+        mock_jentic_sdk.search.side_effect = record_loop
+
+        client = JenticClient()
+        client.search(query="a")
+        client.search(query="b")
+
+        assert len(loops) == 2 and loops[0] is loops[1] and loops[0].is_running()
+
+    def test_close_stops_event_loop_thread(self, mock_jentic_sdk):
+        """
+        Tests that close() stops the SDK event loop and joins its thread, and that a later call starts a new loop.
+        """
+        mock_jentic_sdk.search.return_value = MagicMock(results=[])
+
+        client = JenticClient()
+        client.search(query="a")
+        loop, thread = client._loop, client._loop_thread
+        client.close()
+
+        assert loop.is_closed() and not thread.is_alive()
+        client.search(query="b")
+        assert client._loop is not None and client._loop is not loop
+        client.close()
+        client.close()  # idempotent
+
+    def test_search_reuses_tools_for_unchanged_results(self, mock_jentic_sdk):
+        """
+        Tests that a tool returned again by a later search is the same object, with its summary already rendered.
+        """
+        def search_response(schema):
+            result = MagicMock()
+            result.model_dump.return_value = dict(schema)
+            return MagicMock(results=[result])
+
+        client = JenticClient()
+        mock_jentic_sdk.search.return_value = search_response(WORKFLOW_SCHEMA)
+        first = client.search(query="a")[0]
+        second = client.search(query="b")[0]
+        assert first is second
+
+        mock_jentic_sdk.search.return_value = search_response({**WORKFLOW_SCHEMA, "summary": "Renamed"})
+        changed = client.search(query="c")[0]
+        assert changed is not first and changed.name == "Renamed"
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from utils import fast_json
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(fast_json, "orjson", None)
+    elif fast_json.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+def test_dumps_is_compact_sorted_and_keeps_unicode(backend):
+    assert fast_json.dumps({"b": "é", "a": [1, 2]}, sort_keys=True) == '{"a":[1,2],"b":"é"}'
+
+
+def test_dumps_falls_back_for_non_string_keys(backend):
+    assert fast_json.dumps({1: "x"}) == '{"1":"x"}'
+
+
+def test_loads_round_trips_and_raises_json_decode_error(backend):
+    assert fast_json.loads('{"a": [1, "é"]}') == {"a": [1, "é"]}
+    with pytest.raises(json.JSONDecodeError):
+        fast_json.loads("{not json}")
+
+
+def test_dumps_uses_default_for_unknown_objects(backend):
+    assert fast_json.dumps({"a": object()}, default=lambda o: "obj") == '{"a":"obj"}'
+
+
+def test_loads_keeps_integers_wider_than_64_bits_exact(backend):
+    big = 123456789012345678901234567890
+    assert fast_json.loads('{"a": %d, "b": -%d}' % (big, big)) == {"a": big, "b": -big}
+    assert fast_json.loads(b'{"a": 18446744073709551616}') == {"a": 18446744073709551616}
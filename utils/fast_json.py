@@ -0,0 +1,54 @@
+"""
+JSON encode/decode helpers that use orjson when it is installed
+
+Features
+--------
+• ``dumps`` returns ``str`` with the same compact, non-ASCII-escaping output on both backends
+• ``loads`` accepts ``str`` or ``bytes``; decode errors are ``json.JSONDecodeError`` either way, and integers wider
+  than 64 bits stay exact
+• Falls back to the standard library when orjson is absent (``pip install standard-agent[speedups]``)
+"""
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without the speedups extra
+    orjson = None  # type: ignore[assignment]
+
+# orjson parses integers beyond 64 bits as floats; documents with digit runs this long go to the stdlib,
+# which keeps them exact (a run inside a string or a long fraction just costs the faster path)
+_LONG_DIGITS_STR = re.compile(r"\d{19,}")
+_LONG_DIGITS_BYTES = re.compile(rb"\d{19,}")
+
+
+def dumps(obj: Any, *, sort_keys: bool = False, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """Serialize *obj* to a compact JSON string, keeping non-ASCII characters as-is.
+
+    *default* converts objects neither backend can encode, as in ``json.dumps``.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=default, option=orjson.OPT_SORT_KEYS if sort_keys else 0).decode()
+        except TypeError:
+            pass  # e.g. non-str dict keys or integers beyond 64 bits; let the stdlib decide
+    return json.dumps(obj, ensure_ascii=False, sort_keys=sort_keys, separators=(",", ":"), default=default)
+
+
+def loads(data: str | bytes) -> Any:
+    """Parse a JSON document; raises ``json.JSONDecodeError`` on invalid input.
+
+    Integers of any size come back exact, as with ``json.loads``.
+    """
+    if orjson is not None and not _has_long_digits(data):
+        return orjson.loads(data)  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    return json.loads(data)
+
+
+def _has_long_digits(data: str | bytes) -> bool:
+    if isinstance(data, str):
+        return _LONG_DIGITS_STR.search(data) is not None
+    return _LONG_DIGITS_BYTES.search(data) is not None
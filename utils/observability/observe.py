@@ -7,7 +7,7 @@ from inspect import signature
 from typing import Any, Callable, Optional
 from contextvars import ContextVar
 from dataclasses import is_dataclass, asdict
-import json
+from utils import fast_json
 import time
 
 # Observability Attribute Size Limit
@@ -133,13 +133,13 @@ def _capture_input(span: Any, fn: Callable, args: tuple, kwargs: dict, llm: bool
         if llm:
             messages = bound.arguments.get("messages")
             if messages:
-                msg_str = json.dumps(messages, ensure_ascii=False, separators=(",", ":"))
+                msg_str = fast_json.dumps(messages)
                 span.set_attribute("input", msg_str[:MAX_LLM_PROMPT_BYTES])
             return
 
         inputs = {name: _safe_preview(value) for name, value in bound.arguments.items() if name not in {"self", "cls"}}
         
-        input_str = json.dumps(inputs, ensure_ascii=False, separators=(",", ":"), default=str)
+        input_str = fast_json.dumps(inputs, default=str)
         span.set_attribute("input", input_str[:MAX_INPUT_BYTES] + ("..." if len(input_str) > MAX_INPUT_BYTES else ""))
     except Exception:
         pass
@@ -0,0 +1,25 @@
+"""
+Small text helpers shared by reasoner implementations.
+
+Features
+--------
+• Cheap lexical similarity for spotting near-duplicate LLM outputs
+"""
+from __future__ import annotations
+
+import re
+from typing import AbstractSet
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def token_set(text: str) -> frozenset[str]:
+    """Return the set of lower-cased word tokens in *text*."""
+    return frozenset(_WORD_RE.findall(text.lower()))
+
+
+def jaccard_similarity(a: AbstractSet[str], b: AbstractSet[str]) -> float:
+    """Jaccard similarity of two token sets (1.0 for two empty sets)."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)